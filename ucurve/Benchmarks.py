@@ -0,0 +1,140 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import math
+import random
+import collections
+import subprocess
+from ucurve.Matrix import TridiagonalMatrix, BandedMatrix
+from ucurve.Interpolation import CSplineInterpolator
+from ucurve.Decimator import GreedyDecimator
+from ucurve.PointSet import PointSet
+from ucurve.ValueFile import ValueFile
+from ucurve.Sweeper import Sweeper
+from ucurve.actions.ActionXYGen import ActionXYGen
+
+class Benchmarks(object):
+	"""The benchmark cases for the core algorithms. Every case consists of
+	prepare(n, workdir), which creates the input data for n points once per
+	size, an optional setup(data), which is called before every single
+	repetition (e.g., because run() modifies its input), and run(data),
+	which is the part that is timed. Cases whose work does not happen in
+	this process set trace_memory to False, their peak memory is not
+	measured."""
+
+	Case = collections.namedtuple("Case", [ "name", "description", "prepare", "setup", "run", "trace_memory" ], defaults = [ True ])
+
+	@staticmethod
+	def _curve(n):
+		# Reproducible, smooth but not trivially decimatable
+		return [ (x, 1000 * math.sin(x / 500) + 250 * math.sin(x / 37)) for x in range(n) ]
+
+	@classmethod
+	def _prepare_tridiagonal(cls, n, workdir):
+		rng = random.Random(n)
+		rows = [ (rng.uniform(0.5, 1), rng.uniform(4, 5), rng.uniform(0.5, 1)) for i in range(n) ]
+		rhs = [ rng.uniform(-10, 10) for i in range(n) ]
+		return (rows, rhs)
+
+	@staticmethod
+	def _setup_tridiagonal(data):
+		(rows, rhs) = data
+		matrix = TridiagonalMatrix(len(rows))
+		for (i, row) in enumerate(rows, 1):
+			matrix.set_row(i, row)
+		return (matrix, rhs)
+
+	@staticmethod
+	def _run_tridiagonal(data):
+		(matrix, rhs) = data
+		matrix.solve(rhs)
+
+	@classmethod
+	def _prepare_banded(cls, n, workdir):
+		rng = random.Random(n)
+		matrix = BandedMatrix(n, 2, 2)
+		for i in range(1, n + 1):
+			for j in range(max(1, i - 2), min(n, i + 2) + 1):
+				matrix[(i, j)] = 6 if (i == j) else rng.uniform(-1, 1)
+		return (matrix, [ rng.uniform(-10, 10) for i in range(n) ])
+
+	@staticmethod
+	def _run_banded(data):
+		(matrix, rhs) = data
+		matrix.solve(rhs)
+
+	@classmethod
+	def _prepare_cspline_evaluate(cls, n, workdir):
+		interpolator = CSplineInterpolator(cls._curve(n))
+		return (interpolator, list(Sweeper(minval = 0, maxval = n - 1, stepcnt = n)))
+
+	@staticmethod
+	def _run_cspline_evaluate(data):
+		(interpolator, xvalues) = data
+		for x in xvalues:
+			interpolator[x]
+
+	@classmethod
+	def _prepare_decimate(cls, n, workdir):
+		return PointSet.from_points(cls._curve(n)).round()
+
+	@staticmethod
+	def _run_decimate(points):
+		collections.deque(GreedyDecimator(2).decimate(points), maxlen = 0)
+
+	@classmethod
+	def _prepare_parse(cls, n, workdir):
+		filename = os.path.join(workdir, "xy_%d.txt" % (n))
+		with open(filename, "w") as f:
+			for (x, y) in cls._curve(n):
+				print("%f %f" % (x, y), file = f)
+		return filename
+
+	@staticmethod
+	def _run_xygen(n):
+		fvars = ActionXYGen.parse_vars([ "Rref=100e3", "A=-16.0349", "B=5459.339", "C=-191141", "D=-3328322" ])
+		sweeper = Sweeper(minval = -40, maxval = 150, stepcnt = n)
+		collections.deque(ActionXYGen.generate_points("Rref * exp(A + (B / (TC + 273.15)) + (C / (TC + 273.15) ** 2) + (D / (TC + 273.15) ** 3))", "TC", fvars, sweeper), maxlen = 0)
+
+	@staticmethod
+	def _prepare_xygen_process(n, workdir):
+		basedir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+		return (basedir, [ sys.executable, "-m", "ucurve", "xygen", "--xmin", "0", "--xmax", "1", "-s", str(n), "x" ])
+
+	@staticmethod
+	def _run_xygen_process(data):
+		(basedir, command) = data
+		subprocess.check_call(command, cwd = basedir, stdout = subprocess.DEVNULL)
+
+	@classmethod
+	def cases(cls):
+		return [
+			cls.Case(name = "tridiagonal_solve", description = "TridiagonalMatrix.solve() of an n x n system", prepare = cls._prepare_tridiagonal, setup = cls._setup_tridiagonal, run = cls._run_tridiagonal),
+			cls.Case(name = "banded_solve", description = "BandedMatrix.solve() of an n x n pentadiagonal system", prepare = cls._prepare_banded, setup = None, run = cls._run_banded),
+			cls.Case(name = "cspline_construct", description = "CSplineInterpolator through n points", prepare = lambda n, workdir: cls._curve(n), setup = None, run = CSplineInterpolator),
+			cls.Case(name = "cspline_evaluate", description = "n evaluations of a CSplineInterpolator through n points", prepare = cls._prepare_cspline_evaluate, setup = None, run = cls._run_cspline_evaluate),
+			cls.Case(name = "decimate", description = "GreedyDecimator (as used by ActionCodeGen._thin_values) on n rounded points", prepare = cls._prepare_decimate, setup = None, run = cls._run_decimate),
+			cls.Case(name = "xy_parse", description = "Parsing an XY file with n points", prepare = cls._prepare_parse, setup = None, run = ValueFile),
+			cls.Case(name = "xygen_formula", description = "Evaluating the NTC formula from the README at n points", prepare = lambda n, workdir: n, setup = None, run = cls._run_xygen),
+			cls.Case(name = "xygen_process", description = "Running \"python -m ucurve xygen\" for n points in a new interpreter; interpreter startup and imports dominate at small n", prepare = cls._prepare_xygen_process, setup = None, run = cls._run_xygen_process, trace_memory = False),
+		]
@@ -0,0 +1,185 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import bisect
+from ucurve.Tools import CTypeTools
+from ucurve.Decimator import GreedyDecimator
+
+class BilinearTable(object):
+	"""Table of Z values on a rectangular grid of integer X and Y values
+	(which need not be equidistant) that is looked up with bilinear
+	interpolation: first along X on the two rows that enclose the Y value,
+	then along Y between those two results. Interpolation is done with
+	integers exactly as in the generated code (see lookup()); inputs outside
+	of the grid are clamped to its border.
+
+	The table is decimated by removing whole columns and rows. Columns are
+	decimated like a family of curves (one per row) with half of an error
+	budget, rows like a family of curves (one per column) with the other
+	half; the error of bilinear interpolation on the remaining grid is at
+	most the sum of both, plus truncation of the integer interpolation. As
+	the errors along X and Y rarely add up fully, the decimation starts
+	with twice the maximum error as budget and reduces it until the error
+	on all grid points is within the maximum error."""
+
+	_MIN_BUDGET = 0.25
+
+	def __init__(self, xvalues, yvalues, zvalues):
+		if (len(xvalues) < 2) or (len(yvalues) < 2):
+			raise Exception("A bilinear table needs at least two X and two Y values, but got %d and %d." % (len(xvalues), len(yvalues)))
+		self._xvalues = xvalues
+		self._yvalues = yvalues
+		self._zvalues = zvalues
+
+	@property
+	def xvalues(self):
+		return self._xvalues
+
+	@property
+	def yvalues(self):
+		return self._yvalues
+
+	@property
+	def zvalues(self):
+		"""Z values as a list of rows, zvalues[row][column] belonging to
+		yvalues[row] and xvalues[column]."""
+		return self._zvalues
+
+	@property
+	def size(self):
+		"""Number of Z values in the table."""
+		return len(self._xvalues) * len(self._yvalues)
+
+	@classmethod
+	def from_points(cls, points):
+		"""Create the table from (x, y, z) points that cover a complete grid
+		after rounding all values to integers. When multiple points round to
+		the same X/Y position, the one closest to it is kept (on a tie, the
+		smaller rounded Z value)."""
+		closest = { }
+		for (x, y, z) in points:
+			(rndx, rndy) = (round(x), round(y))
+			candidate = (abs(rndx - x) + abs(rndy - y), round(z))
+			key = (rndx, rndy)
+			if (key not in closest) or (candidate < closest[key]):
+				closest[key] = candidate
+		xvalues = sorted(set(x for (x, y) in closest))
+		yvalues = sorted(set(y for (x, y) in closest))
+		if len(closest) != len(xvalues) * len(yvalues):
+			missing = next((x, y) for y in yvalues for x in xvalues if (x, y) not in closest)
+			raise Exception("Values do not form a complete grid: %d X and %d Y values, but only %d points (e.g., nothing at x = %d, y = %d)." % (len(xvalues), len(yvalues), len(closest), missing[0], missing[1]))
+		zvalues = [ [ closest[(x, y)][1] for x in xvalues ] for y in yvalues ]
+		return cls(xvalues, yvalues, zvalues)
+
+	@staticmethod
+	def _find(values, value):
+		return min(bisect.bisect_right(values, value) - 1, len(values) - 2)
+
+	@staticmethod
+	def _interpolate(window, span, low, high):
+		# Integer division that truncates toward zero, like C does
+		product = window * (high - low)
+		quotient = abs(product) // span
+		return low + (quotient if (product >= 0) else -quotient)
+
+	def lookup(self, x, y):
+		"""Integer lookup, bit-exact with the generated C code."""
+		x = min(max(x, self._xvalues[0]), self._xvalues[-1])
+		y = min(max(y, self._yvalues[0]), self._yvalues[-1])
+		column = self._find(self._xvalues, x)
+		row = self._find(self._yvalues, y)
+		(x0, x1) = (self._xvalues[column], self._xvalues[column + 1])
+		(y0, y1) = (self._yvalues[row], self._yvalues[row + 1])
+		low = self._interpolate(x - x0, x1 - x0, self._zvalues[row][column], self._zvalues[row][column + 1])
+		high = self._interpolate(x - x0, x1 - x0, self._zvalues[row + 1][column], self._zvalues[row + 1][column + 1])
+		return self._interpolate(y - y0, y1 - y0, low, high)
+
+	def error(self, other):
+		"""Signed maximum error (z_true - z_interp) of this table on all grid
+		points of the other table."""
+		max_error = 0
+		for (y, row) in zip(other.yvalues, other.zvalues):
+			for (x, z) in zip(other.xvalues, row):
+				error = z - self.lookup(x, y)
+				if abs(error) > abs(max_error):
+					max_error = error
+		return max_error
+
+	@staticmethod
+	def _decimate_axis(values, members, max_error):
+		"""Indices of the values that remain after decimating them jointly
+		for all members (lists of Z values along the axis)."""
+		points = [ (value, tuple(member_values)) for (value, member_values) in zip(values, zip(*members)) ]
+		kept = set(point.x for point in GreedyDecimator(max_error).decimate(points))
+		return [ index for (index, value) in enumerate(values) if value in kept ]
+
+	def _subgrid(self, columns, rows):
+		return BilinearTable([ self._xvalues[column] for column in columns ], [ self._yvalues[row] for row in rows ], [ [ self._zvalues[row][column] for column in columns ] for row in rows ])
+
+	def decimate(self, max_error):
+		"""Remove as many columns and rows as possible while the error on all
+		grid points stays within max_error. Returns the decimated table and
+		its signed maximum error."""
+		budget = 2 * abs(max_error)
+		while budget >= self._MIN_BUDGET:
+			columns = self._decimate_axis(self._xvalues, self._zvalues, budget / 2)
+			rows = self._decimate_axis(self._yvalues, list(zip(*self._zvalues)), budget / 2)
+			table = self._subgrid(columns, rows)
+			error = table.error(self)
+			if abs(error) <= abs(max_error):
+				return (table, error)
+			budget *= 0.75
+		return (self, 0)
+
+	def c_types(self):
+		"""C types that the generated lookup code needs."""
+		xspans = [ x1 - x0 for (x0, x1) in zip(self._xvalues, self._xvalues[1:]) ]
+		yspans = [ y1 - y0 for (y0, y1) in zip(self._yvalues, self._yvalues[1:]) ]
+		# Products window * (high - low) of the interpolation along X and
+		# along Y; the latter interpolates between values that lie within
+		# the range of the four corners of a cell
+		products = [ ]
+		for (yspan, low_row, high_row) in zip(yspans, self._zvalues, self._zvalues[1:]):
+			for (column, xspan) in enumerate(xspans):
+				corners = low_row[column : column + 2] + high_row[column : column + 2]
+				products.append(xspan * abs(low_row[column + 1] - low_row[column]))
+				products.append(xspan * abs(high_row[column + 1] - high_row[column]))
+				products.append(yspan * (max(corners) - min(corners)))
+		max_product = max(products + xspans + yspans)
+		(xmin, xmax) = (self._xvalues[0], self._xvalues[-1])
+		(ymin, ymax) = (self._yvalues[0], self._yvalues[-1])
+		return {
+			"x_type":				CTypeTools.get_type(self._xvalues),
+			"y_type":				CTypeTools.get_type(self._yvalues),
+			"extd_x_type":			CTypeTools.get_type([ xmin - 10, xmax + 10 ]),
+			"extd_y_type":			CTypeTools.get_type([ ymin - 10, ymax + 10 ]),
+			"out_type":				CTypeTools.get_type([ z for row in self._zvalues for z in row ]),
+			"xspan_type":			CTypeTools.get_type([ 0 ] + xspans),
+			"yspan_type":			CTypeTools.get_type([ 0 ] + yspans),
+			"xidx_type":			CTypeTools.get_type([ 0, len(self._xvalues) ]),
+			"yidx_type":			CTypeTools.get_type([ 0, len(self._yvalues) ]),
+			"win_mul_zspan_type":	CTypeTools.get_type([ -max_product, max_product ]),
+		}
+
+	def table_size(self):
+		"""Size of the generated tables in bytes."""
+		types = self.c_types()
+		return (len(self._xvalues) * CTypeTools.sizeof(types["x_type"])) + (len(self._yvalues) * CTypeTools.sizeof(types["y_type"])) + (self.size * CTypeTools.sizeof(types["out_type"]))
@@ -0,0 +1,92 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import json
+import hashlib
+import functools
+
+class BuildStamp(object):
+	"""Records a fingerprint of everything that influences a generated set
+	of files (input data, relevant options, ucurve code and templates) next
+	to the outputs, together with the results of that run. If the
+	fingerprint is unchanged on the next run, the computation can be skipped
+	entirely."""
+
+	def __init__(self, filename, output_filenames):
+		self._filename = filename
+		self._output_filenames = output_filenames
+
+	@staticmethod
+	@functools.lru_cache(maxsize = None)
+	def code_fingerprint():
+		"""Hash of all ucurve source files and templates; this changes with
+		every ucurve version that could produce a different result."""
+		digest = hashlib.sha256()
+		basedir = os.path.dirname(os.path.abspath(__file__))
+		for (dirpath, dirnames, filenames) in os.walk(basedir):
+			dirnames[:] = sorted(dirname for dirname in dirnames if dirname not in [ "__pycache__", "tests" ])
+			for filename in sorted(filenames):
+				if filename.endswith(".pyc"):
+					continue
+				full_filename = os.path.join(dirpath, filename)
+				digest.update(os.path.relpath(full_filename, basedir).encode("utf-8") + b"\0")
+				with open(full_filename, "rb") as f:
+					digest.update(f.read())
+		return digest.hexdigest()
+
+	@staticmethod
+	def file_fingerprint(filename):
+		digest = hashlib.sha256()
+		with open(filename, "rb") as f:
+			for chunk in iter(lambda: f.read(1024 * 1024), b""):
+				digest.update(chunk)
+		return digest.hexdigest()
+
+	def fingerprint(self, options, input_filenames = None):
+		digest = hashlib.sha256()
+		digest.update(self.code_fingerprint().encode("ascii"))
+		digest.update(repr(sorted(options.items())).encode("utf-8"))
+		for filename in (input_filenames or [ ]):
+			digest.update(self.file_fingerprint(filename).encode("ascii"))
+		return digest.hexdigest()
+
+	def load(self, fingerprint):
+		"""Returns the stored results if the stamp matches the fingerprint and
+		all outputs still exist, None otherwise."""
+		if not all(os.path.isfile(filename) for filename in self._output_filenames):
+			return None
+		try:
+			with open(self._filename) as f:
+				stamp = json.load(f)
+		except (FileNotFoundError, json.decoder.JSONDecodeError):
+			return None
+		if stamp.get("fingerprint") != fingerprint:
+			return None
+		return stamp.get("result")
+
+	def save(self, fingerprint, result):
+		stamp = {
+			"fingerprint":	fingerprint,
+			"result":		result,
+		}
+		with open(self._filename, "w") as f:
+			json.dump(stamp, f)
@@ -0,0 +1,199 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import collections
+from ucurve.Tools import CTypeTools
+
+class CostModel(object):
+	"""Estimates what a generated lookup table costs on a particular target:
+	the number of bytes the table occupies (including struct padding) and
+	the number of CPU cycles a single lookup takes, both in the worst case
+	and on average over uniformly distributed X values. Cycle counts are
+	derived from per-instruction-class timings of the target; they are
+	meant to compare tables and search strategies against each other, not
+	to replace a measurement on the device."""
+
+	_Target = collections.namedtuple("Target", [ "name", "word_bytes", "max_alignment", "pointer_bytes", "load_cycles", "progmem_load_cycles", "alu_cycles", "branch_cycles", "call_cycles", "clz_cycles", "shift_cycles", "mul_cycles", "div_cycles" ])
+	_TARGETS = collections.OrderedDict((target.name, target) for target in [
+		# 8 bit, no alignment, 16x16 multiplication inline, everything
+		# wider and all divisions in libgcc; no barrel shifter, so variable
+		# shifts are loops
+		_Target(name = "avr", word_bytes = 1, max_alignment = 1, pointer_bytes = 2, load_cycles = 2, progmem_load_cycles = 3, alu_cycles = 1, branch_cycles = 2, call_cycles = 8, clz_cycles = 40, shift_cycles = 12,
+			mul_cycles = { 1: 2, 2: 8, 4: 40, 8: 150 }, div_cycles = { 1: 60, 2: 210, 4: 620, 8: 1800 }),
+		# Single-cycle multiplier, but no hardware divider and no CLZ
+		_Target(name = "cortex-m0", word_bytes = 4, max_alignment = 8, pointer_bytes = 4, load_cycles = 2, progmem_load_cycles = 2, alu_cycles = 1, branch_cycles = 3, call_cycles = 6, clz_cycles = 20, shift_cycles = 1,
+			mul_cycles = { 1: 1, 2: 1, 4: 1, 8: 20 }, div_cycles = { 1: 60, 2: 60, 4: 60, 8: 200 }),
+		# Hardware divider (2 - 12 cycles, worst case used)
+		_Target(name = "cortex-m4", word_bytes = 4, max_alignment = 8, pointer_bytes = 4, load_cycles = 2, progmem_load_cycles = 2, alu_cycles = 1, branch_cycles = 2, call_cycles = 4, clz_cycles = 1, shift_cycles = 1,
+			mul_cycles = { 1: 1, 2: 1, 4: 1, 8: 3 }, div_cycles = { 1: 12, 2: 12, 4: 12, 8: 100 }),
+		_Target(name = "generic32", word_bytes = 4, max_alignment = 8, pointer_bytes = 4, load_cycles = 1, progmem_load_cycles = 1, alu_cycles = 1, branch_cycles = 1, call_cycles = 2, clz_cycles = 1, shift_cycles = 1,
+			mul_cycles = { 1: 3, 2: 3, 4: 3, 8: 10 }, div_cycles = { 1: 20, 2: 20, 4: 20, 8: 40 }),
+	])
+
+	SEARCH_STRATEGIES = [ "linear", "binary" ]
+	LAYOUTS = [ "search", "octave" ]
+
+	def __init__(self, target, types, members = None, progmem = False, layout = "search"):
+		if target not in self._TARGETS:
+			raise Exception("Unknown target '%s' (must be one of %s)." % (target, ", ".join(self._TARGETS)))
+		self._target = self._TARGETS[target]
+		self._types = types
+		self._members = members
+		self._progmem = progmem
+		self._layout = layout
+
+	@classmethod
+	def target_names(cls):
+		return list(cls._TARGETS)
+
+	def _words(self, typename):
+		return max(1, math.ceil(CTypeTools.sizeof(typename) / self._target.word_bytes))
+
+	def _load(self, typename):
+		cycles = self._target.progmem_load_cycles if self._progmem else self._target.load_cycles
+		return self._words(typename) * cycles
+
+	def _alu(self, typename):
+		return self._words(typename) * self._target.alu_cycles
+
+	def _compare(self, typename):
+		return self._alu(typename) + self._target.branch_cycles
+
+	def table_bytes(self, entries):
+		(in_type, out_type) = (self._types["in_type"], self._types["out_type"])
+		if self._layout == "octave":
+			# Y values only, the X values are implied by the index
+			return entries * CTypeTools.sizeof(out_type)
+		elif self._members is None:
+			return entries * CTypeTools.struct_size([ in_type, out_type ], max_alignment = self._target.max_alignment)
+		else:
+			# One X array, one Y array per member and an array of pointers
+			# to the Y arrays
+			return (entries * CTypeTools.sizeof(in_type)) + (self._members * entries * CTypeTools.sizeof(out_type)) + (self._members * self._target.pointer_bytes)
+
+	def _entry_load(self):
+		if self._members is None:
+			return self._load(self._types["in_type"]) + self._load(self._types["out_type"])
+		else:
+			return self._load(self._types["in_type"])
+
+	def _fixed_cycles(self):
+		"""Cycles of a lookup that do not depend on the search: call, range
+		checks, fetching the segment's cornerpoints and interpolation."""
+		(in_type, out_type) = (self._types["in_type"], self._types["out_type"])
+		cycles = self._target.call_cycles + 2 * self._compare(in_type)
+		cycles += 2 * (self._load(in_type) + self._load(out_type))
+		cycles += self._target.call_cycles + 2 * self._alu(in_type) + self._alu(self._types["yspan_type"]) + self._alu(out_type)
+		win_mul_bytes = CTypeTools.sizeof(self._types["win_mul_yspan_type"])
+		cycles += self._target.mul_cycles[win_mul_bytes] + self._target.div_cycles[win_mul_bytes]
+		return cycles
+
+	def _linear_iterations(self, segment_count):
+		return [ index + 1 for index in range(segment_count) ]
+
+	def _binary_iterations(self, segment_count):
+		iterations = [ ]
+		for index in range(segment_count):
+			(low, high, count) = (0, segment_count, 0)
+			while high - low > 1:
+				middle = (low + high) // 2
+				if index >= middle:
+					low = middle
+				else:
+					high = middle
+				count += 1
+			iterations.append(count)
+		return iterations
+
+	def _iteration_cycles(self, strategy):
+		(in_type, idx_type) = (self._types["in_type"], self._types["idx_type"])
+		if strategy == "linear":
+			cycles = self._entry_load() + self._compare(in_type) + self._alu(idx_type) + self._compare(idx_type)
+			if self._members is None:
+				# Second comparison and copy of the entry in the generated loop
+				cycles += self._compare(in_type) + self._alu(in_type) + self._alu(self._types["out_type"])
+			return cycles
+		elif strategy == "binary":
+			return 3 * self._alu(idx_type) + self._load(in_type) + self._compare(in_type)
+		else:
+			raise Exception("Unknown search strategy '%s'." % (strategy))
+
+	def octave_cycles(self):
+		"""Cycles of a lookup in an octave table, which are the same for all
+		X values: range checks, finding the octave by counting leading
+		zeros, computing the index and interpolating between two Y values
+		with a multiplication and a shift."""
+		(in_type, out_type, offset_type) = (self._types["in_type"], self._types["out_type"], self._types["offset_type"])
+		win_mul_type = self._types["win_mul_yspan_type"]
+		cycles = self._target.call_cycles + 2 * self._compare(in_type) + self._alu(in_type)
+		cycles += self._target.call_cycles + self._compare(offset_type) + self._words(offset_type) * self._target.clz_cycles + self._alu(offset_type)
+		cycles += self._words(offset_type) * self._target.shift_cycles + 2 * self._alu(self._types["idx_type"]) + 2 * self._alu(offset_type)
+		cycles += 2 * (self._target.call_cycles + self._load(out_type)) + self._compare(out_type) + self._alu(out_type)
+		cycles += self._target.mul_cycles[CTypeTools.sizeof(win_mul_type)] + self._words(win_mul_type) * self._target.shift_cycles + self._alu(out_type)
+		return cycles
+
+	def lookup_cycles(self, xvalues, strategy):
+		"""Return the worst case and average number of cycles of a lookup
+		with the given search strategy. The average assumes X values that
+		are uniformly distributed over the table's range."""
+		segment_count = len(xvalues) - 1
+		if strategy == "linear":
+			iterations = self._linear_iterations(segment_count)
+		else:
+			iterations = self._binary_iterations(segment_count)
+		fixed_cycles = self._fixed_cycles()
+		iteration_cycles = self._iteration_cycles(strategy)
+		if segment_count < 1:
+			return (fixed_cycles, fixed_cycles)
+		widths = [ x1 - x0 for (x0, x1) in zip(xvalues, xvalues[1:]) ]
+		average_iterations = sum(width * count for (width, count) in zip(widths, iterations)) / sum(widths)
+		return (fixed_cycles + iteration_cycles * max(iterations), fixed_cycles + iteration_cycles * average_iterations)
+
+	def estimate(self, xvalues):
+		result = {
+			"table_bytes":	self.table_bytes(len(xvalues)),
+		}
+		if self._layout == "octave":
+			cycles = self.octave_cycles()
+			result["octave"] = {
+				"worst":	cycles,
+				"average":	cycles,
+			}
+			return result
+		for strategy in self.SEARCH_STRATEGIES:
+			(worst, average) = self.lookup_cycles(xvalues, strategy)
+			result[strategy] = {
+				"worst":	worst,
+				"average":	round(average, 1),
+			}
+		return result
+
+	@classmethod
+	def estimate_all(cls, types, xvalues, members = None, progmem = False, layout = "search"):
+		"""Estimate the cost of a table on all known targets."""
+		return collections.OrderedDict((target, cls(target, types, members = members, progmem = progmem, layout = layout).estimate(xvalues)) for target in cls._TARGETS)
+
+	@staticmethod
+	def summary_lines(estimates):
+		if all("octave" in estimate for estimate in estimates.values()):
+			return [ "%-10s %6d bytes, octave index %d cycles" % (target, estimate["table_bytes"], estimate["octave"]["worst"]) for (target, estimate) in estimates.items() ]
+		return [ "%-10s %6d bytes, linear search %d / %.0f cycles, binary search %d / %.0f cycles" % (target, estimate["table_bytes"], estimate["linear"]["worst"], estimate["linear"]["average"], estimate["binary"]["worst"], estimate["binary"]["average"]) for (target, estimate) in estimates.items() ]
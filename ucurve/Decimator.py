@@ -0,0 +1,421 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import collections
+import bisect
+import itertools
+import concurrent.futures
+
+PointWithError = collections.namedtuple("PointWithError", [ "x", "y", "error" ])
+
+def absmax(a, b):
+	if abs(a) > abs(b):
+		return a
+	else:
+		return b
+
+class GreedyDecimator(object):
+	"""Forward-scanning decimation: starting at a cornerpoint, the segment
+	is extended for as long as linear interpolation between its first and
+	last point stays within the maximum error. Points are consumed from an
+	iterable and cornerpoints are yielded as soon as they are final, so
+	only the points of the current candidate segment are held in memory.
+
+	Y values may also be tuples of equal length (a family of curves that
+	share their X values). Then every cornerpoint is chosen so that the
+	error of all members stays within the maximum error."""
+
+	def __init__(self, max_error_y):
+		self._max_error_y = max_error_y
+		self._max_error = 0
+
+	@property
+	def max_error(self):
+		return self._max_error
+
+	@staticmethod
+	def _interpolate(xvalue, low, high):
+		xspan = high[0] - low[0]
+		yspan = high[1] - low[1]
+		xwin = xvalue - low[0]
+		return low[1] + (xwin / xspan) * yspan
+
+	@classmethod
+	def interpolation_error(cls, values):
+		assert(len(values) >= 3)
+		first = values[0]
+		last = values[-1]
+		max_error = 0
+		if not isinstance(first[1], tuple):
+			for (x, y) in values[1 : -1]:
+				y_interp = cls._interpolate(x, first, last)
+				error = y_interp - y
+				max_error = absmax(max_error, error)
+		else:
+			for (member, (y_first, y_last)) in enumerate(zip(first[1], last[1])):
+				for (x, y) in values[1 : -1]:
+					y_interp = cls._interpolate(x, (first[0], y_first), (last[0], y_last))
+					error = y_interp - y[member]
+					max_error = absmax(max_error, error)
+		return max_error
+
+	def decimate(self, points):
+		points = iter(points)
+		window = [ ]
+		next_error = None
+		while True:
+			if len(window) == 0:
+				window.extend(itertools.islice(points, 1))
+				if len(window) == 0:
+					break
+			(x, y) = window[0]
+			yield PointWithError(x = x, y = y, error = next_error)
+
+			# window[0 : next_index + 1] is the longest segment found so far
+			# that stays within the error bound
+			next_error = 0
+			next_index = 1
+			while True:
+				if len(window) < next_index + 2:
+					window.extend(itertools.islice(points, next_index + 2 - len(window)))
+					if len(window) < next_index + 2:
+						break
+				error = self.interpolation_error(window[0 : next_index + 2])
+				if abs(error) <= abs(self._max_error_y):
+					next_index += 1
+					next_error = absmax(next_error, error)
+					self._max_error = absmax(self._max_error, error)
+				else:
+					break
+			del window[ : next_index]
+
+class FreeKnotDecimator(object):
+	"""Decimation in which the Y values of the cornerpoints are free
+	integers instead of being taken from the input points, so that a
+	segment can be shifted up or down by up to the maximum error and thus
+	cover many more points.
+
+	Every segment starts at the end of the previous one, which keeps the
+	curve continuous. Each input point restricts the slope of the segment to
+	an interval (the "cone" of lines that pass within the maximum error of
+	all points so far); the segment can be extended for as long as that
+	cone is not empty. Ending a segment as far as possible is a bad choice,
+	though: the cone is narrowest there, so the cornerpoint ends up at the
+	edge of the error band and the next segment has hardly any room left.
+	Instead, several end positions near the maximum are tried, each with the
+	integer Y value closest to the data and the one that minimizes the
+	worst-case deviation of the segment, and the one from which the next
+	segment reaches farthest is taken.
+
+	With free_x, a segment may also end at an integer X between two input
+	points (which only makes a difference for input with gaps in X). Like
+	GreedyDecimator, points are consumed from an iterable and Y values may
+	be tuples (a family of curves)."""
+
+	_EPSILON = 1e-9
+
+	def __init__(self, max_error_y, free_x = False):
+		self._max_error_y = abs(max_error_y)
+		self._free_x = free_x
+		self._max_error = 0
+
+	@property
+	def max_error(self):
+		return self._max_error
+
+	def _integer_range(self, y0, cone, dx):
+		"""Integer Y values at distance dx from a start point with Y value y0
+		that lie within the cone of slopes."""
+		(lo, hi) = cone
+		return (math.ceil(y0 + lo * dx - self._EPSILON), math.floor(y0 + hi * dx + self._EPSILON))
+
+	def _scan(self, start, window, offset, points, members, cones = None):
+		"""Extend a segment from the start point over window[offset:] (which
+		is refilled from points as needed) for as long as there are lines
+		within the maximum error of all points, considering only the given
+		members. Returns the number of covered points; if a cones list is
+		given, the slope intervals of all members after every covered point
+		are appended to it."""
+		(x0, y0s) = start
+		cone = [ (-math.inf, math.inf) ] * len(y0s)
+		index = offset
+		while True:
+			if index == len(window):
+				window.extend(itertools.islice(points, 1))
+				if index == len(window):
+					break
+			(x, ys) = window[index]
+			dx = abs(x - x0)
+			new_cone = list(cone)
+			for member in members:
+				(lo, hi) = cone[member]
+				lo = max(lo, (ys[member] - self._max_error_y - y0s[member]) / dx)
+				hi = min(hi, (ys[member] + self._max_error_y - y0s[member]) / dx)
+				if lo > hi + self._EPSILON:
+					return index - offset
+				new_cone[member] = (lo, hi)
+			cone = new_cone
+			if cones is not None:
+				cones.append(cone)
+			index += 1
+		return index - offset
+
+	def _end_positions(self, window, count, exhausted):
+		"""(covered, x) tuples of positions at which a segment that can cover
+		count points of the window may end: the last covered point and a
+		few exponentially spaced points before it. With free_x, also
+		positions in the gap before the first uncovered point."""
+		if exhausted:
+			return [ (count, window[count - 1][0]) ]
+		positions = [ ]
+		back = 0
+		while back < count:
+			positions.append((count - back, window[count - back - 1][0]))
+			back = 2 * back if (back > 0) else 1
+		if self._free_x:
+			x_last = window[count - 1][0]
+			x_next = window[count][0]
+			step = 1 if (x_next > x_last) else -1
+			for x in sorted(set([ x_last + step * (abs(x_next - x_last) // 2), x_next - step ])):
+				if x != x_last:
+					positions.append((count, x))
+		return positions
+
+	@staticmethod
+	def _segment_error(start, end, covered):
+		"""Signed maximum deviation (y_interp - y) of the covered points from
+		the line between the start and end point."""
+		(x0, y0) = start
+		(x1, y1) = end
+		slope = (y1 - y0) / (x1 - x0)
+		error = 0
+		for (x, y) in covered:
+			error = absmax(error, y0 + slope * (x - x0) - y)
+		return error
+
+	def _minimax_end(self, start, x_end, covered, low, high):
+		"""Choose the integer Y value at x_end between low and high for which
+		the worst-case deviation over the covered (x, y) points is minimal.
+		The deviation is convex in the end value, so a binary search
+		suffices."""
+		deviation = lambda y_end: abs(self._segment_error(start, (x_end, y_end), covered))
+		while low < high:
+			middle = (low + high) // 2
+			if deviation(middle) <= deviation(middle + 1):
+				high = middle
+			else:
+				low = middle + 1
+		return low
+
+	def _end_values(self, start, x_end, covered, data_ys, cone, members):
+		"""Candidate tuples of integer end values at x_end: the ones closest
+		to the data and the ones that minimize the segment's deviation."""
+		closest = [ ]
+		minimax = [ ]
+		for member in members:
+			(low, high) = self._integer_range(start[1][member], cone[member], abs(x_end - start[0]))
+			if low > high:
+				return [ ]
+			closest.append(min(max(round(data_ys[member]), low), high))
+			member_covered = [ (x, ys[member]) for (x, ys) in covered ]
+			minimax.append(self._minimax_end((start[0], start[1][member]), x_end, member_covered, low, high))
+		return sorted(set([ tuple(closest), tuple(minimax) ]))
+
+	def _data_ys(self, window, covered, x):
+		"""Y values of the input at x, interpolated if x is in a gap."""
+		(x0, ys0) = window[covered - 1]
+		if (x == x0) or (covered == len(window)):
+			return ys0
+		(x1, ys1) = window[covered]
+		return [ y0 + (x - x0) / (x1 - x0) * (y1 - y0) for (y0, y1) in zip(ys0, ys1) ]
+
+	def _first_start(self, first, window, points):
+		"""Choose the Y values of the very first cornerpoint so that every
+		member's first segment becomes as long as possible."""
+		(x0, ys) = first
+		y0s = [ ]
+		for (member, y) in enumerate(ys):
+			candidates = sorted(range(math.ceil(y - self._max_error_y), math.floor(y + self._max_error_y) + 1), key = lambda candidate: abs(candidate - y))
+			reaches = [ ]
+			for candidate in candidates:
+				start_ys = list(ys)
+				start_ys[member] = candidate
+				reaches.append(self._scan((x0, start_ys), window, 0, points, [ member ]))
+			y0s.append(candidates[reaches.index(max(reaches))])
+		return (x0, tuple(y0s))
+
+	def decimate(self, points):
+		points = iter(points)
+		first = next(points, None)
+		if first is None:
+			return
+		scalar = not isinstance(first[1], tuple)
+		if scalar:
+			points = ((x, (y, )) for (x, y) in points)
+			first = (first[0], (first[1], ))
+		members = list(range(len(first[1])))
+		to_output = (lambda ys: ys[0]) if scalar else (lambda ys: ys)
+
+		window = [ ]
+		start = self._first_start(first, window, points)
+		yield PointWithError(x = start[0], y = to_output(start[1]), error = None)
+
+		covered_first = [ first ]
+		while True:
+			cones = [ ]
+			count = self._scan(start, window, 0, points, members, cones)
+			if count == 0:
+				break
+			exhausted = (count == len(window))
+
+			# Out of all candidate ends, take the one from which the next
+			# segment reaches farthest; on a tie, prefer the longer segment
+			best = None
+			for (covered_count, x_end) in self._end_positions(window, count, exhausted):
+				covered = covered_first + window[ : covered_count]
+				data_ys = self._data_ys(window, covered_count, x_end)
+				for y_ends in self._end_values(start, x_end, covered, data_ys, cones[covered_count - 1], members):
+					reach = covered_count
+					if not exhausted:
+						reach += self._scan((x_end, y_ends), window, covered_count, points, members)
+					if (best is None) or (reach > best[0]):
+						best = (reach, covered_count, x_end, y_ends)
+			if best is None:
+				# No integer end within the cone anywhere, fall back to the
+				# first point itself
+				(covered_count, x_end) = (1, window[0][0])
+				best = (None, covered_count, x_end, tuple(round(y) for y in window[0][1]))
+			(reach, covered_count, x_end, y_ends) = best
+
+			covered = covered_first + window[ : covered_count]
+			error = 0
+			for member in members:
+				member_covered = [ (x, ys[member]) for (x, ys) in covered ]
+				error = absmax(error, self._segment_error((start[0], start[1][member]), (x_end, y_ends[member]), member_covered))
+			self._max_error = absmax(self._max_error, error)
+			start = (x_end, y_ends)
+			yield PointWithError(x = x_end, y = to_output(y_ends), error = error)
+			del window[ : covered_count]
+			covered_first = [ ]
+
+def _decimate_chunk(max_error_y, points):
+	return list(GreedyDecimator(max_error_y).decimate(points))
+
+class ParallelDecimator(object):
+	"""Greedy decimation that splits the points into chunks (which share
+	their boundary points) and decimates those in a pool of worker
+	processes. Every chunk path is exactly what a sequential run would
+	produce from the start of the chunk on, except that it is forced to end
+	at the chunk boundary.
+
+	To stitch a boundary, the sequential decimation is continued from the
+	last cornerpoint that the chunk found on its own (which is still a
+	cornerpoint of the sequential run) until it produces a cornerpoint that
+	is also on the path of a following chunk. Since greedy decimation only
+	depends on where a segment starts, both paths coincide from there on.
+	The result is therefore identical to that of GreedyDecimator and has the
+	same error bound; the price is the number of points that have to be
+	decimated a second time, which is usually a few segments per boundary.
+	In the worst case (paths that never join), the stitching degrades to a
+	sequential run."""
+
+	def __init__(self, max_error_y, jobs, chunks_per_job = 4, min_chunk_size = 1000):
+		self._max_error_y = max_error_y
+		self._jobs = jobs
+		self._chunks_per_job = chunks_per_job
+		self._min_chunk_size = min_chunk_size
+		self._max_error = 0
+		self._chunks = 0
+		self._stitched_points = 0
+
+	@property
+	def max_error(self):
+		return self._max_error
+
+	@property
+	def chunks(self):
+		return self._chunks
+
+	@property
+	def stitched_points(self):
+		"""Number of points that were decimated again to stitch the chunk
+		boundaries."""
+		return self._stitched_points
+
+	def _chunk_bounds(self, count):
+		chunks = max(1, min(self._jobs * self._chunks_per_job, (count - 1) // self._min_chunk_size))
+		return [ round(i * (count - 1) / chunks) for i in range(chunks + 1) ]
+
+	def _decimate_chunks(self, points):
+		bounds = self._chunk_bounds(len(points))
+		chunks = [ points[start : end + 1] for (start, end) in zip(bounds, bounds[1:]) ]
+		if (self._jobs == 1) or (len(chunks) == 1):
+			return [ _decimate_chunk(self._max_error_y, chunk) for chunk in chunks ]
+		with concurrent.futures.ProcessPoolExecutor(max_workers = self._jobs) as executor:
+			return list(executor.map(_decimate_chunk, itertools.repeat(self._max_error_y), chunks))
+
+	def _stitch(self, points, paths):
+		xvalues = [ x for (x, y) in points ]
+
+		# All cornerpoints that chunks found on their own, i.e., except for
+		# the forced end of every chunk but the last
+		known = { }
+		for (chunk, path) in enumerate(paths):
+			end = len(path) if (chunk == len(paths) - 1) else len(path) - 1
+			for position in range(end):
+				known[path[position].x] = (chunk, position)
+
+		result = [ paths[0][0] ]
+		(chunk, position) = (0, 0)
+		while True:
+			path = paths[chunk]
+			if chunk == len(paths) - 1:
+				result += path[position + 1 : ]
+				break
+			result += path[position + 1 : -1]
+
+			start = bisect.bisect_left(xvalues, result[-1].x)
+			redecimated = GreedyDecimator(self._max_error_y).decimate(itertools.islice(points, start, None))
+			next(redecimated)
+			for cornerpoint in redecimated:
+				result.append(cornerpoint)
+				if cornerpoint.x in known:
+					(chunk, position) = known[cornerpoint.x]
+					self._stitched_points += bisect.bisect_left(xvalues, cornerpoint.x) - start
+					break
+			else:
+				# Decimated sequentially up to the very end
+				self._stitched_points += len(points) - start
+				break
+		return result
+
+	def decimate(self, points):
+		points = list(points)
+		if len(points) == 0:
+			return
+		paths = self._decimate_chunks(points)
+		self._chunks = len(paths)
+		result = self._stitch(points, paths)
+		for point in result:
+			if point.error is not None:
+				self._max_error = absmax(self._max_error, point.error)
+		yield from result
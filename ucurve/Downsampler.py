@@ -0,0 +1,91 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+class Downsampler(object):
+	"""Reduce a series of (x, y) values to at most a given number of points
+	for plotting while keeping its visual shape. "minmax" keeps the minimum
+	and maximum of each bucket of consecutive points (so no peak is ever
+	lost, like the envelope that a plot draws per pixel column), "lttb" is
+	the Largest-Triangle-Three-Buckets algorithm, which picks the point of
+	each bucket that spans the largest triangle with its neighbors. The
+	first and the last point are always kept."""
+	_ALGORITHMS = [ "minmax", "lttb" ]
+
+	def __init__(self, algorithm, max_points):
+		if algorithm not in self._ALGORITHMS:
+			raise Exception("Unknown downsampling algorithm '%s', must be one of %s." % (algorithm, ", ".join(self._ALGORITHMS)))
+		if max_points < 4:
+			raise Exception("Downsampling needs to keep at least 4 points, %d requested." % (max_points))
+		self._algorithm = algorithm
+		self._max_points = max_points
+
+	@classmethod
+	def algorithms(cls):
+		return list(cls._ALGORITHMS)
+
+	def _minmax_indices(self, yvalues):
+		count = len(yvalues)
+		buckets = (self._max_points - 2) // 2
+		indices = [ 0 ]
+		for bucket in range(buckets):
+			start = bucket * count // buckets
+			end = (bucket + 1) * count // buckets
+			values = yvalues[start : end]
+			(imin, imax) = (start + values.index(min(values)), start + values.index(max(values)))
+			indices += [ min(imin, imax), max(imin, imax) ]
+		indices.append(count - 1)
+		return sorted(set(indices))
+
+	def _lttb_indices(self, xvalues, yvalues):
+		count = len(yvalues)
+		buckets = self._max_points - 2
+		bucket_size = (count - 2) / buckets
+		indices = [ 0 ]
+		selected = 0
+		for bucket in range(buckets):
+			start = int(bucket * bucket_size) + 1
+			end = int((bucket + 1) * bucket_size) + 1
+			next_end = int((bucket + 2) * bucket_size) + 1 if (bucket < buckets - 1) else count
+			avg_x = sum(xvalues[end : next_end]) / (next_end - end)
+			avg_y = sum(yvalues[end : next_end]) / (next_end - end)
+
+			# Twice the triangle area is linear in the candidate point, so
+			# only the coefficients depend on the bucket
+			(ax, ay) = (xvalues[selected], yvalues[selected])
+			(cx, cy) = (avg_y - ay, ax - avg_x)
+			selected = max(range(start, end), key = lambda i: abs(cx * (xvalues[i] - ax) + cy * (yvalues[i] - ay)))
+			indices.append(selected)
+		indices.append(count - 1)
+		return indices
+
+	def indices(self, xvalues, yvalues):
+		"""Return the (ascending) indices of the points to keep."""
+		if len(yvalues) <= self._max_points:
+			return list(range(len(yvalues)))
+		if self._algorithm == "minmax":
+			return self._minmax_indices(yvalues)
+		else:
+			return self._lttb_indices(xvalues, yvalues)
+
+	def downsample(self, xvalues, yvalues):
+		"""Return the kept points as two lists of X and Y values."""
+		indices = self.indices(xvalues, yvalues)
+		return ([ xvalues[i] for i in indices ], [ yvalues[i] for i in indices ])
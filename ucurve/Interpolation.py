@@ -19,15 +19,21 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import bisect
 import collections
 from ucurve.Matrix import TridiagonalMatrix
 from ucurve.Polynomial import Polynomial
+from ucurve.PolynomialFit import PiecewisePolynomialFit
+from ucurve.PointSet import PointSet
 
 class Interpolator(object):
 	def __init__(self, points):
 		if len(points) < 2:
 			raise Exception("Need at least two points for interpolation.")
-		self._points = list(sorted(points))
+		if isinstance(points, PointSet):
+			self._points = list(points.sort_unique())
+		else:
+			self._points = list(sorted(points))
 		self._calculate()
 
 	def _calculate(self):
@@ -36,6 +42,11 @@ class Interpolator(object):
 	def __getitem__(self, x):
 		raise Exception(NotImplemented)
 
+	def evaluate(self, xvalues):
+		"""Return a list of the interpolated values at all given X values,
+		which may be in any order."""
+		return [ self[x] for x in xvalues ]
+
 class PiecewisePolynomialInterpolator(Interpolator):
 	_PolyStartingAt = collections.namedtuple("PolyStartingAt", [ "xoffset", "poly" ])
 
@@ -51,8 +62,8 @@ class PiecewisePolynomialInterpolator(Interpolator):
 	def __index_eval(self, x, index):
 		poly = self._polys[index]
 		if index == 0:
-			# First poly
-			if x < poly.xoffset:
+			# First poly, also used left of the first point
+			if (len(self._polys) == 1) or (x < self._polys[index + 1].xoffset):
 				# Found
 				return 0
 			else:
@@ -101,6 +112,11 @@ class PiecewisePolynomialInterpolator(Interpolator):
 		(xoffset, poly) = self._polys[self._last_poly_idx]
 		return poly[x]
 
+	def evaluate(self, xvalues):
+		xoffsets = [ xoffset for (xoffset, poly) in self._polys ]
+		polys = [ poly for (xoffset, poly) in self._polys ]
+		return [ polys[max(bisect.bisect_right(xoffsets, x) - 1, 0)][x] for x in xvalues ]
+
 class LinearInterpolator(PiecewisePolynomialInterpolator):
 	def _calculate(self):
 		for (pt0, pt1) in zip(self._points, self._points[1:]):
@@ -134,6 +150,32 @@ class CSplineInterpolator(PiecewisePolynomialInterpolator):
 			poly = Polynomial([ a, b, c, d ], xoffset = -xoffset)
 			self._add_poly(xoffset, poly)
 
+class PolyfitInterpolator(PiecewisePolynomialInterpolator):
+	"""Least-squares fit of a piecewise polynomial with the given number of
+	segments, which does not pass through every point (unlike the spline)
+	but smoothes noisy data. Knots are placed so that every segment covers
+	about the same number of points."""
+
+	def __init__(self, points, degree = 3, segments = 8, continuity = None, interpolate_knots = False):
+		self._degree = degree
+		self._segments = segments
+		self._continuity = continuity
+		self._interpolate_knots = interpolate_knots
+		self._fit = None
+		PiecewisePolynomialInterpolator.__init__(self, points)
+
+	@property
+	def fit(self):
+		return self._fit
+
+	def _calculate(self):
+		segments = min(self._segments, len(self._points) - 1)
+		knot_points = [ self._points[round(i * (len(self._points) - 1) / segments)] for i in range(segments + 1) ]
+		self._fit = PiecewisePolynomialFit(degree = self._degree, knots = [ x for (x, y) in knot_points ], continuity = self._continuity)
+		fixed_points = knot_points if self._interpolate_knots else ()
+		for (xoffset, poly) in self._fit.fit(self._points, fixed_points = fixed_points):
+			self._add_poly(xoffset, poly)
+
 if __name__ == "__main__":
 #	interp = LinearInterpolation([ (1, 10), (2, 20) ])
 #	assert(interp[0] == 0)
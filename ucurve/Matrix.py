@@ -19,6 +19,10 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import array
+import operator
+import itertools
+
 class MatrixException(Exception): pass
 class SolveException(MatrixException): pass
 class InvalidParametersException(SolveException): pass
@@ -26,11 +30,38 @@ class SingularEquationSystemException(SolveException): pass
 class InvalidArgumentException(MatrixException): pass
 
 class Matrix(object):
+	"""Dense m x n matrix. Elements are stored row-major in a flat array of
+	doubles; element access is 1-based, i.e., M[(1, 1)] is the top left
+	element. Products are computed row by row with map() over memoryview
+	slices, which keeps the inner loops in C."""
+
 	def __init__(self, values):
-		self._data = list(list(row) for row in values)
-		self._m = len(self._data)
-		self._n = len(self._data[0])
-		assert(len(row) == self._n for row in self._data)
+		rows = [ list(row) for row in values ]
+		self._m = len(rows)
+		self._n = len(rows[0])
+		if any(len(row) != self._n for row in rows):
+			raise InvalidArgumentException("All rows of a matrix need to have the same length.")
+		self._data = array.array("d", itertools.chain.from_iterable(rows))
+
+	@classmethod
+	def _from_array(cls, m, n, data):
+		matrix = cls.__new__(cls)
+		matrix._m = m
+		matrix._n = n
+		matrix._data = data
+		return matrix
+
+	@classmethod
+	def zeros(cls, m, n = None):
+		if n is None:
+			n = m
+		return cls._from_array(m, n, array.array("d", bytes(8 * m * n)))
+
+	@classmethod
+	def identity(cls, n):
+		matrix = cls.zeros(n)
+		matrix._data[::n + 1] = array.array("d", [ 1 ]) * n
+		return matrix
 
 	@property
 	def m(self):
@@ -50,18 +81,52 @@ class Matrix(object):
 
 	def __getitem__(self, value):
 		(i, j) = value
-		return self._data[i - 1][j - 1]
+		return self._data[(i - 1) * self._n + (j - 1)]
+
+	def __setitem__(self, key, value):
+		(i, j) = key
+		self._data[(i - 1) * self._n + (j - 1)] = value
+
+	def row(self, i):
+		return self._data[(i - 1) * self._n : i * self._n]
+
+	def column(self, j):
+		return self._data[j - 1 :: self._n]
+
+	def _rows(self):
+		view = memoryview(self._data)
+		return [ view[i * self._n : (i + 1) * self._n] for i in range(self._m) ]
+
+	def transpose(self):
+		data = array.array("d")
+		for j in range(1, self._n + 1):
+			data.extend(self.column(j))
+		return self._from_array(self._n, self._m, data)
 
 	def vmul(self, vector):
 		if len(vector) != self.n:
 			raise InvalidArgumentException("Tried to multiply a vector of length %d with a %d x %d matrix (need a %d element vector)." % (len(vector), self.m, self.n, self.n))
-		result = [ ]
-		for i in range(1, self.m + 1):
-			value = 0
-			for j in range(1, self.n + 1):
-				value += self[(i, j)] * vector[j - 1]
-			result.append(value)
-		return result
+		return [ sum(map(operator.mul, row, vector)) for row in self._rows() ]
+
+	def matmul(self, other):
+		if other.m != self.n:
+			raise InvalidArgumentException("Tried to multiply a %d x %d matrix with a %d x %d matrix." % (self.m, self.n, other.m, other.n))
+		columns = [ other.column(j) for j in range(1, other.n + 1) ]
+		data = array.array("d")
+		for row in self._rows():
+			data.extend(sum(map(operator.mul, row, column)) for column in columns)
+		return Matrix._from_array(self.m, other.n, data)
+
+	def __matmul__(self, other):
+		return self.matmul(other)
+
+	def lu(self):
+		return LUDecomposition(self)
+
+	def solve(self, rhs):
+		"""Solve the square equation system M x = rhs by LU decomposition
+		with partial pivoting."""
+		return self.lu().solve(rhs)
 
 	def dump(self):
 		print("m x n = %d x %d %s:" % (self.m, self.n, self.__class__.__name__))
@@ -72,11 +137,195 @@ class Matrix(object):
 			print(" ".join("%8.3f" % (value) for value in line))
 		print()
 
-class TridiagonalMatrix(Matrix):
-	def __init__(self, n):
+class LUDecomposition(object):
+	"""LU decomposition with partial (row) pivoting, P M = L U. Once
+	decomposed, equation systems with any number of right hand sides can be
+	solved in O(n^2) each."""
+
+	def __init__(self, matrix):
+		if matrix.m != matrix.n:
+			raise InvalidArgumentException("LU decomposition requires a square matrix, got %d x %d." % (matrix.m, matrix.n))
+		# Rows are kept as lists during elimination, list(map()) is notably
+		# faster than building arrays from an iterator
+		n = matrix.n
+		rows = [ list(matrix.row(i)) for i in range(1, n + 1) ]
+		permutation = list(range(n))
+		swaps = 0
+		for k in range(n):
+			pivot = max(range(k, n), key = lambda i: abs(rows[i][k]))
+			if rows[pivot][k] == 0:
+				raise SingularEquationSystemException("Matrix is singular, no pivot found for column %d." % (k + 1))
+			if pivot != k:
+				(rows[k], rows[pivot]) = (rows[pivot], rows[k])
+				(permutation[k], permutation[pivot]) = (permutation[pivot], permutation[k])
+				swaps += 1
+			pivot_row = rows[k]
+			pivot_value = pivot_row[k]
+			pivot_tail = pivot_row[k + 1:]
+			for i in range(k + 1, n):
+				row = rows[i]
+				factor = row[k] / pivot_value
+				# The factor is stored in the lower part, where U is zero
+				row[k] = factor
+				if factor != 0:
+					row[k + 1:] = map(operator.sub, row[k + 1:], map(factor.__mul__, pivot_tail))
+		self._n = n
+		self._rows = rows
+		self._permutation = permutation
+		self._swaps = swaps
+
+	@property
+	def determinant(self):
+		result = -1 if (self._swaps % 2) else 1
+		for (k, row) in enumerate(self._rows):
+			result *= row[k]
+		return result
+
+	def solve(self, rhs):
+		if len(rhs) != self._n:
+			raise InvalidParametersException("RHS vector with %d entries given, expected %d." % (len(rhs), self._n))
+		# Forward substitution, L has an implicit unit diagonal
+		y = [ rhs[index] for index in self._permutation ]
+		for (i, row) in enumerate(self._rows):
+			y[i] -= sum(map(operator.mul, row[:i], y[:i]))
+		# Back substitution
+		x = [ 0 ] * self._n
+		for i in reversed(range(self._n)):
+			row = self._rows[i]
+			x[i] = (y[i] - sum(map(operator.mul, row[i + 1:], x[i + 1:]))) / row[i]
+		return x
+
+class BandedMatrix(Matrix):
+	"""Square n x n matrix of which only a band of lower sub-diagonals and
+	upper super-diagonals is non-zero, e.g., lower = upper = 2 for a
+	pentadiagonal matrix. Every row stores only the elements within the
+	band, so memory and solving time grow linearly with n."""
+
+	def __init__(self, n, lower, upper):
 		self._m = n
 		self._n = n
-		self._data = [ [ 0, 0, 0 ] for i in range(self._n) ]
+		self._lower = lower
+		self._upper = upper
+		self._width = lower + upper + 1
+		self._data = array.array("d", bytes(8 * n * self._width))
+
+	@classmethod
+	def from_data(cls, matrix_data, lower, upper):
+		if len(matrix_data) != len(matrix_data[0]):
+			raise InvalidArgumentException("Not a square matrix.")
+		matrix = cls(len(matrix_data), lower, upper)
+		for (i, row) in enumerate(matrix_data, 1):
+			for (j, value) in enumerate(row, 1):
+				if value != 0:
+					matrix[(i, j)] = value
+		return matrix
+
+	@property
+	def lower(self):
+		return self._lower
+
+	@property
+	def upper(self):
+		return self._upper
+
+	def _index(self, i, j):
+		offset = j - i + self._lower
+		if not (0 <= offset < self._width):
+			return None
+		return (i - 1) * self._width + offset
+
+	def __getitem__(self, value):
+		index = self._index(*value)
+		return 0 if (index is None) else self._data[index]
+
+	def __setitem__(self, key, value):
+		index = self._index(*key)
+		if index is None:
+			raise InvalidArgumentException("Element (%d, %d) is outside of the band of a matrix with %d lower and %d upper diagonals." % (key[0], key[1], self._lower, self._upper))
+		self._data[index] = value
+
+	def _band_row(self, i):
+		"""Return (first column, values) of the 0-based row i, clipped to the
+		matrix dimensions."""
+		first = i - self._lower
+		values = self._data[i * self._width : (i + 1) * self._width]
+		if first < 0:
+			values = values[-first:]
+			first = 0
+		return (first, values[:self._n - first])
+
+	def row(self, i):
+		(first, values) = self._band_row(i - 1)
+		row = array.array("d", bytes(8 * self._n))
+		row[first : first + len(values)] = values
+		return row
+
+	def column(self, j):
+		return array.array("d", (self[(i, j)] for i in range(1, self._n + 1)))
+
+	def _rows(self):
+		return [ self.row(i) for i in range(1, self._n + 1) ]
+
+	def vmul(self, vector):
+		if len(vector) != self.n:
+			raise InvalidArgumentException("Tried to multiply a vector of length %d with a %d x %d matrix (need a %d element vector)." % (len(vector), self.m, self.n, self.n))
+		result = [ ]
+		for i in range(self._n):
+			(first, values) = self._band_row(i)
+			result.append(sum(map(operator.mul, values, vector[first : first + len(values)])))
+		return result
+
+	def solve(self, rhs):
+		"""Solve M x = rhs by Gaussian elimination with partial pivoting
+		within the band. Row swaps widen the upper band of U by at most the
+		number of lower diagonals, so the work is O(n * lower * (lower +
+		upper)). The matrix itself is not modified."""
+		if len(rhs) != self._n:
+			raise InvalidParametersException("RHS vector with %d entries given, expected %d." % (len(rhs), self._n))
+		n = self._n
+		rhs = list(rhs)
+		rows = [ self._band_row(i) for i in range(n) ]
+
+		def value_at(row, column):
+			(first, values) = row
+			offset = column - first
+			return values[offset] if (0 <= offset < len(values)) else 0
+
+		for k in range(n):
+			last = min(n - 1, k + self._lower)
+			pivot = max(range(k, last + 1), key = lambda i: abs(value_at(rows[i], k)))
+			if value_at(rows[pivot], k) == 0:
+				raise SingularEquationSystemException("Matrix is singular, no pivot found for column %d." % (k + 1))
+			if pivot != k:
+				(rows[k], rows[pivot]) = (rows[pivot], rows[k])
+				(rhs[k], rhs[pivot]) = (rhs[pivot], rhs[k])
+
+			# From now on, all rows that take part start at column k
+			(first, values) = rows[k]
+			pivot_values = values[k - first:]
+			rows[k] = (k, pivot_values)
+			pivot_tail = pivot_values[1:]
+			for i in range(k + 1, last + 1):
+				(first, values) = rows[i]
+				values = values[k - first:]
+				factor = values[0] / pivot_values[0] if (len(values) > 0) else 0
+				values = values[1:]
+				if factor != 0:
+					if len(values) < len(pivot_tail):
+						values.extend(array.array("d", bytes(8 * (len(pivot_tail) - len(values)))))
+					values[:len(pivot_tail)] = array.array("d", map(operator.sub, values[:len(pivot_tail)], map(factor.__mul__, pivot_tail)))
+					rhs[i] -= factor * rhs[k]
+				rows[i] = (k + 1, values)
+
+		x = [ 0 ] * n
+		for k in reversed(range(n)):
+			(first, values) = rows[k]
+			x[k] = (rhs[k] - sum(map(operator.mul, values[1:], x[k + 1 : k + len(values)]))) / values[0]
+		return x
+
+class TridiagonalMatrix(BandedMatrix):
+	def __init__(self, n):
+		BandedMatrix.__init__(self, n, 1, 1)
 
 	@classmethod
 	def from_data(cls, matrix_data):
@@ -91,15 +340,15 @@ class TridiagonalMatrix(Matrix):
 	def set_row(self, i, values):
 		if len(values) == 2:
 			if i == 1:
-				self._data[i - 1] = [ 0, values[0], values[1] ]
+				values = [ 0, values[0], values[1] ]
 			elif i == self.n:
-				self._data[i - 1] = [ values[0], values[1], 0 ]
+				values = [ values[0], values[1], 0 ]
 			else:
 				raise InvalidArgumentException("2 values given for rows different than first and last.")
 		else:
 			if len(values) != 3:
 				raise InvalidArgumentException("Expected three values, got %d." % (len(values)))
-			self._data[i - 1] = list(values)
+		self._data[3 * (i - 1) : 3 * i] = array.array("d", values)
 		return self
 
 	def solve(self, rhs):
@@ -107,34 +356,22 @@ class TridiagonalMatrix(Matrix):
 		matrix data itself."""
 		if len(rhs) != self.m:
 			raise InvalidParametersException("RHS vector with %d entries given, expected %d." % (len(rhs), self.m))
-		rhs = list(rhs)
-
-		for (i, ((a, b, c), d)) in enumerate(zip(self._data, rhs)):
-			if i > 0:
-				cprev = self._data[i - 1][2]
-				dprev = rhs[i - 1]
-			else:
-				cprev = 0
-				dprev = 0
-
-			cx = c / (b - cprev * a)
-			dx = (d - (dprev * a)) / (b - (cprev * a))
-			self._data[i][2] = cx
-			rhs[i] = dx
-
 
-		for i in reversed(range(len(rhs) - 1)):
-			c = self._data[i][2]
-			rhs[i] = rhs[i] - (c * rhs[i + 1])
+		cs = array.array("d")
+		ds = [ ]
+		cprev = 0
+		dprev = 0
+		for (a, b, c, d) in zip(self._data[0::3], self._data[1::3], self._data[2::3], rhs):
+			denominator = b - cprev * a
+			cprev = c / denominator
+			dprev = (d - dprev * a) / denominator
+			cs.append(cprev)
+			ds.append(dprev)
+		self._data[2::3] = cs
 
-		return rhs
-
-	def __getitem__(self, value):
-		(i, j) = value
-		if abs(i - j) <= 1:
-			return self._data[i - 1][j - i + 1]
-		else:
-			return 0
+		for i in reversed(range(len(ds) - 1)):
+			ds[i] -= cs[i] * ds[i + 1]
+		return ds
 
 if __name__ == "__main__":
 	import random
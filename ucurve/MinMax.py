@@ -19,10 +19,19 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import operator
 import collections
 
 class MinMax(object):
-	_Point = collections.namedtuple("Point", [ "x", "y", "info" ])
+	"""Accumulator for the extreme points and the average Y of a set of
+	points. Points can be added one by one or in batches and the
+	accumulators of several parts of the data (e.g., chunks processed in
+	parallel) can be merged. On ties, the earliest point always wins, so
+	merging partial results in order gives the same result as adding all
+	points to a single accumulator."""
+	_Point = collections.namedtuple("Point", [ "x", "y", "info" ], defaults = [ None ])
+	_get_x = operator.itemgetter(0)
+	_get_y = operator.itemgetter(1)
 
 	def __init__(self):
 		self._ysum = 0
@@ -38,6 +47,10 @@ class MinMax(object):
 	def have_data(self):
 		return self._valcnt > 0
 
+	@property
+	def count(self):
+		return self._valcnt
+
 	@property
 	def yavg(self):
 		return self._ysum / self._valcnt
@@ -66,16 +79,52 @@ class MinMax(object):
 	def yabsmax(self):
 		return self._yabsmax
 
+	@classmethod
+	def from_points(cls, points):
+		"""Create an accumulator from a sequence of (x, y) or (x, y, info)
+		tuples. Evaluates each extreme with a single builtin min()/max() call
+		instead of comparing point by point."""
+		if not isinstance(points, (list, tuple)):
+			points = list(points)
+		minmax = cls()
+		if len(points) > 0:
+			abs_y = lambda point: abs(point[1])
+			minmax._xmin = cls._Point(*min(points, key = cls._get_x))
+			minmax._xmax = cls._Point(*max(points, key = cls._get_x))
+			minmax._ymin = cls._Point(*min(points, key = cls._get_y))
+			minmax._ymax = cls._Point(*max(points, key = cls._get_y))
+			minmax._yabsmin = cls._Point(*min(points, key = abs_y))
+			minmax._yabsmax = cls._Point(*max(points, key = abs_y))
+			minmax._ysum = sum([ point[1] for point in points ])
+			minmax._valcnt = len(points)
+		return minmax
+
 	def feed(self, iteratable):
-		for (x, y) in iteratable:
-			self.add(x, y)
-		return self
+		return self.merge(self.from_points(iteratable))
 
-	def _eval(self, oldpt, newpt, evalfunction):
-		if evalfunction(oldpt, newpt):
-			return newpt
+	def merge(self, other):
+		"""Merge the accumulator of points that follow the ones of this
+		accumulator into this one and return self."""
+		if not other.have_data:
+			return self
+		if not self.have_data:
+			(self._xmin, self._xmax, self._ymin, self._ymax, self._yabsmin, self._yabsmax) = (other._xmin, other._xmax, other._ymin, other._ymax, other._yabsmin, other._yabsmax)
 		else:
-			return oldpt
+			if other._xmin.x < self._xmin.x:
+				self._xmin = other._xmin
+			if other._xmax.x > self._xmax.x:
+				self._xmax = other._xmax
+			if other._ymin.y < self._ymin.y:
+				self._ymin = other._ymin
+			if other._ymax.y > self._ymax.y:
+				self._ymax = other._ymax
+			if abs(other._yabsmin.y) < abs(self._yabsmin.y):
+				self._yabsmin = other._yabsmin
+			if abs(other._yabsmax.y) > abs(self._yabsmax.y):
+				self._yabsmax = other._yabsmax
+		self._ysum += other._ysum
+		self._valcnt += other._valcnt
+		return self
 
 	def add(self, x, y, info = None):
 		point = self._Point(x = x, y = y, info = info)
@@ -87,12 +136,19 @@ class MinMax(object):
 			self._yabsmin = point
 			self._yabsmax = point
 		else:
-			self._xmin = self._eval(self._xmin, point, lambda old, new: new.x < old.x)
-			self._xmax = self._eval(self._xmax, point, lambda old, new: new.x > old.x)
-			self._ymin = self._eval(self._ymin, point, lambda old, new: new.y < old.y)
-			self._ymax = self._eval(self._ymax, point, lambda old, new: new.y > old.y)
-			self._yabsmin = self._eval(self._yabsmin, point, lambda old, new: abs(new.y) < abs(old.y))
-			self._yabsmax = self._eval(self._yabsmax, point, lambda old, new: abs(new.y) > abs(old.y))
+			if x < self._xmin.x:
+				self._xmin = point
+			if x > self._xmax.x:
+				self._xmax = point
+			if y < self._ymin.y:
+				self._ymin = point
+			if y > self._ymax.y:
+				self._ymax = point
+			if abs(y) < abs(self._yabsmin.y):
+				self._yabsmin = point
+			if abs(y) > abs(self._yabsmax.y):
+				self._yabsmax = point
 
 		self._ysum += y
 		self._valcnt += 1
+		return self
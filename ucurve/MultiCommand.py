@@ -25,6 +25,7 @@
 
 import sys
 import collections
+import importlib
 
 from .FriendlyArgumentParser import FriendlyArgumentParser
 from .PrefixMatcher import PrefixMatcher
@@ -103,11 +104,21 @@ class MultiCommand(object):
 		args = parser.parse_args(cmdline[1:])
 		return self.ParseResult(command, args)
 
+	@staticmethod
+	def _resolve_action(action):
+		"""Actions may be given as a "package.module.ClassName" string; the
+		module is then only imported when the command is actually run."""
+		if isinstance(action, str):
+			(module_name, attribute) = action.rsplit(".", maxsplit = 1)
+			action = getattr(importlib.import_module(module_name), attribute)
+		return action
+
 	def run(self, cmdline, silent = False):
 		parseresult = self.parse(cmdline, silent)
 		if parseresult.cmd.action is None:
 			raise Exception("Should run command '%s', but no action was registered." % (parseresult.cmd.name))
-		parseresult.cmd.action(parseresult.cmd.name, parseresult.args)
+		action = self._resolve_action(parseresult.cmd.action)
+		action(parseresult.cmd.name, parseresult.args)
 
 if __name__ == "__main__":
 	mc = MultiCommand()
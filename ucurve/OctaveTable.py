@@ -0,0 +1,197 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import bisect
+from ucurve.Tools import CTypeTools
+
+class OctaveTable(object):
+	"""Lookup table for inputs that span several decades. The offset of an
+	input from the minimum X value is split into power-of-two octaves
+	([2^(o-1), 2^o) for octave o), each of which is divided into the same
+	number of uniform segments; offsets below that number have segments of
+	width one. Only the Y values at the segment boundaries are stored, in
+	one array: the generated code finds the octave of an offset by counting
+	its leading zeros and then indexes the array directly, so a lookup
+	takes constant time and needs neither a search nor a division.
+
+	With 2^bits segments per octave, an offset v is shifted right by
+	shift(v) = max(bitlength(v) - 1 - bits, 0) bits and found at index
+	2^bits * shift(v) + (v >> shift(v)). Interpolation within a segment of
+	width 2^shift(v) is done with integers exactly as in the generated
+	code (see lookup())."""
+
+	def __init__(self, xmin, xmax, bits, yvalues = None):
+		if xmax < xmin:
+			raise Exception("Octave table needs xmax >= xmin, but got %d and %d." % (xmin, xmax))
+		self._xmin = xmin
+		self._xmax = xmax
+		self._bits = bits
+		self._yvalues = yvalues
+
+	@property
+	def xmin(self):
+		return self._xmin
+
+	@property
+	def xmax(self):
+		return self._xmax
+
+	@property
+	def bits(self):
+		return self._bits
+
+	@property
+	def entries_per_octave(self):
+		return 1 << self._bits
+
+	@property
+	def span(self):
+		return self._xmax - self._xmin
+
+	@property
+	def yvalues(self):
+		return self._yvalues
+
+	def shift(self, offset):
+		return max(offset.bit_length() - 1 - self._bits, 0)
+
+	def index(self, offset):
+		shift = self.shift(offset)
+		return (self.entries_per_octave * shift) + (offset >> shift)
+
+	def sample_offset(self, index):
+		"""Offset from xmin of the segment boundary at the given index."""
+		shift = max(index // self.entries_per_octave - 1, 0)
+		return (index - (self.entries_per_octave * shift)) << shift
+
+	@property
+	def size(self):
+		"""Number of Y values in the table: up to and including the segment
+		boundary at or right of the maximum X."""
+		last = self.index(self.span)
+		return last + 1 if (self.sample_offset(last) == self.span) else last + 2
+
+	def _interpolate(self, offset, yvalues):
+		shift = self.shift(offset)
+		index = (self.entries_per_octave * shift) + (offset >> shift)
+		window = offset & ((1 << shift) - 1)
+		(low, high) = (yvalues[index], yvalues[index + 1]) if (window > 0) else (yvalues[index], yvalues[index])
+		if high >= low:
+			return low + ((window * (high - low)) >> shift)
+		else:
+			return low - ((window * (low - high)) >> shift)
+
+	def lookup(self, x):
+		"""Integer lookup, bit-exact with the generated C code."""
+		if x < self._xmin:
+			return self._yvalues[0]
+		return self._interpolate(min(x, self._xmax) - self._xmin, self._yvalues)
+
+	@classmethod
+	def create(cls, points, bits):
+		"""Create the table for the given sorted (x, y) points (which may
+		have non-integer Y values) with 2^bits segments per octave. Y values
+		at the segment boundaries are linearly interpolated from the points
+		and rounded. The X range is that of the points, rounded to
+		integers."""
+		xvalues = [ x for (x, y) in points ]
+		yvalues = [ y for (x, y) in points ]
+		table = cls(round(xvalues[0]), round(xvalues[-1]), bits)
+
+		def y_at(x):
+			index = bisect.bisect_left(xvalues, x)
+			if index == 0:
+				return yvalues[0]
+			elif index == len(xvalues):
+				return yvalues[-1]
+			(x0, y0) = (xvalues[index - 1], yvalues[index - 1])
+			(x1, y1) = (xvalues[index], yvalues[index])
+			return y0 + (x - x0) / (x1 - x0) * (y1 - y0)
+
+		table_yvalues = [ round(y_at(table.xmin + table.sample_offset(index))) for index in range(table.size) ]
+		last = table.index(table.span)
+		if table.sample_offset(last) != table.span:
+			# The last boundary lies right of xmax: extrapolate the last
+			# segment so that it hits the value at xmax
+			low_offset = table.sample_offset(last)
+			low = table_yvalues[last]
+			width = table.sample_offset(last + 1) - low_offset
+			table_yvalues[last + 1] = round(low + (y_at(table.xmax) - low) * width / (table.span - low_offset))
+		table._yvalues = table_yvalues
+		return table
+
+	def errors(self, points):
+		"""Signed maximum error (y_interp - y) for the given integer (x, y)
+		points, overall and per segment (as a dictionary index -> error)."""
+		max_error = 0
+		segment_errors = { }
+		for (x, y) in points:
+			offset = x - self._xmin
+			error = self._interpolate(offset, self._yvalues) - y
+			index = self.index(offset)
+			if abs(error) > abs(segment_errors.get(index, 0)):
+				segment_errors[index] = error
+			if abs(error) > abs(max_error):
+				max_error = error
+		return (max_error, segment_errors)
+
+	@classmethod
+	def fit(cls, points, rounded_points, max_error, bits = None):
+		"""Create the table with the fewest segments per octave for which the
+		error to the rounded points stays within max_error (or with 2^bits
+		segments per octave, if given). Returns the table and its maximum
+		error."""
+		if bits is not None:
+			table = cls.create(points, bits)
+			return (table, table.errors(rounded_points)[0])
+		span = round(points[-1][0]) - round(points[0][0])
+		for bits in range(max(span.bit_length(), 1)):
+			table = cls.create(points, bits)
+			error = table.errors(rounded_points)[0]
+			if abs(error) <= abs(max_error):
+				break
+		return (table, error)
+
+	# Count leading zeros builtins by the minimum width of their argument
+	# type that C guarantees (int is only 16 bit on AVR, long 32 bit on AVR
+	# and 32-bit ARM)
+	_CLZ_BUILTINS = [
+		(2, "__builtin_clz", "unsigned int"),
+		(4, "__builtin_clzl", "unsigned long"),
+		(8, "__builtin_clzll", "unsigned long long"),
+	]
+
+	def c_types(self):
+		"""C types that the generated lookup code needs."""
+		max_window = max((1 << self.shift(self.span)) - 1, 0)
+		max_yspan = max([ abs(y1 - y0) for (y0, y1) in zip(self._yvalues, self._yvalues[1:]) ] + [ 0 ])
+		offset_type = CTypeTools.get_type([ 0, self.span ])
+		(clz_builtin, clz_type) = next((builtin, typename) for (size, builtin, typename) in self._CLZ_BUILTINS if CTypeTools.sizeof(offset_type) <= size)
+		return {
+			"in_type":				CTypeTools.get_type([ self._xmin, self._xmax ]),
+			"extd_in_type":			CTypeTools.get_type([ self._xmin - 10, self._xmax + 10 ]),
+			"out_type":				CTypeTools.get_type(self._yvalues),
+			"offset_type":			offset_type,
+			"clz_builtin":			clz_builtin,
+			"clz_type":				clz_type,
+			"idx_type":				CTypeTools.get_type([ 0, self.size ]),
+			"win_mul_yspan_type":	CTypeTools.get_type([ 0, max_window * max_yspan ]),
+		}
@@ -0,0 +1,171 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import array
+import itertools
+
+class PointSet(object):
+	"""Columnar storage for a set of X/Y points. X and Y values are held in
+	two flat arrays (plus an optional error column) instead of a list of
+	tuples, which keeps memory usage at a few bytes per point. All
+	operations that change the data return a new PointSet and process whole
+	columns in one pass."""
+
+	def __init__(self, x = None, y = None, error = None, typecode = "d"):
+		self._typecode = typecode
+		self._x = self._column(x)
+		self._y = self._column(y)
+		if len(self._x) != len(self._y):
+			raise Exception("X and Y columns differ in length (%d vs %d)." % (len(self._x), len(self._y)))
+		if error is None:
+			self._error = None
+		else:
+			self._error = array.array("d", error)
+			if len(self._error) != len(self._x):
+				raise Exception("Error column has %d entries, expected %d." % (len(self._error), len(self._x)))
+
+	def _column(self, values):
+		if values is None:
+			return array.array(self._typecode)
+		elif isinstance(values, array.array) and (values.typecode == self._typecode):
+			return values
+		else:
+			return array.array(self._typecode, values)
+
+	@classmethod
+	def from_points(cls, points, typecode = "d"):
+		point_set = cls(typecode = typecode)
+		for (x, y) in points:
+			point_set.append(x, y)
+		return point_set
+
+	@property
+	def typecode(self):
+		return self._typecode
+
+	@property
+	def x(self):
+		return self._x
+
+	@property
+	def y(self):
+		return self._y
+
+	@property
+	def error(self):
+		return self._error
+
+	@property
+	def points(self):
+		return list(self)
+
+	def append(self, x, y):
+		self._x.append(x)
+		self._y.append(y)
+
+	def is_sorted(self, reverse = False):
+		if not reverse:
+			return all(x0 <= x1 for (x0, x1) in zip(self._x, itertools.islice(self._x, 1, None)))
+		else:
+			return all(x0 >= x1 for (x0, x1) in zip(self._x, itertools.islice(self._x, 1, None)))
+
+	def _take(self, indices):
+		x = self._x
+		y = self._y
+		return PointSet(x = array.array(self._typecode, (x[i] for i in indices)), y = array.array(self._typecode, (y[i] for i in indices)), typecode = self._typecode)
+
+	def sort_unique(self):
+		"""Sort points by ascending X value. When the same X value occurs
+		multiple times, the point that came last wins (i.e., the same
+		semantics as inserting all points into a dictionary keyed by X)."""
+		x = self._x
+		if self.is_sorted():
+			indices = range(len(x))
+		elif self.is_sorted(reverse = True):
+			indices = range(len(x) - 1, -1, -1)
+		else:
+			indices = array.array("q", sorted(range(len(x)), key = x.__getitem__))
+
+		# Of every run of identical X values, keep the point with the highest
+		# original index
+		unique = array.array("q")
+		for (xvalue, run) in itertools.groupby(indices, key = x.__getitem__):
+			unique.append(max(run))
+		if (len(unique) == len(x)) and (indices == range(len(x))):
+			return self
+		return self._take(unique)
+
+	def transform(self, xfunction, yfunction):
+		"""Apply the two functions to every point. Both receive the point's
+		(x, y) as arguments and compute the new X and Y value respectively."""
+		return PointSet(x = map(xfunction, self._x, self._y), y = map(yfunction, self._x, self._y))
+
+	def filter_x(self, xmin = None, xmax = None):
+		if (xmin is None) and (xmax is None):
+			return self
+		if xmin is None:
+			xmin = float("-inf")
+		if xmax is None:
+			xmax = float("inf")
+		return self._take(array.array("q", (i for (i, x) in enumerate(self._x) if xmin <= x <= xmax)))
+
+	@staticmethod
+	def round_points(points):
+		"""Round all points of the iterable to integer values. When multiple
+		points round to the same X value, the one whose X value was closest
+		to the integer is kept (on a tie, the smaller rounded Y value).
+		Candidates for the same integer X must be adjacent, i.e., the input
+		must be sorted by X (in either direction). Rounded points are yielded
+		as soon as they are final."""
+		last_x = None
+		for (x, y) in points:
+			rndx = round(x)
+			candidate = (abs(rndx - x), round(y))
+			if rndx != last_x:
+				if last_x is not None:
+					yield (last_x, best[1])
+				last_x = rndx
+				best = candidate
+			elif candidate < best:
+				best = candidate
+		if last_x is not None:
+			yield (last_x, best[1])
+
+	def round(self):
+		"""Round all points to integer values (see round_points()). Requires
+		the point set to be sorted. The result uses an integer typecode."""
+		return PointSet.from_points(self.round_points(self), typecode = "q")
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			error = None if (self._error is None) else self._error[index]
+			return PointSet(x = self._x[index], y = self._y[index], error = error, typecode = self._typecode)
+		else:
+			return (self._x[index], self._y[index])
+
+	def __iter__(self):
+		return zip(self._x, self._y)
+
+	def __len__(self):
+		return len(self._x)
+
+	def __str__(self):
+		return "PointSet<%d points>" % (len(self))
@@ -0,0 +1,91 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+import array
+import itertools
+import contextlib
+from ucurve.Tools import IOTools
+
+class PointWriter(object):
+	"""Buffered writer for (x, y) points or (x, y0, y1, ...) rows with
+	several Y columns. Points are formatted and written in chunks instead of
+	one write call per point. The formats are "text" (six decimal places, as
+	printed by "%f"), "precise" (the shortest representation that reads back
+	as exactly the same float) and "binary" (little-endian float64 records
+	without any header). Comments are only written in the text formats."""
+	_FORMATS = [ "text", "precise", "binary" ]
+
+	def __init__(self, f, fmt = "text", chunk_size = 65536):
+		if fmt not in self._FORMATS:
+			raise Exception("Unknown output format '%s', must be one of %s." % (fmt, ", ".join(self._FORMATS)))
+		self._f = f
+		self._format = fmt
+		self._chunk_size = chunk_size
+		self._count = 0
+
+	@classmethod
+	def formats(cls):
+		return list(cls._FORMATS)
+
+	@classmethod
+	@contextlib.contextmanager
+	def open(cls, filename, fmt = "text", chunk_size = 65536):
+		"""Open a file for writing points; "-" or None refer to stdout."""
+		with IOTools.open_write(filename, "wb" if (fmt == "binary") else "w") as f:
+			yield cls(f, fmt = fmt, chunk_size = chunk_size)
+
+	@property
+	def count(self):
+		"""Number of points written so far."""
+		return self._count
+
+	def write_comment(self, text = ""):
+		if self._format == "binary":
+			return
+		if text == "":
+			print(file = self._f)
+		else:
+			print("# " + text, file = self._f)
+
+	def _encode(self, chunk):
+		if self._format == "text":
+			line = " ".join([ "%f" ] * len(chunk[0])) + "\n"
+			return "".join(line % row for row in chunk)
+		elif self._format == "precise":
+			return "".join(" ".join(repr(float(value)) for value in row) + "\n" for row in chunk)
+		else:
+			data = array.array("d", itertools.chain.from_iterable(chunk))
+			if sys.byteorder != "little":
+				data.byteswap()
+			return data.tobytes()
+
+	def write_points(self, points):
+		"""Write all points (or rows) of an iterable and return self. All rows
+		need to have the same number of columns."""
+		points = iter(points)
+		while True:
+			chunk = list(itertools.islice(points, self._chunk_size))
+			if len(chunk) == 0:
+				break
+			self._f.write(self._encode(chunk))
+			self._count += len(chunk)
+		return self
@@ -30,7 +30,7 @@ class Polynomial(object):
 		(x1, y1) = pt1
 		b = (y1 - y0) / (x1 - x0)
 		a = y0
-		return cls([ a, b ])
+		return cls([ a, b ], xoffset = -x0)
 
 	def __getitem__(self, x):
 		if self._xoffset is not None:
@@ -41,7 +41,7 @@ class Polynomial(object):
 		return result
 
 	def diff(self):
-		return Polynomial([ (coeff * (exponent + 1)) for (exponent, coeff) in enumerate(self._coeffs[1:])])
+		return Polynomial([ (coeff * (exponent + 1)) for (exponent, coeff) in enumerate(self._coeffs[1:]) ], xoffset = self._xoffset)
 
 	@classmethod
 	def _varname(cls, number, first_var = "a", index = None):
@@ -51,7 +51,15 @@ class Polynomial(object):
 			return chr(ord("a") + number) + "_%d" % (index)
 
 	@classmethod
-	def equals(cls, degree, x, y, index = None, diffed = 0):
+	def equals(cls, degree, x, y, index = None, diffed = 0, next_x = None):
+		"""Build a linear equation in the coefficients of a polynomial of the
+		given degree, returned as a (lhs, rhs) tuple where lhs maps variable
+		names (a, b, ... with an optional _index suffix) to their factors.
+		If y is given, the equation states that the polynomial (or its
+		derivative, if diffed > 0) equals y at x. If y is None, it states
+		that polynomial index equals polynomial index + 1 at x; if the
+		neighbouring polynomial uses a different coordinate system, the same
+		point in its coordinates is given as next_x."""
 		lhs = { }
 		if y is not None:
 			# Have a concrete RHS value for Y
@@ -69,7 +77,7 @@ class Polynomial(object):
 
 			# Create sub-polys
 			lhs_eqn = cls.equals(degree = degree, x = x, y = 0, index = index, diffed = diffed)
-			rhs_eqn = cls.equals(degree = degree, x = x, y = 0, index = index + 1, diffed = diffed)
+			rhs_eqn = cls.equals(degree = degree, x = x if (next_x is None) else next_x, y = 0, index = index + 1, diffed = diffed)
 
 			# Merge
 			for (varname, coeff) in lhs_eqn[0].items():
@@ -0,0 +1,164 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import bisect
+from ucurve.Polynomial import Polynomial
+from ucurve.Matrix import BandedMatrix, SingularEquationSystemException
+
+class PiecewisePolynomialFit(object):
+	"""Fits a piecewise polynomial of arbitrary degree with the given knots
+	to data points. Adjacent polynomials are constrained to be continuous
+	in their value and the first continuity derivatives (i.e., C^continuity
+	with continuity = degree - 1 by default, as for splines); additionally,
+	the curve can be forced through fixed points. All remaining freedom is
+	used to minimize the squared error to the data points.
+
+	Every equation is built by Polynomial.equals() as a sparse mapping of
+	coefficient names to factors. The equality-constrained least squares
+	problem is solved through its KKT system, in which the unknowns are
+	ordered segment by segment (coefficients, then the Lagrange multipliers
+	of the following knot), so that the system is banded and is solved in
+	time linear in the number of segments. Each polynomial is expressed in
+	local coordinates relative to its left knot, scaled by the average
+	segment width, which keeps the system well conditioned."""
+
+	def __init__(self, degree, knots, continuity = None):
+		if degree < 0:
+			raise Exception("Polynomial degree must not be negative.")
+		if continuity is None:
+			continuity = degree - 1
+		if continuity >= degree:
+			raise Exception("At most %d derivatives of degree %d polynomials can be continuous without forcing all of them to be identical." % (degree - 1, degree))
+		knots = sorted(set(knots))
+		if len(knots) < 2:
+			raise Exception("Need at least two knots for a piecewise polynomial fit.")
+		self._degree = degree
+		self._knots = knots
+		self._continuity = continuity
+		self._scale = (knots[-1] - knots[0]) / (len(knots) - 1)
+		self._max_error = None
+		self._rms_error = None
+
+	@property
+	def segment_count(self):
+		return len(self._knots) - 1
+
+	@property
+	def max_error(self):
+		return self._max_error
+
+	@property
+	def rms_error(self):
+		return self._rms_error
+
+	def _segment(self, x):
+		"""Index of the polynomial responsible for x; points on an interior
+		knot belong to the right polynomial."""
+		return min(max(bisect.bisect_right(self._knots, x) - 1, 0), self.segment_count - 1)
+
+	def _local(self, x, segment):
+		return (x - self._knots[segment]) / self._scale
+
+	def _column(self, segment_offsets, varname):
+		(name, index) = varname.split("_")
+		return segment_offsets[int(index)] + (ord(name) - ord("a"))
+
+	def _constraint_blocks(self, fixed_points):
+		"""Constraint equations grouped by segment: the continuity
+		conditions at the right knot of a segment and the fixed points
+		inside of it."""
+		blocks = [ [ ] for segment in range(self.segment_count) ]
+		for segment in range(self.segment_count - 1):
+			knot = self._local(self._knots[segment + 1], segment)
+			for diffed in range(self._continuity + 1):
+				blocks[segment].append(Polynomial.equals(degree = self._degree, x = knot, y = None, index = segment, diffed = diffed, next_x = 0))
+		for (x, y) in fixed_points:
+			segment = self._segment(x)
+			blocks[segment].append(Polynomial.equals(degree = self._degree, x = self._local(x, segment), y = y, index = segment))
+		return blocks
+
+	def fit(self, points, fixed_points = ()):
+		"""Fit the piecewise polynomial to the (x, y) points and return a
+		list of (xoffset, Polynomial) tuples, one per segment, where each
+		polynomial is to be evaluated at absolute X values."""
+		points = list(points)
+		blocks = self._constraint_blocks(fixed_points)
+
+		# Every segment's coefficients are followed by the multipliers of its
+		# constraint block, so all nonzero entries are close to the diagonal
+		coefficients = self._degree + 1
+		segment_offsets = [ ]
+		block_offsets = [ ]
+		size = 0
+		for block in blocks:
+			segment_offsets.append(size)
+			block_offsets.append(size + coefficients)
+			size += coefficients + len(block)
+		bandwidth = coefficients + max(len(block) for block in blocks)
+		system = BandedMatrix(size, bandwidth, bandwidth)
+		rhs = [ 0 ] * size
+
+		# Normal equations of the data points, A^T A c = A^T b, accumulated
+		# per segment in dense blocks first
+		counts = [ 0 ] * self.segment_count
+		normal = [ [ [ 0 ] * coefficients for i in range(coefficients) ] for segment in range(self.segment_count) ]
+		for (x, y) in points:
+			segment = self._segment(x)
+			counts[segment] += 1
+			(lhs, value) = Polynomial.equals(degree = self._degree, x = self._local(x, segment), y = y, index = segment)
+			row = [ (self._column(segment_offsets, varname) - segment_offsets[segment], factor) for (varname, factor) in lhs.items() ]
+			block = normal[segment]
+			for (i, ifactor) in row:
+				rhs[segment_offsets[segment] + i] += ifactor * value
+				block_row = block[i]
+				for (j, jfactor) in row:
+					block_row[j] += ifactor * jfactor
+		for (offset, block) in zip(segment_offsets, normal):
+			for (i, block_row) in enumerate(block, offset + 1):
+				for (j, value) in enumerate(block_row, offset + 1):
+					system[(i, j)] = value
+
+		# Constraints C c = d, coupled to the normal equations through C^T
+		for (block, offset) in zip(blocks, block_offsets):
+			for (number, (lhs, value)) in enumerate(block):
+				multiplier = offset + number
+				for (varname, factor) in lhs.items():
+					column = self._column(segment_offsets, varname)
+					system[(multiplier + 1, column + 1)] += factor
+					system[(column + 1, multiplier + 1)] += factor
+				rhs[multiplier] = value
+
+		try:
+			solution = system.solve(rhs)
+		except SingularEquationSystemException:
+			raise Exception("Piecewise polynomial fit is underdetermined: every segment needs about %d data points (segments have %s); use fewer segments or a lower degree." % (self._degree + 1 - self._continuity, ", ".join(str(count) for count in counts)))
+
+		polys = [ ]
+		for segment in range(self.segment_count):
+			local_coeffs = solution[segment_offsets[segment] : segment_offsets[segment] + coefficients]
+			coeffs = [ coeff / (self._scale ** exponent) for (exponent, coeff) in enumerate(local_coeffs) ]
+			polys.append((self._knots[segment], Polynomial(coeffs, xoffset = -self._knots[segment])))
+
+		errors = [ y - polys[self._segment(x)][1][x] for (x, y) in points ]
+		if len(errors) > 0:
+			self._max_error = max(errors, key = abs)
+			self._rms_error = (sum(error ** 2 for error in errors) / len(errors)) ** 0.5
+		return polys
@@ -31,6 +31,10 @@ class PrefixMatcher(object):
 			self._opts = options
 
 	def matchunique(self, pattern):
+		if pattern in self._opts:
+			# An exact match is never ambiguous, even if it is also the
+			# prefix of another option
+			return pattern
 		results = self.match(pattern)
 		distinct_values = set(result[1] for result in results)
 
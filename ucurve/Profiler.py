@@ -0,0 +1,137 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+import time
+import contextlib
+
+class Profiler(object):
+	"""Records wall time, CPU time and peak memory of the individual stages
+	of an action. Memory is traced with tracemalloc, which considerably
+	slows down allocation-heavy code, so all of this only happens when
+	profiling was requested; otherwise stage() does nothing. Optionally,
+	one stage (or all of them) is additionally run under cProfile and the
+	statistics are dumped to a file."""
+
+	def __init__(self, output = None, dump_filename = None, dump_stage = None):
+		self._output = output
+		self._dump_filename = dump_filename
+		self._dump_stage = dump_stage
+		self._stages = [ ]
+		self._cprofile = None
+		self._dumped_stage_ran = False
+
+	@classmethod
+	def from_args(cls, args):
+		return cls(output = getattr(args, "profile", None), dump_filename = getattr(args, "profile_dump", None), dump_stage = getattr(args, "profile_stage", None))
+
+	@property
+	def enabled(self):
+		return (self._output is not None) or (self._dump_filename is not None)
+
+	@property
+	def stages(self):
+		return self._stages
+
+	def _dump_this_stage(self, name):
+		return (self._dump_filename is not None) and ((self._dump_stage is None) or (self._dump_stage == name))
+
+	@contextlib.contextmanager
+	def stage(self, name):
+		if not self.enabled:
+			yield
+			return
+
+		if self._output is not None:
+			import tracemalloc
+			if not tracemalloc.is_tracing():
+				tracemalloc.start()
+			tracemalloc.reset_peak()
+			memory_before = tracemalloc.get_traced_memory()[0]
+		if self._dump_this_stage(name):
+			if self._cprofile is None:
+				import cProfile
+				self._cprofile = cProfile.Profile()
+			self._dumped_stage_ran = True
+			self._cprofile.enable()
+
+		wall_t0 = time.perf_counter()
+		cpu_t0 = time.process_time()
+		try:
+			yield
+		finally:
+			wall = time.perf_counter() - wall_t0
+			cpu = time.process_time() - cpu_t0
+			if self._dump_this_stage(name):
+				self._cprofile.disable()
+			if self._output is not None:
+				(memory_after, memory_peak) = tracemalloc.get_traced_memory()
+				self._record(name, wall, cpu, memory_peak, memory_after - memory_before)
+
+	def _record(self, name, wall, cpu, peak_memory, retained_memory):
+		# Stages that run several times (e.g., once per family member) are
+		# accumulated into a single entry
+		for stage in self._stages:
+			if stage["name"] == name:
+				stage["wall"] += wall
+				stage["cpu"] += cpu
+				stage["peak_memory"] = max(stage["peak_memory"], peak_memory)
+				stage["retained_memory"] += retained_memory
+				stage["count"] += 1
+				return
+		self._stages.append({
+			"name":				name,
+			"count":			1,
+			"wall":				wall,
+			"cpu":				cpu,
+			"peak_memory":		peak_memory,
+			"retained_memory":	retained_memory,
+		})
+
+	def report(self, f = None):
+		"""Print the recorded stages (to stderr by default) and write the
+		cProfile statistics, if requested."""
+		if f is None:
+			f = sys.stderr
+		if self._dump_filename is not None:
+			if self._dumped_stage_ran:
+				self._cprofile.dump_stats(self._dump_filename)
+			else:
+				print("Warning: stage '%s' was never run, no profile written to %s." % (self._dump_stage, self._dump_filename), file = f)
+
+		if self._output is None:
+			return
+		import tracemalloc
+		tracemalloc.stop()
+
+		total = {
+			"wall":			sum(stage["wall"] for stage in self._stages),
+			"cpu":			sum(stage["cpu"] for stage in self._stages),
+			"peak_memory":	max([ stage["peak_memory"] for stage in self._stages ] or [ 0 ]),
+		}
+		if self._output == "json":
+			import json
+			print(json.dumps({ "stages": self._stages, "total": total }), file = f)
+		else:
+			print("%-16s %10s %10s %12s %12s" % ("Stage", "Wall [ms]", "CPU [ms]", "Peak [MiB]", "Kept [MiB]"), file = f)
+			for stage in self._stages:
+				print("%-16s %10.1f %10.1f %12.2f %12.2f" % (stage["name"], stage["wall"] * 1000, stage["cpu"] * 1000, stage["peak_memory"] / 1024 / 1024, stage["retained_memory"] / 1024 / 1024), file = f)
+			print("%-16s %10.1f %10.1f %12.2f" % ("total", total["wall"] * 1000, total["cpu"] * 1000, total["peak_memory"] / 1024 / 1024), file = f)
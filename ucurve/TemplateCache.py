@@ -0,0 +1,68 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import hashlib
+
+class TemplateCache(object):
+	"""Provides the Mako templates that ship with ucurve. Compiled templates
+	are kept in-process (so that batch runs only compile every template
+	once per worker) and their generated Python modules are additionally
+	stored in a per-user cache directory, so that subsequent invocations
+	do not need to lex and compile the templates again. The cache is
+	separate for every template directory, so that different installations
+	or checkouts of ucurve never use each other's compiled templates."""
+
+	_lookup = None
+
+	@classmethod
+	def template_directory(cls):
+		import ucurve.templates
+		return os.path.dirname(os.path.realpath(ucurve.templates.__file__))
+
+	@classmethod
+	def cache_directory(cls):
+		import mako
+		cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+		directory_hash = hashlib.sha1(cls.template_directory().encode("utf-8")).hexdigest()[:16]
+		cache_dir = os.path.join(cache_home, "ucurve", "templates-mako%s-%s" % (mako.__version__, directory_hash))
+		try:
+			os.makedirs(cache_dir, exist_ok = True)
+		except OSError:
+			return None
+		if not os.access(cache_dir, os.W_OK):
+			return None
+		return cache_dir
+
+	@classmethod
+	def _get_lookup(cls):
+		if cls._lookup is None:
+			import mako.lookup
+			cls._lookup = mako.lookup.TemplateLookup(directories = [ cls.template_directory() ], module_directory = cls.cache_directory(), strict_undefined = True, input_encoding = "utf-8")
+		return cls._lookup
+
+	@classmethod
+	def get(cls, name):
+		return cls._get_lookup().get_template(name)
+
+	@classmethod
+	def render(cls, name, **env):
+		return cls.get(name).render(**env)
@@ -19,7 +19,12 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
+import re
+import sys
 import math
+import contextlib
+import functools
 
 def _clamp(value, minval, maxval):
 	if value < minval:
@@ -29,6 +34,59 @@ def _clamp(value, minval, maxval):
 	else:
 		return value
 
+class IOTools(object):
+	@staticmethod
+	@contextlib.contextmanager
+	def open_read(filename, mode = "r"):
+		"""Open a file for reading; "-" refers to stdin."""
+		if filename == "-":
+			yield sys.stdin if ("b" not in mode) else sys.stdin.buffer
+		else:
+			with open(filename, mode) as f:
+				yield f
+
+	@staticmethod
+	@contextlib.contextmanager
+	def open_write(filename, mode = "w"):
+		"""Open a file for writing; "-" or None refer to stdout."""
+		if (filename is None) or (filename == "-"):
+			f = sys.stdout if ("b" not in mode) else sys.stdout.buffer
+			yield f
+			f.flush()
+		else:
+			with open(filename, mode) as f:
+				yield f
+
+	@staticmethod
+	def write_if_changed(filename, content):
+		"""Write the content (text or bytes) to the file unless the file
+		already has exactly that content, so that its modification time is
+		only updated on an actual change. Returns True if the file was
+		written."""
+		binary = "b" if isinstance(content, bytes) else ""
+		try:
+			with open(filename, "r" + binary) as f:
+				if f.read() == content:
+					return False
+		except (FileNotFoundError, UnicodeDecodeError):
+			pass
+		with open(filename, "w" + binary) as f:
+			f.write(content)
+		return True
+
+	@staticmethod
+	def creation_timestamp():
+		"""Creation timestamp for the header of generated files. For
+		reproducible builds, the time given by the SOURCE_DATE_EPOCH environment
+		variable is used (in UTC), see
+		https://reproducible-builds.org/specs/source-date-epoch/"""
+		import datetime
+		if "SOURCE_DATE_EPOCH" in os.environ:
+			timestamp = datetime.datetime.fromtimestamp(int(os.environ["SOURCE_DATE_EPOCH"]), datetime.timezone.utc)
+		else:
+			timestamp = datetime.datetime.now()
+		return timestamp.strftime("%Y-%m-%d %H:%M:%S")
+
 class ExpressionTools(object):
 	_EXPRESSION_PREDEFS = {
 		"pow":		pow,
@@ -56,6 +114,32 @@ class ExpressionTools(object):
 		env.update(cls._EXPRESSION_PREDEFS)
 		return eval(expression, { }, env)
 
+	@classmethod
+	def get_variables(cls, expression):
+		"""Return the set of free variable names that an expression refers
+		to (excluding the predefined functions and constants)."""
+		return set(compile(expression, "<expression>", "eval").co_names) - set(cls._EXPRESSION_PREDEFS)
+
+	@classmethod
+	def compile_function(cls, expression, argnames, env = None):
+		"""Compile the expression once into a Python function that takes the
+		given argument names as positional parameters. Much faster than
+		calling eval_expression() for every single value. Compiled functions
+		are cached, so compiling the same expression again is free."""
+		if env is None:
+			env = { }
+		return cls._compile_function(expression, tuple(argnames), tuple(sorted(env.items())))
+
+	@classmethod
+	@functools.lru_cache(maxsize = 256)
+	def _compile_function(cls, expression, argnames, env_items):
+		forbidden_keywords = set(cls._EXPRESSION_PREDEFS) & (set(name for (name, value) in env_items) | set(argnames))
+		if len(forbidden_keywords) > 0:
+			raise Exception("Forbidden keywords used as variable names: %s" % (", ".join(sorted(forbidden_keywords))))
+		fenv = dict(env_items)
+		fenv.update(cls._EXPRESSION_PREDEFS)
+		return eval("lambda %s: (%s)" % (", ".join(argnames), expression), fenv)
+
 class CTypeTools(object):
 	def _uint(bit):
 		return (0, (2 ** bit) - 1)
@@ -82,3 +166,40 @@ class CTypeTools(object):
 			if (type_minval <= minval <= type_maxval) and (type_minval <= maxval <= type_maxval):
 				return typename
 		raise Exception("No type found that fits values from %d to %d." % (minval, maxval))
+
+	@classmethod
+	def sizeof(cls, typename):
+		"""Size in bytes of one of the integer types returned by get_type()."""
+		match = re.fullmatch(r"u?int(\d+)_t", typename)
+		if match is None:
+			raise Exception("Not an integer type: %s" % (typename))
+		return int(match.group(1)) // 8
+
+	@classmethod
+	def struct_size(cls, typenames, max_alignment = None):
+		"""Size in bytes of a struct with the given integer member types,
+		including padding. Members are naturally aligned, but never to more
+		than max_alignment bytes (if given)."""
+		size = 0
+		alignment = 1
+		for typename in typenames:
+			member_size = cls.sizeof(typename)
+			member_alignment = member_size if (max_alignment is None) else min(member_size, max_alignment)
+			size = (size + member_alignment - 1) // member_alignment * member_alignment + member_size
+			alignment = max(alignment, member_alignment)
+		return (size + alignment - 1) // alignment * alignment
+
+	@classmethod
+	def lookup_types(cls, xvalues, curves):
+		"""Determine all C types that the generated lookup code needs for the
+		given X cornerpoints and one or more curves of (x, y) cornerpoints."""
+		yvalues = [ y for curve in curves for (x, y) in curve ]
+		segments = [ segment for curve in curves for segment in zip(curve, curve[1:]) ]
+		return {
+			"in_type":				cls.get_type(xvalues),
+			"extd_in_type":			cls.get_type(xvalues + [ min(xvalues) - 10, max(xvalues) + 10 ]),
+			"out_type":				cls.get_type(yvalues),
+			"idx_type":				cls.get_type([ 0, len(xvalues) ]),
+			"win_mul_yspan_type":	cls.get_type([ (x1 - x0 - 1) * (y1 - y0) for ((x0, y0), (x1, y1)) in segments ] or [ 0 ]),
+			"yspan_type":			cls.get_type([ y1 - y0 for ((x0, y0), (x1, y1)) in segments ] or [ 0 ]),
+		}
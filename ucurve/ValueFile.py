@@ -19,32 +19,70 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
-import collections
+from ucurve.PointSet import PointSet
+from ucurve.Tools import IOTools
 
 class ValueFile(object):
 	def __init__(self, filename):
 		self._filename = filename
 		self._values = self._read_values()
 
-	def _read_values(self):
-		values = collections.OrderedDict()
-		with open(self._filename) as f:
+	@staticmethod
+	def iter_rows(filename):
+		"""Generator that yields every data row of an X/Y file as a tuple of
+		floats in file order without reading the whole file into memory
+		first. A filename of "-" reads from stdin."""
+		with IOTools.open_read(filename) as f:
 			for line in f:
 				line = line.strip()
 				if line.startswith("#") or (line == ""):
 					continue
-				(x, y) = line.split()
-				x = float(x)
-				y = float(y)
-				values[x] = y
-		return values
+				yield tuple(float(value) for value in line.split())
+
+	@classmethod
+	def iter_points(cls, filename):
+		"""Generator that yields (x, y) points of a two-column X/Y file."""
+		for (x, y) in cls.iter_rows(filename):
+			yield (x, y)
+
+	@classmethod
+	def read_xvalues(cls, filename):
+		"""Read the first column of every row of a file as a list of X
+		values, in file order and including duplicates. Further columns
+		(e.g., Y values of a logged X/Y file) are ignored."""
+		return [ row[0] for row in cls.iter_rows(filename) if len(row) > 0 ]
+
+	@classmethod
+	def read_columns(cls, filename):
+		"""Read a file with one X column and an arbitrary number of Y columns
+		(x y0 y1 y2 ...) and return one sorted PointSet per Y column."""
+		columns = None
+		for row in cls.iter_rows(filename):
+			if columns is None:
+				if len(row) < 2:
+					raise Exception("%s: expected at least one X and one Y column, but got %d columns." % (filename, len(row)))
+				columns = [ PointSet() for i in range(len(row) - 1) ]
+			elif len(row) != len(columns) + 1:
+				raise Exception("%s: expected %d columns, but got %d." % (filename, len(columns) + 1, len(row)))
+			for (column, y) in zip(columns, row[1:]):
+				column.append(row[0], y)
+		if columns is None:
+			raise Exception("%s: no values found." % (filename))
+		return [ column.sort_unique() for column in columns ]
+
+	def _read_values(self):
+		return PointSet.from_points(self.iter_points(self._filename)).sort_unique()
+
+	@property
+	def point_set(self):
+		return self._values
 
 	@property
 	def points(self):
 		return list(self)
 
 	def __iter__(self):
-		return iter(self._values.items())
+		return iter(self._values)
 
 	def __len__(self):
 		return len(self._values)
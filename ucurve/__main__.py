@@ -20,55 +20,160 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 import sys
 from ucurve.FriendlyArgumentParser import baseint
 from ucurve.MultiCommand import MultiCommand
-from ucurve.actions.ActionXYGen import ActionXYGen
-from ucurve.actions.ActionCodeGen import ActionCodeGen
-from ucurve.actions.ActionInterpolate import ActionInterpolate
 
 mc = MultiCommand()
 
+def add_jobs_argument(parser, help_text):
+	parser.add_argument("-j", "--jobs", metavar = "count", type = int, default = os.cpu_count() or 1, help = help_text + " Defaults to the number of CPUs (%(default)d).")
+
+def add_profile_arguments(parser):
+	parser.add_argument("--profile", choices = [ "table", "json" ], nargs = "?", const = "table", help = "Record wall time, CPU time and peak memory of every processing stage and print them to stderr, either as a table (the default) or as JSON. Memory tracing slows down processing considerably.")
+	parser.add_argument("--profile-dump", metavar = "filename", type = str, help = "Run the processing stages under cProfile and write the statistics to the given file, which can be inspected with pstats or snakeviz.")
+	parser.add_argument("--profile-stage", metavar = "name", type = str, help = "Only run the given stage (e.g., decimate) under cProfile when --profile-dump is given. By default, all stages are profiled.")
+
 def genparser(parser):
-	parser.add_argument("-v", "--var", metavar = "var=value", action = "append", type = str, default = [ ], help = "Substitute the given variable in the formula. Can be specified multiple times.")
+	parser.add_argument("-v", "--var", metavar = "var=value", action = "append", type = str, default = [ ], help = "Substitute the given variable in the formula. Can be specified multiple times. The value may also be a comma-separated list (e.g., B=5400,5459.339,5500) or a range start:stop:count of evenly spaced values (e.g., B=5400:5500:11); the formula is then evaluated for every combination of values and written as one Y column per combination.")
+	parser.add_argument("--split", action = "store_true", help = "When variables are given lists or ranges of values, write one output file per combination (numbered before the extension of the output filename) instead of a single file with one Y column per combination.")
 	parser.add_argument("--xmin", metavar = "value", type = float, required = True, help = "Minimum X value to use. Mandatory argument.")
 	parser.add_argument("--xmax", metavar = "value", type = float, required = True, help = "Maximum X value to use. Mandatory argument.")
 	parser.add_argument("--xvar", metavar = "symbol", type = str, default = "x", help = "Variable to use for sweeping X. Defaults to %(default)s.")
 	parser.add_argument("-s", "--steps", metavar = "cnt", type = int, default = 100, help = "Number of steps to interpolate.")
 	parser.add_argument("-l", "--logarithmic", action = "store_true", help = "Sweep through X in a logarithmically. Default is to do a linear sweep.")
-	parser.add_argument("-o", "--outfile", metavar = "filename", help = "Write output to the given filename.")
+	parser.add_argument("-o", "--outfile", metavar = "filename", help = "Write output to the given filename. By default or when '-' is given, output is written to stdout.")
+	parser.add_argument("-f", "--format", choices = [ "text", "precise", "binary" ], default = "text", help = "Output format. text prints six decimal places, precise prints every value exactly (so that it reads back as the same float) and binary writes little-endian float64 X/Y pairs without the header comments. Can be one of %(choices)s, defaults to %(default)s.")
+	add_profile_arguments(parser)
 	parser.add_argument("formula", type = str, help = "Formula used to compute y from a given x value.")
-mc.register("xygen", "Generate an X/Y file from a formula and parameters", genparser, action = ActionXYGen)
+mc.register("xygen", "Generate an X/Y file from a formula and parameters", genparser, action = "ucurve.actions.ActionXYGen.ActionXYGen")
 
-def genparser(parser):
+def add_codegen_arguments(parser):
 	parser.add_argument("--in-varnames", metavar = "xname,yname", type = str, default = "x,y", help = "Rename X and Y variables (separated by comma) that come from xyfile. Defaults to '%(default)s'.")
 	parser.add_argument("--out-varnames", metavar = "xname,yname", type = str, default = "x,y", help = "Rename X and Y variables (separated by comma) that comprise the final mapping after applying mangling formulas. Defaults to '%(default)s'.")
-	parser.add_argument("--yaoi", metavar = "min,max", type = str, help = "Define the Y area of interest for analysis. Does not affect the computation at all, just gives out some numbers about that area.")
+	parser.add_argument("--yaoi", metavar = "min,max", type = str, action = "append", help = "Define a Y area of interest for analysis. Can be given multiple times to analyze several ranges. Does not affect the computation at all, just gives out some numbers about that area.")
 	parser.add_argument("--json-analysis", action = "store_true", help = "When printing YAOI analysis data, do not use human-readable text, but rather output JSON data. This allows machine-post-processing (such as iterative changing of parameters by a script calling ucurve).")
 	parser.add_argument("--xval", metavar = "formula", type = str, default = "x", help = "Default mangling formula to apply to x. Defaults to '%(default)s'.")
 	parser.add_argument("--yval", metavar = "formula", type = str, default = "y", help = "Default mangling formula to apply to y. Defaults to '%(default)s'.")
 	parser.add_argument("--xmin", metavar = "value", type = baseint, help = "Minimum X value that will ever considered valid.")
 	parser.add_argument("--xmax", metavar = "value", type = baseint, help = "Maximum X value that will ever considered valid.")
 	parser.add_argument("-e", "--max-error-y", metavar = "ydev", type = float, default = 10, help = "Maximum error to stay below, specified as abs(y_true - y_interp). Defaults to %(default)d.")
+	parser.add_argument("--decimation", choices = [ "greedy", "free-knot" ], default = "greedy", help = "Decimation algorithm. greedy takes all cornerpoints from the (rounded) input values; free-knot chooses the Y values of cornerpoints freely so that segments can deviate by up to the maximum error in either direction, which usually results in considerably fewer cornerpoints. Can be any of %(choices)s and defaults to %(default)s.")
+	parser.add_argument("--layout", choices = [ "search", "octave" ], default = "search", help = "Layout of the generated table. search stores decimated cornerpoints that are searched for the segment of an input value; octave splits the input range into power-of-two octaves with uniform segments each, so that a lookup indexes the table directly (finding the octave by counting leading zeros). The octave layout suits inputs that span several decades. Can be any of %(choices)s and defaults to %(default)s.")
+	parser.add_argument("--octave-entries", metavar = "count", type = int, help = "Number of segments per octave for the octave layout, a power of two. By default, the smallest number that keeps the maximum error is used.")
+	parser.add_argument("--free-x", action = "store_true", help = "With free-knot decimation, also allow cornerpoints at X values between input values. Only makes a difference when the input has gaps in X.")
+	parser.add_argument("-j", "--jobs", metavar = "count", type = int, default = 1, help = "Split the values into chunks and decimate them in this many parallel processes. The chunks are stitched together so that the result is identical to a sequential run. Only supported for greedy decimation. Defaults to %(default)d.")
 	parser.add_argument("-v", "--verbose", action = "store_true", help = "Be more verbose during code generation.")
+	parser.add_argument("--streaming", action = "store_true", help = "Process the X/Y file as a stream without reading it into memory first. Requires X values that are monotonic after transformation; peak memory is then bounded by the longest decimated segment instead of the file size. Cannot be combined with --gnuplot.")
+	parser.add_argument("--family", action = "store_true", help = "Treat every Y column of the XY file (x y0 y1 ...) as a member of a family of curves that share the same X cornerpoints. All members are decimated jointly so that the maximum error holds for each of them, and a single X table with one Y table per member is emitted.")
+	parser.add_argument("--family-names", metavar = "name,name,...", type = str, help = "Names of the family members (separated by comma), used for the generated per-member lookup functions. Defaults to y0, y1, ...")
 	parser.add_argument("--struct-lookup", choices = [ "default", "avr-progmem" ], default = "default", help = "Specify how lookup of in-program structure data is performed. Can be any of %(choices)s and defaults to %(default)s.")
 	parser.add_argument("--gnuplot", action = "store_true", help = "Also output a gnuplot file that plots input/output mapping, error graphs and deviation from original.")
+	parser.add_argument("--python", action = "store_true", help = "Also output a Python module with the table and a lookup that returns exactly the same values as the generated C code, vectorized with NumPy if that is available.")
 	parser.add_argument("--gnuplot-flipaxis", action = "store_true", help = "When creating gnuplot output, flip X and Y axis.")
 	parser.add_argument("--gnuplot-flipdiff", action = "store_true", help = "When creating gnuplot output, compute dX/dY instead of dY/dX on axis X1Y2.")
+	parser.add_argument("--gnuplot-points", metavar = "count", type = int, default = 4096, help = "When creating gnuplot output, downsample the plotted input values and their derivative to at most this many points each. Cornerpoints and errors are always plotted exactly. 0 plots all values. Defaults to %(default)d.")
+	parser.add_argument("--gnuplot-downsample", choices = [ "minmax", "lttb" ], default = "minmax", help = "Downsampling algorithm for gnuplot output. minmax keeps the minimum and maximum of every bucket of values, lttb uses Largest-Triangle-Three-Buckets. Can be one of %(choices)s, defaults to %(default)s.")
+	parser.add_argument("--gnuplot-binary", action = "store_true", help = "When creating gnuplot output, write the plotted input values and their derivative to a binary .dat file next to the .gpl file instead of inline text.")
+	parser.add_argument("--incremental", action = "store_true", help = "Record a fingerprint of the input data, options, ucurve version and templates next to the output files. When nothing changed since the last run, skip the computation entirely.")
+	parser.add_argument("--no-timestamp", action = "store_true", help = "Do not include a creation timestamp in the generated files, so that they only change when their content changes. If the SOURCE_DATE_EPOCH environment variable is set, that time is used as the timestamp.")
 	parser.add_argument("--funcname", metavar = "name", type = str, default = "lookup", help = "Lookup function name. Defaults to '%(default)s'.")
 	parser.add_argument("--outdir", metavar = "path", type = str, default = ".", help = "Directory to write all outfiles to. By default, these files are created in the working directory.")
-	parser.add_argument("--outfile", metavar = "prefix", type = str, default = "lookup", help = "Prefix to use for the output .c/.h filename. Defaults to '%(default)s'.")
-	parser.add_argument("xyfile", type = str, help = "X/Y file that specifies input data.")
-mc.register("codegen", "Generate code to interpolate Y from a given X", genparser, action = ActionCodeGen)
+	parser.add_argument("--outfile", metavar = "prefix", type = str, default = "lookup", help = "Prefix to use for the output .c/.h filename. When '-' is given, all generated files are written to stdout. Defaults to '%(default)s'.")
+	add_profile_arguments(parser)
+
+def genparser(parser):
+	add_codegen_arguments(parser)
+	parser.add_argument("xyfile", type = str, help = "X/Y file that specifies input data. '-' reads from stdin.")
+mc.register("codegen", "Generate code to interpolate Y from a given X", genparser, action = "ucurve.actions.ActionCodeGen.ActionCodeGen")
+
+def genparser(parser):
+	parser.add_argument("--in-varnames", metavar = "xname,yname,zname", type = str, default = "x,y,z", help = "Rename X, Y and Z variables (separated by comma) that come from xyzfile. Defaults to '%(default)s'.")
+	parser.add_argument("--out-varnames", metavar = "xname,yname,zname", type = str, default = "x,y,z", help = "Rename X, Y and Z variables (separated by comma) that comprise the final mapping after applying mangling formulas. Defaults to '%(default)s'.")
+	parser.add_argument("--xval", metavar = "formula", type = str, help = "Mangling formula to apply to x. Defaults to the X variable itself.")
+	parser.add_argument("--yval", metavar = "formula", type = str, help = "Mangling formula to apply to y. Defaults to the Y variable itself.")
+	parser.add_argument("--zval", metavar = "formula", type = str, help = "Mangling formula to apply to z. Defaults to the Z variable itself.")
+	parser.add_argument("-e", "--max-error-z", metavar = "zdev", type = float, default = 10, help = "Maximum error to stay below on all grid points, specified as abs(z_true - z_interp). Defaults to %(default)d.")
+	parser.add_argument("-v", "--verbose", action = "store_true", help = "Be more verbose during code generation.")
+	parser.add_argument("--struct-lookup", choices = [ "default", "avr-progmem" ], default = "default", help = "Specify how lookup of in-program structure data is performed. Can be any of %(choices)s and defaults to %(default)s.")
+	parser.add_argument("--no-timestamp", action = "store_true", help = "Do not include a creation timestamp in the generated files. If the SOURCE_DATE_EPOCH environment variable is set, that time is used as the timestamp.")
+	parser.add_argument("--funcname", metavar = "name", type = str, default = "lookup2d", help = "Lookup function name. Defaults to '%(default)s'.")
+	parser.add_argument("--outdir", metavar = "path", type = str, default = ".", help = "Directory to write all outfiles to. By default, these files are created in the working directory.")
+	parser.add_argument("--outfile", metavar = "prefix", type = str, default = "lookup2d", help = "Prefix to use for the output .c/.h filename. When '-' is given, all generated files are written to stdout. Defaults to '%(default)s'.")
+	add_profile_arguments(parser)
+	parser.add_argument("xyzfile", type = str, help = "X/Y/Z file with one 'x y z' row per point of a rectangular grid. '-' reads from stdin.")
+mc.register("codegen2d", "Generate code to interpolate Z from given X and Y bilinearly on a decimated grid", genparser, action = "ucurve.actions.ActionCodeGen2D.ActionCodeGen2D")
+
+def genparser(parser):
+	add_codegen_arguments(parser)
+	parser.add_argument("--var", metavar = "var=value", action = "append", type = str, default = [ ], help = "Substitute the given variable in the formula. Can be specified multiple times. With --family, the value may also be a comma-separated list or a range start:stop:count (as with xygen), and every combination of values becomes a member of the family.")
+	parser.add_argument("--sweep-xmin", metavar = "value", type = float, required = True, help = "Minimum X value to evaluate the formula at. Mandatory argument.")
+	parser.add_argument("--sweep-xmax", metavar = "value", type = float, required = True, help = "Maximum X value to evaluate the formula at. Mandatory argument.")
+	parser.add_argument("--xvar", metavar = "symbol", type = str, default = "x", help = "Variable to use for sweeping X. Defaults to %(default)s.")
+	parser.add_argument("-s", "--steps", metavar = "cnt", type = int, default = 100, help = "Number of steps to evaluate the formula at.")
+	parser.add_argument("-l", "--logarithmic", action = "store_true", help = "Sweep through X in a logarithmically. Default is to do a linear sweep.")
+	parser.add_argument("formula", type = str, help = "Formula used to compute y from a given x value.")
+mc.register("pipeline", "Generate code to interpolate Y from a given X directly from a formula, equivalent to xygen followed by codegen", genparser, action = "ucurve.actions.ActionPipeline.ActionPipeline")
+
+def genparser(parser):
+	add_jobs_argument(parser, "Number of jobs to run in parallel.")
+	parser.add_argument("-r", "--report", metavar = "filename", type = str, default = "-", help = "Write the JSON report to the given file. By default, it is written to stdout.")
+	parser.add_argument("--pretty", action = "store_true", help = "Pretty-print the JSON report.")
+	parser.add_argument("manifest", type = str, help = "JSON or TOML manifest that describes the code generation jobs, each with the same options that codegen takes.")
+	parser.set_defaults(multicommand = mc)
+mc.register("batch", "Run many code generation jobs from a manifest file in parallel", genparser, action = "ucurve.actions.ActionBatch.ActionBatch")
+
+def genparser(parser):
+	parser.add_argument("-n", "--max-size", metavar = "points", type = float, default = 1e6, help = "Largest problem size to run; sizes are powers of ten starting at 100. Defaults to %(default).0e.")
+	parser.add_argument("-c", "--case", metavar = "name", action = "append", default = [ ], help = "Only run benchmark cases whose name contains the given string. Can be specified multiple times.")
+	parser.add_argument("--repeat", metavar = "count", type = int, default = 5, help = "Maximum number of repetitions per size, of which the fastest is reported. Defaults to %(default)d.")
+	parser.add_argument("--min-time", metavar = "secs", type = float, default = 0.2, help = "Stop repeating once this much time was spent on a size. Defaults to %(default).1f.")
+	parser.add_argument("--no-memory", action = "store_true", help = "Do not measure peak memory, which requires another traced (and slow) run per size.")
+	parser.add_argument("-o", "--output", metavar = "filename", type = str, help = "Write the results as JSON to the given file, e.g., to use them as a baseline later.")
+	parser.add_argument("-b", "--baseline", metavar = "filename", type = str, help = "Compare the results against a previously stored JSON file and exit with an error if there are regressions.")
+	parser.add_argument("--tolerance", metavar = "factor", type = float, default = 1.5, help = "Flag a regression when a size is slower than the baseline by more than this factor. Defaults to %(default).1f.")
+	parser.add_argument("--exponent-tolerance", metavar = "delta", type = float, default = 0.2, help = "Flag a regression when the growth exponent exceeds the baseline's by more than this. Defaults to %(default).1f.")
+mc.register("benchmark", "Benchmark the core algorithms at growing problem sizes", genparser, action = "ucurve.actions.ActionBenchmark.ActionBenchmark")
+
+def genparser(parser):
+	parser.add_argument("--in-varnames", metavar = "xname,yname", type = str, default = "x,y", help = "Rename X and Y variables (separated by comma) that come from xyfile. Defaults to '%(default)s'.")
+	parser.add_argument("--xval", metavar = "formula", type = str, action = "append", help = "Mangling formula to apply to x. Can be specified multiple times to compare different transformations. Defaults to 'x'.")
+	parser.add_argument("--yval", metavar = "formula", type = str, action = "append", help = "Mangling formula to apply to y. Can be specified multiple times to compare different transformations. Defaults to 'y'.")
+	parser.add_argument("--xmin", metavar = "value", type = baseint, help = "Minimum X value that will ever considered valid.")
+	parser.add_argument("--xmax", metavar = "value", type = baseint, help = "Maximum X value that will ever considered valid.")
+	parser.add_argument("-e", "--max-error-y", metavar = "budgets", type = str, default = "0.5,1,2,5,10", help = "Error budgets to try, separated by comma. Each can be a single value or an inclusive range start:stop:step, e.g. '0.5:5:0.5'. Defaults to '%(default)s'.")
+	add_jobs_argument(parser, "Number of decimations to run in parallel.")
+	parser.add_argument("-t", "--target", choices = [ "avr", "cortex-m0", "cortex-m4", "generic32" ], default = "generic32", help = "Target whose cost model is used to estimate table size and lookup cycles. Can be one of %(choices)s, defaults to %(default)s.")
+	parser.add_argument("-a", "--all", action = "store_true", help = "Also include all candidates in the report, not only the Pareto front.")
+	parser.add_argument("-r", "--report", metavar = "filename", type = str, default = "-", help = "Write the JSON report to the given file. By default, it is written to stdout.")
+	parser.add_argument("--pretty", action = "store_true", help = "Pretty-print the JSON report.")
+	parser.add_argument("xyfile", type = str, help = "X/Y file that specifies input data. '-' reads from stdin.")
+mc.register("tune", "Search error budgets and transformations for the Pareto front of table size, error and lookup cost", genparser, action = "ucurve.actions.ActionTune.ActionTune")
+
+def genparser(parser):
+	parser.add_argument("--socket", metavar = "path", type = str, help = "Listen for requests on a Unix socket at the given path. By default, requests are read from stdin and responses written to stdout.")
+	add_jobs_argument(parser, "Number of worker processes that run jobs.")
+	parser.add_argument("--cache-size", metavar = "count", type = int, default = 16, help = "Number of parsed X/Y files that every worker process keeps cached. Defaults to %(default)d.")
+	parser.set_defaults(multicommand = mc)
+mc.register("serve", "Run a server that accepts codegen, pipeline, interpolate and xygen jobs as JSON requests", genparser, action = "ucurve.actions.ActionServe.ActionServe")
 
 def genparser(parser):
-	parser.add_argument("-a", "--algorithm", choices = [ "cspline", "linear" ], default = "cspline", help = "Algorithm for interpolation. Can be one of %(choices)s, defaults to %(default)s.")
+	parser.add_argument("-a", "--algorithm", choices = [ "cspline", "linear", "polyfit" ], default = "cspline", help = "Algorithm for interpolation. Can be one of %(choices)s, defaults to %(default)s. polyfit does a least-squares fit of a piecewise polynomial instead of passing through every point.")
+	parser.add_argument("--degree", metavar = "n", type = int, default = 3, help = "Degree of the polynomials when using polyfit. Defaults to %(default)d.")
+	parser.add_argument("--segments", metavar = "cnt", type = int, default = 8, help = "Number of polynomial segments when using polyfit. Defaults to %(default)d.")
+	parser.add_argument("--continuity", metavar = "n", type = int, help = "Number of derivatives that are continuous at the segment boundaries when using polyfit (0 only joins the values). Defaults to degree - 1.")
+	parser.add_argument("--interpolate-knots", action = "store_true", help = "When using polyfit, force the curve through the data points at the segment boundaries.")
 	parser.add_argument("--gnuplot", action = "store_true", help = "Also output a gnuplot file that plots input/output mapping, error graphs and deviation from original.")
 	parser.add_argument("--xmin", metavar = "value", type = float, help = "Minimum X value to use. If not specified, minimum in given dataset is used.")
 	parser.add_argument("--xmax", metavar = "value", type = float, help = "Maximum X value to use. If not specified, maximum in given dataset is used.")
 	parser.add_argument("-s", "--steps", metavar = "cnt", type = int, default = 100, help = "Number of steps to interpolate.")
 	parser.add_argument("-l", "--logarithmic", action = "store_true", help = "Sweep through X in a logarithmically. Default is to do a linear sweep.")
-	parser.add_argument("xyfile", type = str, help = "X/Y file that specifies input data.")
-mc.register("interpolate", "Interpolate a given X/Y table of values using a given algorithm and output more interpolated values", genparser, action = ActionInterpolate)
+	parser.add_argument("--at", metavar = "filename", type = str, help = "Instead of sweeping through X, evaluate the interpolated curve at the X values given in the first column of this file (e.g., logged samples), in file order. --xmin, --xmax, --steps and --logarithmic are then ignored.")
+	parser.add_argument("-o", "--outfile", metavar = "filename", help = "Write output to the given filename. By default or when '-' is given, output is written to stdout.")
+	parser.add_argument("-f", "--format", choices = [ "text", "precise", "binary" ], default = "text", help = "Output format. text prints six decimal places, precise prints every value exactly (so that it reads back as the same float) and binary writes little-endian float64 X/Y pairs. Can be one of %(choices)s, defaults to %(default)s.")
+	add_profile_arguments(parser)
+	parser.add_argument("xyfile", type = str, help = "X/Y file that specifies input data. '-' reads from stdin.")
+mc.register("interpolate", "Interpolate a given X/Y table of values using a given algorithm and output more interpolated values", genparser, action = "ucurve.actions.ActionInterpolate.ActionInterpolate")
 
 mc.run(sys.argv[1:])
@@ -0,0 +1,162 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import json
+import time
+from ucurve.Tools import IOTools
+from ucurve.actions.ActionCodeGen import ActionCodeGen
+from ucurve.actions.ActionPipeline import ActionPipeline
+
+_JOB_ACTIONS = {
+	"codegen":		ActionCodeGen,
+	"pipeline":		ActionPipeline,
+}
+
+def options_to_cmdline(command, options, positional_names):
+	"""Convert a dictionary of options as they would be given on the command
+	line (e.g. { "max-error-y": 1, "gnuplot": True }) into an argument list
+	that can be parsed by the MultiCommand."""
+	cmdline = [ command ]
+	positionals = [ ]
+	for (key, value) in options.items():
+		key = key.replace("_", "-")
+		if key in positional_names:
+			positionals.append(str(value))
+		elif value is True:
+			cmdline.append("--" + key)
+		elif (value is False) or (value is None):
+			continue
+		elif isinstance(value, list):
+			for item in value:
+				cmdline += [ "--" + key, str(item) ]
+		else:
+			cmdline += [ "--" + key, str(value) ]
+	return cmdline + [ "--" ] + positionals
+
+def job_result(action):
+	"""Summary of a finished code generation action as a JSON-serializable
+	dictionary."""
+	result = {
+		"points":		len(action.cornerpoints),
+		"max_error":	action.max_error,
+		"counts":		action.stage_counts,
+	}
+	analysis = action.analysis_data()
+	if analysis is not None:
+		result["analysis"] = analysis
+	return result
+
+def _run_job(name, command, args):
+	t0 = time.time()
+	try:
+		action = _JOB_ACTIONS[command](command, args, print_analysis = False)
+	except Exception as e:
+		return {
+			"name":		name,
+			"error":	"%s: %s" % (e.__class__.__name__, str(e)),
+			"time":		time.time() - t0,
+		}
+	result = { "name": name }
+	result.update(job_result(action))
+	result["time"] = time.time() - t0
+	return result
+
+class ActionBatch(object):
+	"""Runs many code generation jobs that are described in a JSON or TOML
+	manifest. Every job is a dictionary of the same options that codegen
+	(or pipeline) take on the command line, e.g. {"xyfile": "ntc.txt",
+	"max-error-y": 1, "gnuplot": true}. Options in an optional "defaults"
+	dictionary apply to all jobs. Relative paths are resolved relative to
+	the manifest."""
+
+	_POSITIONAL_ARGS = {
+		"codegen":		[ "xyfile" ],
+		"pipeline":		[ "formula" ],
+	}
+	_PATH_ARGS = [ "xyfile", "outdir" ]
+
+	def __init__(self, cmd, args):
+		self._args = args
+		manifest = self._read_manifest()
+		jobs = [ self._parse_job(index, job, manifest.get("defaults", { })) for (index, job) in enumerate(manifest["jobs"]) ]
+
+		t0 = time.time()
+		if (self._args.jobs == 1) or (len(jobs) <= 1):
+			results = [ _run_job(*job) for job in jobs ]
+		else:
+			import concurrent.futures
+			with concurrent.futures.ProcessPoolExecutor(max_workers = self._args.jobs) as executor:
+				results = list(executor.map(_run_job, *zip(*jobs)))
+		report = {
+			"tables":		results,
+			"time":			time.time() - t0,
+		}
+		with IOTools.open_write(self._args.report) as f:
+			json.dump(report, f, indent = 4 if self._args.pretty else None)
+			print(file = f)
+
+		failed = [ result["name"] for result in results if "error" in result ]
+		if len(failed) > 0:
+			print("%d of %d batch jobs failed: %s" % (len(failed), len(results), ", ".join(failed)), file = sys.stderr)
+			sys.exit(1)
+
+	def _read_manifest(self):
+		if self._args.manifest.endswith(".toml"):
+			try:
+				import tomllib
+			except ImportError:
+				raise Exception("Reading TOML manifests requires Python 3.11 or later (tomllib).")
+			with IOTools.open_read(self._args.manifest, "rb") as f:
+				manifest = tomllib.load(f)
+		else:
+			with IOTools.open_read(self._args.manifest) as f:
+				manifest = json.load(f)
+		if isinstance(manifest, list):
+			manifest = { "jobs": manifest }
+		if "jobs" not in manifest:
+			raise Exception("Manifest %s does not contain any jobs." % (self._args.manifest))
+		return manifest
+
+	def _resolve_path(self, path):
+		if (path == "-") or os.path.isabs(path) or (self._args.manifest == "-"):
+			return path
+		return os.path.join(os.path.dirname(self._args.manifest), path)
+
+	def _parse_job(self, index, job, defaults):
+		options = dict(defaults)
+		options.update(job)
+		options = { key.replace("_", "-"): value for (key, value) in options.items() }
+		command = options.pop("command", "codegen")
+		if command not in _JOB_ACTIONS:
+			raise Exception("Batch job %d: unsupported command '%s' (must be one of %s)." % (index, command, ", ".join(sorted(_JOB_ACTIONS))))
+		options.setdefault("outdir", ".")
+		name = options.pop("name", options.get("outfile", "job%d" % (index)))
+		for key in self._PATH_ARGS:
+			if key in options:
+				options[key] = self._resolve_path(options[key])
+
+		try:
+			parse_result = self._args.multicommand.parse(options_to_cmdline(command, options, self._POSITIONAL_ARGS[command]), silent = True)
+		except Exception as e:
+			raise Exception("Batch job %d (%s): %s" % (index, name, str(e)))
+		return (name, command, parse_result.args)
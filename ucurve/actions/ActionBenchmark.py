@@ -0,0 +1,153 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import sys
+import json
+import math
+import time
+import platform
+import tempfile
+from ucurve.Benchmarks import Benchmarks
+from ucurve.Tools import IOTools
+
+class ActionBenchmark(object):
+	"""Runs the benchmark cases at growing sizes and reports time, peak
+	memory and the growth exponent k of every case (time ~ n^k, fitted in
+	log-log space). Results can be stored as JSON and compared against a
+	previously stored baseline; cases that got slower than the tolerance
+	allows or that scale worse are flagged as regressions."""
+
+	def __init__(self, cmd, args):
+		self._args = args
+		cases = [ case for case in Benchmarks.cases() if self._selected(case.name) ]
+		if len(cases) == 0:
+			raise Exception("No benchmark cases match %s." % (", ".join(self._args.case)))
+		sizes = [ 10 ** exponent for exponent in range(2, 7) if 10 ** exponent <= self._args.max_size ]
+
+		results = {
+			"python":		platform.python_version(),
+			"machine":		platform.machine(),
+			"cases":		{ },
+		}
+		with tempfile.TemporaryDirectory(prefix = "ucurve_benchmark_") as workdir:
+			for case in cases:
+				results["cases"][case.name] = self._run_case(case, sizes, workdir)
+
+		if self._args.output is not None:
+			with IOTools.open_write(self._args.output) as f:
+				json.dump(results, f, indent = 4)
+				print(file = f)
+
+		if self._args.baseline is not None:
+			with IOTools.open_read(self._args.baseline) as f:
+				baseline = json.load(f)
+			regressions = self._compare(results, baseline)
+			if len(regressions) > 0:
+				print("%d regression(s) against baseline %s:" % (len(regressions), self._args.baseline), file = sys.stderr)
+				for regression in regressions:
+					print("    %s" % (regression), file = sys.stderr)
+				sys.exit(1)
+
+	def _selected(self, name):
+		return (len(self._args.case) == 0) or any(pattern in name for pattern in self._args.case)
+
+	def _time(self, case, data):
+		"""Best time of repeated runs; repeats until at least min-time
+		seconds have been spent, but at most --repeat times."""
+		best = None
+		spent = 0
+		for repetition in range(self._args.repeat):
+			state = case.setup(data) if (case.setup is not None) else data
+			t0 = time.perf_counter()
+			case.run(state)
+			duration = time.perf_counter() - t0
+			best = duration if (best is None) else min(best, duration)
+			spent += duration
+			if spent >= self._args.min_time:
+				break
+		return best
+
+	def _peak_memory(self, case, data):
+		import tracemalloc
+		state = case.setup(data) if (case.setup is not None) else data
+		tracemalloc.start()
+		try:
+			case.run(state)
+			return tracemalloc.get_traced_memory()[1]
+		finally:
+			tracemalloc.stop()
+
+	@staticmethod
+	def growth_exponent(sizes, times):
+		"""Least-squares slope of log(time) over log(size)."""
+		points = [ (math.log(size), math.log(duration)) for (size, duration) in zip(sizes, times) if duration > 0 ]
+		if len(points) < 2:
+			return None
+		xavg = sum(x for (x, y) in points) / len(points)
+		yavg = sum(y for (x, y) in points) / len(points)
+		return sum((x - xavg) * (y - yavg) for (x, y) in points) / sum((x - xavg) ** 2 for (x, y) in points)
+
+	def _run_case(self, case, sizes, workdir):
+		print("%s: %s" % (case.name, case.description))
+		print("    %10s %12s %12s %14s" % ("n", "Time [ms]", "Peak [MiB]", "Time/n [µs]"))
+		result = {
+			"sizes":	{ },
+		}
+		for n in sizes:
+			data = case.prepare(n, workdir)
+			duration = self._time(case, data)
+			entry = { "time": duration }
+			if case.trace_memory and (not self._args.no_memory):
+				entry["peak_memory"] = self._peak_memory(case, data)
+			result["sizes"][str(n)] = entry
+			peak_memory = "%12.2f" % (entry["peak_memory"] / 1024 / 1024) if ("peak_memory" in entry) else "%12s" % ("-")
+			print("    %10d %12.2f %s %14.3f" % (n, duration * 1000, peak_memory, duration / n * 1e6))
+			sys.stdout.flush()
+		result["exponent"] = self.growth_exponent(sizes, [ result["sizes"][str(n)]["time"] for n in sizes ])
+		if result["exponent"] is not None:
+			print("    growth exponent: %.2f" % (result["exponent"]))
+		print()
+		return result
+
+	def _compare(self, results, baseline):
+		regressions = [ ]
+		print("Comparison against baseline %s:" % (self._args.baseline))
+		for (name, result) in results["cases"].items():
+			if name not in baseline.get("cases", { }):
+				continue
+			base_result = baseline["cases"][name]
+			for (n, entry) in result["sizes"].items():
+				if n not in base_result["sizes"]:
+					continue
+				ratio = entry["time"] / base_result["sizes"][n]["time"]
+				flag = ""
+				if ratio > self._args.tolerance:
+					flag = "  REGRESSION"
+					regressions.append("%s at n = %s is %.2fx slower" % (name, n, ratio))
+				print("    %-20s n = %-8s %6.2fx%s" % (name, n, ratio, flag))
+			if (result["exponent"] is not None) and (base_result.get("exponent") is not None):
+				delta = result["exponent"] - base_result["exponent"]
+				flag = ""
+				if delta > self._args.exponent_tolerance:
+					flag = "  REGRESSION"
+					regressions.append("%s growth exponent rose from %.2f to %.2f" % (name, base_result["exponent"], result["exponent"]))
+				print("    %-20s exponent %.2f -> %.2f%s" % (name, base_result["exponent"], result["exponent"], flag))
+		return regressions
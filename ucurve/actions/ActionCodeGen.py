@@ -21,76 +21,457 @@
 
 import os
 import sys
-import datetime
-import collections
 import math
-import mako.template
-import pkgutil
-import json
-from ucurve.Tools import ExpressionTools, CTypeTools
+import array
+import bisect
+from ucurve.Tools import ExpressionTools, CTypeTools, IOTools
 from ucurve.MinMax import MinMax
+from ucurve.ValueFile import ValueFile
+from ucurve.PointSet import PointSet
+from ucurve.Decimator import GreedyDecimator, FreeKnotDecimator, ParallelDecimator, PointWithError
+from ucurve.TemplateCache import TemplateCache
+from ucurve.CostModel import CostModel
+from ucurve.OctaveTable import OctaveTable
+from ucurve.Downsampler import Downsampler
+from ucurve.Profiler import Profiler
+
+class _AreaOfInterestAnalysis(object):
+	"""Statistics of the points within one Y range. Only points that lie in
+	the range may be passed; _AreaOfInterestRanges takes care of that."""
+	def __init__(self, ymin, ymax):
+		self._ymin = ymin
+		self._ymax = ymax
+		self._first_point = None
+		self._last_point = None
+		self._minmax = MinMax()
+		self._diff_minmax = MinMax()
+
+	@property
+	def ymin(self):
+		return self._ymin
+
+	@property
+	def ymax(self):
+		return self._ymax
+
+	@property
+	def count(self):
+		return self._minmax.count
+
+	@property
+	def minmax(self):
+		return self._minmax
+
+	@property
+	def diff_minmax(self):
+		return self._diff_minmax
 
-_PointWithError = collections.namedtuple("PointWithError", [ "x", "y", "error" ])
-
-def _absmax(a, b):
-	if abs(a) > abs(b):
-		return a
-	else:
-		return b
+	@staticmethod
+	def _differences(points):
+		return [ ((x0 + x) / 2, (y - y0) / (x - x0), (y0 + y) / 2) for ((x0, y0), (x, y)) in zip(points, points[1:]) if x != x0 ]
+
+	def add(self, x, y):
+		self._minmax.add(x, y)
+		if self._last_point is not None:
+			(x0, y0) = self._last_point
+			dx = x - x0
+			if dx != 0:
+				self._diff_minmax.add((x0 + x) / 2, (y - y0) / dx, info = (y0 + y) / 2)
+		else:
+			self._first_point = (x, y)
+		self._last_point = (x, y)
+
+	def feed(self, points):
+		if len(points) == 0:
+			return self
+		self._minmax.feed(points)
+		if self._last_point is None:
+			self._first_point = points[0]
+			self._diff_minmax.feed(self._differences(points))
+		else:
+			self._diff_minmax.feed(self._differences([ self._last_point ] + points))
+		self._last_point = points[-1]
+		return self
+
+	def merge(self, other):
+		"""Merge the analysis of points that follow the ones of this analysis
+		into this one and return self."""
+		if other._first_point is None:
+			return self
+		if self._last_point is None:
+			self._first_point = other._first_point
+		else:
+			self._diff_minmax.feed(self._differences([ self._last_point, other._first_point ]))
+		self._minmax.merge(other._minmax)
+		self._diff_minmax.merge(other._diff_minmax)
+		self._last_point = other._last_point
+		return self
+
+class _AreaOfInterestRanges(object):
+	"""Analysis of any number of (possibly overlapping) Y ranges in a single
+	pass over the points. The range boundaries split the Y axis into
+	elementary intervals (the boundary values themselves and the open
+	intervals between them); a bisection finds the interval of a point and
+	thereby all ranges that contain it."""
+	def __init__(self, ranges):
+		self._analyses = [ _AreaOfInterestAnalysis(ymin, ymax) for (ymin, ymax) in ranges ]
+		self._bounds = sorted(set(bound for yrange in ranges for bound in yrange))
+		self._members = [ self._containing(key) for key in range(2 * len(self._bounds) + 1) ]
+
+	@classmethod
+	def parse(cls, specs):
+		ranges = [ ]
+		for spec in specs:
+			(ymin, ymax) = [ float(v) for v in spec.split(",") ]
+			if ymin > ymax:
+				raise Exception("Area-of-interest range %s is empty, minimum must not exceed maximum." % (spec))
+			ranges.append((ymin, ymax))
+		return cls(ranges)
+
+	@property
+	def analyses(self):
+		return self._analyses
+
+	def _containing(self, key):
+		if key % 2 == 1:
+			value = self._bounds[key // 2]
+			return tuple(index for (index, analysis) in enumerate(self._analyses) if analysis.ymin <= value <= analysis.ymax)
+		elif 0 < key < 2 * len(self._bounds):
+			(low, high) = (self._bounds[key // 2 - 1], self._bounds[key // 2])
+			return tuple(index for (index, analysis) in enumerate(self._analyses) if (analysis.ymin <= low) and (high <= analysis.ymax))
+		else:
+			return ()
+
+	def _key(self, y):
+		return bisect.bisect_left(self._bounds, y) + bisect.bisect_right(self._bounds, y)
+
+	def add(self, x, y):
+		for index in self._members[self._key(y)]:
+			self._analyses[index].add(x, y)
+
+	def feed(self, points):
+		selected = [ [ ] for analysis in self._analyses ]
+		for point in points:
+			for index in self._members[self._key(point[1])]:
+				selected[index].append(point)
+		for (analysis, analysis_points) in zip(self._analyses, selected):
+			analysis.feed(analysis_points)
+		return self
+
+	def merge(self, other):
+		"""Merge the analysis of points that follow the ones of this analysis
+		(with the same ranges) into this one and return self."""
+		for (analysis, other_analysis) in zip(self._analyses, other._analyses):
+			analysis.merge(other_analysis)
+		return self
 
 class ActionCodeGen(object):
-	def __init__(self, cmd, args):
+	def __init__(self, cmd, args, print_analysis = True):
 		self._args = args
+		if self._args.yaoi is not None:
+			self._aoi_analysis = _AreaOfInterestRanges.parse(self._args.yaoi)
+		else:
+			self._aoi_analysis = None
+
+		self._family_names = None
+		self._octave_table = None
+		self._cached_analysis = None
+		self._cost = None
+		self._profiler = Profiler.from_args(self._args)
+
+		if self._args.incremental:
+			from ucurve.BuildStamp import BuildStamp
+			stamp = BuildStamp(self._args.outdir + "/" + self._args.outfile + ".ucurve-stamp", self._output_filenames())
+			with self._profiler.stage("fingerprint"):
+				fingerprint = stamp.fingerprint(self._fingerprint_options(), self._input_filenames())
+				cached_result = stamp.load(fingerprint)
+		else:
+			cached_result = None
+
+		if cached_result is not None:
+			# Nothing changed since the last run, outputs are up to date
+			self._restore_result(cached_result)
+			if self._args.verbose:
+				print("Output files are up to date, %d points with %.2f max error." % (len(self._cornerpoints), self._max_error), file = sys.stderr)
+		else:
+			if self._args.family:
+				self._process_family()
+			elif not self._args.streaming:
+				self._process()
+			else:
+				self._process_streaming()
+
+			# Emit code
+			with self._profiler.stage("emit"):
+				self._emit_code()
+			if self._args.incremental:
+				stamp.save(fingerprint, self._result_data())
+
+		if self._args.verbose:
+			print("Estimated table size and lookup cycles (worst / average) per target:", file = sys.stderr)
+			for line in CostModel.summary_lines(self.cost_data()):
+				print("    %s" % (line), file = sys.stderr)
+
+		# Analyze result
+		if print_analysis:
+			self._analyze_result()
+		self._profiler.report()
+
+	def _output_filenames(self):
+		if self._args.outfile == "-":
+			raise Exception("Incremental mode requires output files, it cannot be used when writing to stdout.")
+		extensions = [ "c", "h" ]
+		if self._args.gnuplot:
+			extensions.append("gpl")
+			if self._args.gnuplot_binary:
+				extensions.append("dat")
+		if self._args.python:
+			extensions.append("py")
+		return [ self._args.outdir + "/" + self._args.outfile + "." + extension for extension in extensions ]
+
+	def _input_filenames(self):
+		if self._args.xyfile == "-":
+			raise Exception("Incremental mode requires an XY file, it cannot be used when reading from stdin.")
+		return [ self._args.xyfile ]
+
+	def _fingerprint_options(self):
+		ignored_options = set([ "verbose", "incremental", "json_analysis", "profile", "profile_dump", "profile_stage" ])
+		return { key: value for (key, value) in vars(self._args).items() if key not in ignored_options }
+
+	def _result_data(self):
+		return {
+			"cornerpoints":		[ list(point) for point in self._cornerpoints ],
+			"max_error":		self._max_error,
+			"counts":			self._stage_counts,
+			"family_names":		self._family_names,
+			"octave":			None if (self._octave_table is None) else [ self._octave_table.xmin, self._octave_table.xmax, self._octave_table.bits ],
+			"analysis":			self.analysis_data(),
+			"analysis_text":	self._analysis_text(),
+		}
+
+	def _restore_result(self, result):
+		self._cornerpoints = [ PointWithError(x = x, y = tuple(y) if isinstance(y, list) else y, error = error) for (x, y, error) in result["cornerpoints"] ]
+		self._max_error = result["max_error"]
+		self._stage_counts = result["counts"]
+		self._family_names = result["family_names"]
+		if result.get("octave") is not None:
+			(xmin, xmax, bits) = result["octave"]
+			self._octave_table = OctaveTable(xmin, xmax, bits, yvalues = [ point.y for point in self._cornerpoints ])
+		self._cached_analysis = (result["analysis"], result["analysis_text"])
 
+	def _timestamp(self):
+		return IOTools.creation_timestamp() if (not self._args.no_timestamp) else None
+
+	def _process(self):
 		# Read values from file first
-		values = self._read_values()
+		with self._profiler.stage("read"):
+			values = self._read_values()
 
 		if self._args.verbose:
 			print("Read %d values from XY file." % (len(values)), file = sys.stderr)
 
 		# Then transform them according to X/Y rules
-		values = self._transform_values(values)
+		with self._profiler.stage("transform"):
+			values = self._transform_values(values)
 
 		if self._args.verbose:
 			print("%d transformed values." % (len(values)), file = sys.stderr)
 
 		# Filter the ones that do not fit min/max criteria
-		self._undecimated_values = [ (x, y) for (x, y) in sorted(self._filter_minmax(values).items()) ]
+		with self._profiler.stage("filter"):
+			self._undecimated_values = self._filter_minmax(values)
 
 		if self._args.verbose:
 			print("%d undecimated values." % (len(self._undecimated_values)), file = sys.stderr)
 
+		if self._aoi_analysis is not None:
+			with self._profiler.stage("analysis"):
+				self._aoi_analysis.feed(self._undecimated_values)
+
 		# Round values and take closest ones
-		self._rounded_values = self._round_values(self._undecimated_values)
+		with self._profiler.stage("round"):
+			self._rounded_values = self._round_values(self._undecimated_values)
 
 		if self._args.verbose:
 			print("%d rounded values." % (len(self._rounded_values)), file = sys.stderr)
 
 		# Determine values to be used as cornerpoints
-		(self._cornerpoints, self._max_error) = self._thin_values(self._rounded_values)
+		with self._profiler.stage("decimate"):
+			if self._args.layout == "octave":
+				(self._cornerpoints, self._max_error) = self._octave_values(self._undecimated_values, self._rounded_values)
+			else:
+				(self._cornerpoints, self._max_error) = self._thin_values(self._rounded_values)
+		self._stage_counts = {
+			"input":			len(values),
+			"undecimated":		len(self._undecimated_values),
+			"rounded":			len(self._rounded_values),
+		}
 		if self._args.verbose:
 			print("%d input points reduced to %d points with %.2f max error." % (len(values), len(self._cornerpoints), self._max_error), file = sys.stderr)
 
-		# Emit code
-		self._emit_code()
+	def _process_family(self):
+		if self._args.streaming:
+			raise Exception("Family mode is not supported in streaming mode.")
+		if self._args.gnuplot:
+			raise Exception("Gnuplot output is not supported in family mode.")
+		if self._args.python:
+			raise Exception("Python output is not supported in family mode.")
+		if self._args.yaoi is not None:
+			raise Exception("Area-of-interest analysis is not supported in family mode.")
+		if self._args.layout == "octave":
+			raise Exception("The octave table layout is not supported in family mode.")
+
+		with self._profiler.stage("read"):
+			columns = self._read_columns()
+		if self._args.family_names is None:
+			self._family_names = [ "y%d" % (i) for i in range(len(columns)) ]
+		else:
+			self._family_names = self._args.family_names.split(",")
+			if len(self._family_names) != len(columns):
+				raise Exception("%d family member names given, but XY file has %d Y columns." % (len(self._family_names), len(columns)))
+
+		members = [ ]
+		for (name, values) in zip(self._family_names, columns):
+			with self._profiler.stage("transform"):
+				values = self._filter_minmax(self._transform_values(values))
+			with self._profiler.stage("round"):
+				rounded = self._round_values(values)
+			if self._args.verbose:
+				print("Family member %s: %d undecimated values, %d rounded values." % (name, len(values), len(rounded)), file = sys.stderr)
+			members.append(rounded)
+
+		with self._profiler.stage("grid"):
+			grid = self._family_grid(members)
+		if len(grid) < 2:
+			raise Exception("Family members do not share an X range with at least two values.")
+		with self._profiler.stage("decimate"):
+			(self._cornerpoints, self._max_error) = self._thin_values(grid)
+		self._undecimated_values = None
+		self._stage_counts = {
+			"input":			sum(len(column) for column in columns),
+			"undecimated":		len(grid),
+			"rounded":			len(grid),
+		}
+		if self._args.verbose:
+			print("%d family members on %d shared X values reduced to %d points with %.2f max error." % (len(members), len(grid), len(self._cornerpoints), self._max_error), file = sys.stderr)
 
-		# Analyze result
-		self._analyze_result()
+	@staticmethod
+	def _family_grid(members):
+		"""Bring all rounded family members onto the same X grid: every X
+		value at which any of the members has a value is used (within the X
+		range that all members cover). Members that do not have a value at a
+		particular X are linearly interpolated from their neighbors."""
+		xmin = max(member.x[0] for member in members if len(member) > 0)
+		xmax = min(member.x[-1] for member in members if len(member) > 0)
+		xvalues = sorted(set(x for member in members for x in member.x if xmin <= x <= xmax))
+		columns = [ ]
+		for member in members:
+			column = [ ]
+			for x in xvalues:
+				index = bisect.bisect_left(member.x, x)
+				if member.x[index] == x:
+					column.append(member.y[index])
+				else:
+					(x0, y0) = member[index - 1]
+					(x1, y1) = member[index]
+					column.append(round(y0 + (x - x0) / (x1 - x0) * (y1 - y0)))
+			columns.append(column)
+		return [ (x, tuple(ys)) for (x, ys) in zip(xvalues, zip(*columns)) ]
+
+	def _count_stage(self, stage, points):
+		self._stage_counts[stage] = 0
+		for point in points:
+			self._stage_counts[stage] += 1
+			yield point
+
+	def _check_monotonic(self, points):
+		self._stream_direction = 0
+		last_x = None
+		for (x, y) in points:
+			if (last_x is not None) and (x != last_x):
+				direction = 1 if (x > last_x) else -1
+				if self._stream_direction == 0:
+					self._stream_direction = direction
+				elif direction != self._stream_direction:
+					raise Exception("Streaming code generation requires X values that are monotonic after transformation, but X went from %f to %f." % (last_x, x))
+			last_x = x
+			yield (x, y)
+
+	def _analyze_stream(self, points):
+		for (x, y) in points:
+			self._aoi_analysis.add(x, y)
+			yield (x, y)
+
+	def _process_streaming(self):
+		if self._args.gnuplot:
+			raise Exception("Gnuplot output requires all undecimated values and is not supported in streaming mode.")
+		if self._args.layout == "octave":
+			raise Exception("The octave table layout needs all values at once and is not supported in streaming mode.")
+		if self._args.jobs > 1:
+			raise Exception("Parallel decimation needs all values at once and is not supported in streaming mode.")
+
+		varnames = self._args.in_varnames.split(",")
+		xfunction = ExpressionTools.compile_function(self._args.xval, varnames)
+		yfunction = ExpressionTools.compile_function(self._args.yval, varnames)
+		xmin = self._args.xmin if (self._args.xmin is not None) else float("-inf")
+		xmax = self._args.xmax if (self._args.xmax is not None) else float("inf")
+
+		# Chain of generators: every point passes through all stages before
+		# the next one is read from the file
+		self._stage_counts = { }
+		points = self._count_stage("input", self._iter_raw_points())
+		points = ((xfunction(x, y), yfunction(x, y)) for (x, y) in points)
+		points = self._count_stage("undecimated", ((x, y) for (x, y) in points if xmin <= x <= xmax))
+		points = self._check_monotonic(points)
+		if self._aoi_analysis is not None:
+			points = self._analyze_stream(points)
+		points = self._count_stage("rounded", PointSet.round_points(points))
+
+		# All stages run interleaved, so they can only be profiled together
+		decimator = self._decimator()
+		self._cornerpoints = [ ]
+		with self._profiler.stage("stream"):
+			for cornerpoint in decimator.decimate(points):
+				if self._args.verbose:
+					print("Cornerpoint %d: %d %d" % (len(self._cornerpoints), cornerpoint.x, cornerpoint.y), file = sys.stderr)
+				self._cornerpoints.append(cornerpoint)
+		self._max_error = decimator.max_error
+		self._undecimated_values = None
+
+		if len(self._cornerpoints) == 0:
+			raise Exception("No values left to generate code from.")
+
+		if self._stream_direction == -1:
+			# Scanned from high to low X. Reverse the table and reattribute
+			# the errors to the segment left of each cornerpoint.
+			errors = [ None ] + [ point.error for point in reversed(self._cornerpoints[1:]) ]
+			self._cornerpoints = [ point._replace(error = error) for (point, error) in zip(reversed(self._cornerpoints), errors) ]
+
+		if self._args.verbose:
+			print("Streamed %d values from XY file, %d undecimated values, %d rounded values." % (self._stage_counts["input"], self._stage_counts["undecimated"], self._stage_counts["rounded"]), file = sys.stderr)
+			print("%d input points reduced to %d points with %.2f max error." % (self._stage_counts["input"], len(self._cornerpoints), self._max_error), file = sys.stderr)
 
 	def _emit_code(self):
 		(out_xname, out_yname) = self._args.out_varnames.split(",")
+		to_stdout = (self._args.outfile == "-")
+		filename = self._args.outfile if (not to_stdout) else self._args.funcname
 		xvalues = [ point[0] for point in self._cornerpoints ]
-		yvalues = [ point[1] for point in self._cornerpoints ]
-		env = {
-			"in_type":				CTypeTools.get_type(xvalues),
-			"extd_in_type":			CTypeTools.get_type(xvalues + [ min(xvalues) - 10, max(xvalues) + 10 ]),
-			"out_type":				CTypeTools.get_type(yvalues),
-			"idx_type":				CTypeTools.get_type([ 0, len(self._cornerpoints) ]),
-			"win_mul_yspan_type":	CTypeTools.get_type([ (p1.x - p0.x - 1) * (p1.y - p0.y) for (p0, p1) in zip(self._cornerpoints, self._cornerpoints[1:]) ]),
-			"yspan_type":			CTypeTools.get_type([ p1.y - p0.y for (p0, p1) in zip(self._cornerpoints, self._cornerpoints[1:]) ]),
+		if self._family_names is None:
+			template_name = "lookup_template"
+			curves = [ [ (point.x, point.y) for point in self._cornerpoints ] ]
+		else:
+			template_name = "lookup_family_template"
+			curves = [ [ (point.x, point.y[member]) for point in self._cornerpoints ] for member in range(len(self._family_names)) ]
+		env = CTypeTools.lookup_types(xvalues, curves)
+		c_template_name = template_name
+		if self._octave_table is not None:
+			c_template_name = "lookup_octave_template"
+			env.update(self._octave_table.c_types())
+		env.update({
+			"members":				self._family_names,
 			"lup_name":				self._args.funcname,
 			"points":				self._cornerpoints,
-			"filename":				self._args.outfile,
+			"filename":				filename,
 			"min":					self._cornerpoints[0],
 			"max":					self._cornerpoints[-1],
 			"max_error":			self._max_error,
@@ -99,169 +480,265 @@ class ActionCodeGen(object):
 			"orig_data":			self._undecimated_values,
 			"out_xname":			out_xname,
 			"out_yname":			out_yname,
-			"today":				datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+			"today":				self._timestamp(),
 			"flip_axis":			self._args.gnuplot_flipaxis,
 			"flip_diff":			self._args.gnuplot_flipdiff,
-		}
+			"layout":				self._args.layout,
+			"octave_table":			self._octave_table,
+			"cost_summary":			CostModel.summary_lines(self.cost_data()),
+		})
 
-		try:
-			os.makedirs(self._args.outdir)
-		except FileExistsError:
-			pass
+		generated = { }
+		if self._args.gnuplot:
+			if self._args.gnuplot_binary and to_stdout:
+				raise Exception("A binary gnuplot data file cannot be written when writing to stdout.")
+			env["series"] = self._gnuplot_series()
+			env["data_filename"] = filename + ".dat"
+			if self._args.gnuplot_binary:
+				(env["binary_series"], generated["dat"]) = self._gnuplot_binary(env["series"])
+			else:
+				env["binary_series"] = None
+
+		if not to_stdout:
+			try:
+				os.makedirs(self._args.outdir)
+			except FileExistsError:
+				pass
 
 		generate_extensions = [ "c", "h" ]
 		if self._args.gnuplot:
 			generate_extensions.append("gpl")
+		if self._args.python:
+			generate_extensions.append("py")
+		generate_extensions += list(generated)
 
 		for extension in generate_extensions:
-			template_src = pkgutil.get_data("ucurve.templates", "lookup_template." + extension)
-			template = mako.template.Template(template_src, strict_undefined = True, input_encoding = "utf-8")
-			with open(self._args.outdir + "/" + self._args.outfile + "." + extension, "w") as f:
-				f.write(template.render(**env))
+			if extension in generated:
+				content = generated[extension]
+			elif extension == "c":
+				content = TemplateCache.render(c_template_name + ".c", **env)
+			elif extension == "py":
+				content = TemplateCache.render(template_name + ".py.mako", **env)
+			else:
+				content = TemplateCache.render(template_name + "." + extension, **env)
+			if not to_stdout:
+				IOTools.write_if_changed(self._args.outdir + "/" + self._args.outfile + "." + extension, content)
+			else:
+				with IOTools.open_write("-") as f:
+					f.write(content)
+
+	def _gnuplot_series(self):
+		"""The large data series of the gnuplot output (the actual values and
+		their derivative), each as a pair of X and Y value lists, downsampled
+		unless disabled. The derivative is computed from all values before
+		downsampling."""
+		(xvalues, yvalues) = (self._undecimated_values.x, self._undecimated_values.y)
+		pairs = list(zip(xvalues, yvalues))
+		pairs = list(zip(pairs, pairs[1:]))
+		if not self._args.gnuplot_flipaxis:
+			diff_x = [ (x0 + x1) / 2 for ((x0, y0), (x1, y1)) in pairs ]
+		else:
+			diff_x = [ (y0 + y1) / 2 for ((x0, y0), (x1, y1)) in pairs ]
+		if not self._args.gnuplot_flipdiff:
+			diff_y = [ abs((y1 - y0) / (x1 - x0)) for ((x0, y0), (x1, y1)) in pairs ]
+		else:
+			diff_y = [ abs((x1 - x0) / (y1 - y0)) for ((x0, y0), (x1, y1)) in pairs ]
+		series = {
+			"actual":	(xvalues, yvalues),
+			"diff":		(diff_x, diff_y),
+		}
+		if self._args.gnuplot_points > 0:
+			downsampler = Downsampler(self._args.gnuplot_downsample, self._args.gnuplot_points)
+			if self._args.gnuplot_flipaxis:
+				# Plotted as Y over X, so keep the shape in that direction
+				series["actual"] = tuple(reversed(downsampler.downsample(yvalues, xvalues)))
+			else:
+				series["actual"] = downsampler.downsample(xvalues, yvalues)
+			series["diff"] = downsampler.downsample(diff_x, diff_y)
+		return series
+
+	@staticmethod
+	def _gnuplot_binary(series):
+		"""Pack the series into the content of a binary side file of
+		little-endian float64 X/Y records, one series after another. Returns
+		the record count and byte offset of every series along with it."""
+		data = array.array("d")
+		layout = { }
+		for (name, (xvalues, yvalues)) in series.items():
+			layout[name] = (len(xvalues), data.itemsize * len(data))
+			record = array.array("d", [ 0, 0 ]) * len(xvalues)
+			record[0::2] = array.array("d", xvalues)
+			record[1::2] = array.array("d", yvalues)
+			data += record
+		if sys.byteorder != "little":
+			data.byteswap()
+		return (layout, data.tobytes())
+
+	def _iter_raw_points(self):
+		return ValueFile.iter_points(self._args.xyfile)
 
 	def _read_values(self):
-		values = { }
-		with open(self._args.xyfile) as f:
-			for line in f:
-				line = line.strip()
-				if line.startswith("#") or (line == ""):
-					continue
-				(x, y) = line.split()
-				x = float(x)
-				y = float(y)
-				values[x] = y
-		return values
+		return ValueFile(self._args.xyfile).point_set
 
-	def _transform_values(self, values):
-		(xname, yname) = self._args.in_varnames.split(",")
-		result = { }
-		for (x_in, y_in) in sorted(values.items()):
-			env = {
-				xname: x_in,
-				yname: y_in,
-			}
-			x_out = ExpressionTools.eval_expression(self._args.xval, env)
-			y_out = ExpressionTools.eval_expression(self._args.yval, env)
-			result[x_out] = y_out
-		return result
+	def _read_columns(self):
+		return ValueFile.read_columns(self._args.xyfile)
 
-	@staticmethod
-	def _interpolate(xvalue, low, high):
-		xspan = high[0] - low[0]
-		yspan = high[1] - low[1]
-		xwin = xvalue - low[0]
-		return low[1] + (xwin / xspan) * yspan
-
-	def _interpolation_error(self, values):
-		assert(len(values) >= 3)
-		first = values[0]
-		last = values[-1]
-		max_error = 0
-		for (x, y) in values[1 : -1]:
-			y_interp = self._interpolate(x, first, last)
-			error = y_interp - y
-			max_error = _absmax(max_error, error)
-		return max_error
+	def _transform_values(self, values):
+		varnames = self._args.in_varnames.split(",")
+		xfunction = ExpressionTools.compile_function(self._args.xval, varnames)
+		yfunction = ExpressionTools.compile_function(self._args.yval, varnames)
+		return values.transform(xfunction, yfunction).sort_unique()
 
 	def _filter_minmax(self, values):
-		result = { }
-		for (x, y) in values.items():
-			if (self._args.xmin is not None) and (x < self._args.xmin):
-				continue
-			if (self._args.xmax is not None) and (x > self._args.xmax):
-				continue
-			result[x] = y
-		return result
+		return values.filter_x(xmin = self._args.xmin, xmax = self._args.xmax)
 
 	def _round_values(self, points):
-		result = collections.defaultdict(list)
-		for (x, y) in points:
-			rndx = round(x)
-			rndy = round(y)
-			abserr = abs(rndx - x)
-			result[rndx].append((abserr, rndy))
-
-		result_list = [ ]
-		for (x, ylist) in sorted(result.items()):
-			ylist.sort()
-			result_list.append((x, ylist[0][1]))
-		return result_list
+		return points.round()
+
+	def _decimator(self):
+		if self._args.decimation == "free-knot":
+			if self._args.jobs > 1:
+				raise Exception("Parallel decimation is only supported for greedy decimation.")
+			return FreeKnotDecimator(self._args.max_error_y, free_x = self._args.free_x)
+		elif self._args.free_x:
+			raise Exception("Free X positions of cornerpoints require free-knot decimation.")
+		if self._args.jobs > 1:
+			return ParallelDecimator(self._args.max_error_y, self._args.jobs)
+		return GreedyDecimator(self._args.max_error_y)
+
+	def _octave_values(self, points, rounded_points):
+		bits = None
+		if self._args.octave_entries is not None:
+			bits = self._args.octave_entries.bit_length() - 1
+			if self._args.octave_entries != (1 << bits):
+				raise Exception("Number of entries per octave must be a power of two, but %d was given." % (self._args.octave_entries))
+		(self._octave_table, max_error) = OctaveTable.fit(list(points), list(rounded_points), self._args.max_error_y, bits = bits)
+		(max_error, segment_errors) = self._octave_table.errors(rounded_points)
+		if self._args.verbose:
+			print("Octave table with %d entries per octave, %d entries in total." % (self._octave_table.entries_per_octave, self._octave_table.size), file = sys.stderr)
+		cornerpoints = [ ]
+		for (index, y) in enumerate(self._octave_table.yvalues):
+			x = self._octave_table.xmin + self._octave_table.sample_offset(index)
+			cornerpoints.append(PointWithError(x = x, y = y, error = segment_errors.get(index - 1, 0) if (index > 0) else None))
+		return (cornerpoints, max_error)
 
 	def _thin_values(self, points):
-		next_error = None
-		max_error = 0
-		index = 0
-		result = [ ]
-		while index < len(points):
-			result.append(_PointWithError(x = points[index][0], y = points[index][1], error = next_error))
-			low = result[-1]
-
-			next_error = 0
-			next_index = index + 1
-			for potential_high_index in range(index + 3, len(points)):
-				error = self._interpolation_error(points[index : potential_high_index])
-				if abs(error) <= abs(self._args.max_error_y):
-					next_index = potential_high_index
-					next_error = _absmax(next_error, error)
-					max_error = _absmax(max_error, error)
-				else:
-					break
-			index = next_index
+		decimator = self._decimator()
+		result = list(decimator.decimate(points))
+		if self._args.verbose and isinstance(decimator, ParallelDecimator) and (decimator.chunks > 1):
+			print("Decimated %d chunks in %d jobs; stitching the chunk boundaries decimated %d of %d points again, the result is identical to a sequential run." % (decimator.chunks, self._args.jobs, decimator.stitched_points, len(points)), file = sys.stderr)
+		return (result, decimator.max_error)
+
+	@property
+	def stage_counts(self):
+		return self._stage_counts
+
+	@property
+	def cornerpoints(self):
+		return self._cornerpoints
+
+	@property
+	def max_error(self):
+		return self._max_error
+
+	def cost_data(self):
+		"""Estimated table size and lookup cycles of the generated code for
+		all targets that the cost model knows."""
+		if self._cost is None:
+			xvalues = [ point.x for point in self._cornerpoints ]
+			if self._family_names is None:
+				curves = [ [ (point.x, point.y) for point in self._cornerpoints ] ]
+				members = None
+			else:
+				curves = [ [ (point.x, point.y[member]) for point in self._cornerpoints ] for member in range(len(self._family_names)) ]
+				members = len(self._family_names)
+			types = CTypeTools.lookup_types(xvalues, curves)
+			layout = "search"
+			if self._octave_table is not None:
+				types.update(self._octave_table.c_types())
+				layout = "octave"
+			self._cost = CostModel.estimate_all(types, xvalues, members = members, progmem = (self._args.struct_lookup == "avr-progmem"), layout = layout)
+		return self._cost
 
-		return (result, max_error)
+	@staticmethod
+	def _range_analysis_data(analysis):
+		minmax = analysis.minmax
+		diff_minmax = analysis.diff_minmax
+		result = {
+			"ymin":		analysis.ymin,
+			"ymax":		analysis.ymax,
+			"count":	analysis.count,
+		}
+		if minmax.have_data:
+			result["xspan"] = [ minmax.xmin.x, minmax.xmax.x ]
+		if minmax.have_data:
+			result["yspan"] = [ minmax.ymin.y, minmax.ymax.y ]
+		if diff_minmax.have_data:
+			result["dy_dx"] = {
+				"absmin": {
+					"x":		diff_minmax.yabsmin.x,
+					"dy_dx":	diff_minmax.yabsmin.y,
+					"y":		diff_minmax.yabsmin.info,
+				},
+				"absmax": {
+					"x":		diff_minmax.yabsmax.x,
+					"dy_dx":	diff_minmax.yabsmax.y,
+					"y":		diff_minmax.yabsmax.info,
+				},
+				"avg_dy_dx": diff_minmax.yavg,
+			}
+		return result
 
-	def _analyze_result(self):
-		if self._args.yaoi is None:
-			return
+	def analysis_data(self):
+		if self._cached_analysis is not None:
+			return self._cached_analysis[0]
+		if self._aoi_analysis is None:
+			return {
+				"cost":		self.cost_data(),
+			}
 
 		(xname, yname) = self._args.out_varnames.split(",")
-		(yaoimin, yaoimax) = [ float(v) for v in self._args.yaoi.split(",") ]
+		ranges = [ self._range_analysis_data(analysis) for analysis in self._aoi_analysis.analyses ]
+		result = {
+			"xname":	xname,
+			"yname":	yname,
+			"cost":		self.cost_data(),
+			"aoi":		ranges,
+		}
+		# The first range is also given at top level, as it was before
+		# multiple ranges were supported
+		for key in [ "xspan", "yspan", "dy_dx" ]:
+			if key in ranges[0]:
+				result[key] = ranges[0][key]
+		return result
 
-		values_in_yaoi = [ (x, y) for (x, y) in self._undecimated_values if yaoimin <= y <= yaoimax ]
-		minmax = MinMax()
-		for (x, y) in values_in_yaoi:
-			minmax.add(x, y)
+	def _analysis_text(self):
+		if self._cached_analysis is not None:
+			return self._cached_analysis[1]
+		if self._aoi_analysis is None:
+			return None
 
-		diff_minmax = MinMax()
-		for ((x0, y0), (x1, y1)) in zip(values_in_yaoi, values_in_yaoi[1:]):
-			dy = y1 - y0
-			dx = x1 - x0
-			if dx != 0:
-				dy_over_dx = dy / dx
-				x = (x0 + x1) / 2
-				y = (y0 + y1) / 2
-				diff_minmax.add(x, dy_over_dx, info = y)
+		(xname, yname) = self._args.out_varnames.split(",")
+		lines = [ ]
+		for analysis in self._aoi_analysis.analyses:
+			(yaoimin, yaoimax) = (analysis.ymin, analysis.ymax)
+			minmax = analysis.minmax
+			diff_minmax = analysis.diff_minmax
 
-		if not self._args.json_analysis:
-			print("Analyzing area-of-interest range of %s: %.1f - %.1f (span size %.1f)" % (yname, yaoimin, yaoimax, yaoimax - yaoimin))
+			lines.append("Analyzing area-of-interest range of %s: %.1f - %.1f (span size %.1f)" % (yname, yaoimin, yaoimax, yaoimax - yaoimin))
 			if minmax.have_data:
-				print("    %d values in that range, %s from %.1f - %.1f, %s from %.1f - %.1f" % (len(values_in_yaoi), xname, minmax.xmin.x, minmax.xmax.x, yname, minmax.ymin.y, minmax.ymax.y))
+				lines.append("    %d values in that range, %s from %.1f - %.1f, %s from %.1f - %.1f" % (analysis.count, xname, minmax.xmin.x, minmax.xmax.x, yname, minmax.ymin.y, minmax.ymax.y))
 			if diff_minmax.have_data:
-				print("    d%s/d%s:" % (yname, xname))
-				print("        Absolute d%s/d%s minimum at %s = %.1f, %.1f %s/%s (at %.1f %s)" % (yname, xname, xname, diff_minmax.yabsmin.x, diff_minmax.yabsmin.y, yname, xname, diff_minmax.yabsmin.info, yname))
-				print("        Absolute d%s/d%s maximum at %s = %.1f, %.1f %s/%s (at %.1f %s)" % (yname, xname, xname, diff_minmax.yabsmax.x, diff_minmax.yabsmax.y, yname, xname, diff_minmax.yabsmax.info, yname))
-				print("        Average: %.2f %s/%s = %.2f %s/%s" % (diff_minmax.yavg, yname, xname, 1 / diff_minmax.yavg, xname, yname))
+				lines.append("    d%s/d%s:" % (yname, xname))
+				lines.append("        Absolute d%s/d%s minimum at %s = %.1f, %.1f %s/%s (at %.1f %s)" % (yname, xname, xname, diff_minmax.yabsmin.x, diff_minmax.yabsmin.y, yname, xname, diff_minmax.yabsmin.info, yname))
+				lines.append("        Absolute d%s/d%s maximum at %s = %.1f, %.1f %s/%s (at %.1f %s)" % (yname, xname, xname, diff_minmax.yabsmax.x, diff_minmax.yabsmax.y, yname, xname, diff_minmax.yabsmax.info, yname))
+				lines.append("        Average: %.2f %s/%s = %.2f %s/%s" % (diff_minmax.yavg, yname, xname, 1 / diff_minmax.yavg, xname, yname))
+		return "\n".join(lines)
+
+	def _analyze_result(self):
+		if not self._args.json_analysis:
+			if self._analysis_text() is not None:
+				print(self._analysis_text())
 		else:
-			result = {
-				"xname":	xname,
-				"yname":	yname,
-			}
-			if minmax.have_data:
-				result["xspan"] = [ minmax.xmin.x, minmax.xmax.x ]
-			if minmax.have_data:
-				result["yspan"] = [ minmax.ymin.y, minmax.ymax.y ]
-			if diff_minmax.have_data:
-				result["dy_dx"] = {
-					"absmin": {
-						"x":		diff_minmax.yabsmin.x,
-						"dy_dx":	diff_minmax.yabsmin.y,
-						"y":		diff_minmax.yabsmin.info,
-					},
-					"absmax": {
-						"x":		diff_minmax.yabsmax.x,
-						"dy_dx":	diff_minmax.yabsmax.y,
-						"y":		diff_minmax.yabsmax.info,
-					},
-					"avg_dy_dx": diff_minmax.yavg,
-				}
-			print(json.dumps(result))
+			import json
+			print(json.dumps(self.analysis_data()))
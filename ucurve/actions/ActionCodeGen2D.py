@@ -0,0 +1,101 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+from ucurve.Tools import ExpressionTools, IOTools
+from ucurve.ValueFile import ValueFile
+from ucurve.BilinearTable import BilinearTable
+from ucurve.TemplateCache import TemplateCache
+from ucurve.Profiler import Profiler
+
+class ActionCodeGen2D(object):
+	"""Generates a bilinear lookup table of Z from X and Y for values on a
+	rectangular grid (an XYZ file with one x y z row per grid point)."""
+
+	def __init__(self, cmd, args):
+		self._args = args
+		self._profiler = Profiler.from_args(self._args)
+
+		with self._profiler.stage("read"):
+			points = self._read_points()
+		if self._args.verbose:
+			print("Read %d values from XYZ file." % (len(points)), file = sys.stderr)
+
+		with self._profiler.stage("grid"):
+			grid = BilinearTable.from_points(points)
+		if self._args.verbose:
+			print("Grid of %d x %d rounded values." % (len(grid.xvalues), len(grid.yvalues)), file = sys.stderr)
+
+		with self._profiler.stage("decimate"):
+			(self._table, self._max_error) = grid.decimate(self._args.max_error_z)
+		if self._args.verbose:
+			print("%d x %d grid reduced to %d x %d with %.2f max error, %d bytes of tables." % (len(grid.xvalues), len(grid.yvalues), len(self._table.xvalues), len(self._table.yvalues), self._max_error, self._table.table_size()), file = sys.stderr)
+
+		with self._profiler.stage("emit"):
+			self._emit_code()
+		self._profiler.report()
+
+	def _read_points(self):
+		varnames = self._args.in_varnames.split(",")
+		if len(varnames) != 3:
+			raise Exception("Expected three variable names (X, Y and Z), but got %d." % (len(varnames)))
+		expressions = [ expression if (expression is not None) else varname for (expression, varname) in zip([ self._args.xval, self._args.yval, self._args.zval ], varnames) ]
+		functions = [ ExpressionTools.compile_function(expression, varnames) for expression in expressions ]
+		points = [ ]
+		for row in ValueFile.iter_rows(self._args.xyzfile):
+			if len(row) != 3:
+				raise Exception("%s: expected 3 columns (x y z), but got %d." % (self._args.xyzfile, len(row)))
+			points.append(tuple(function(*row) for function in functions))
+		if len(points) == 0:
+			raise Exception("%s: no values found." % (self._args.xyzfile))
+		return points
+
+	def _timestamp(self):
+		return IOTools.creation_timestamp() if (not self._args.no_timestamp) else None
+
+	def _emit_code(self):
+		(out_xname, out_yname, out_zname) = self._args.out_varnames.split(",")
+		to_stdout = (self._args.outfile == "-")
+		filename = self._args.outfile if (not to_stdout) else self._args.funcname
+		env = self._table.c_types()
+		env.update({
+			"lup_name":			self._args.funcname,
+			"table":			self._table,
+			"table_size":		self._table.table_size(),
+			"filename":			filename,
+			"max_error":		self._max_error,
+			"struct_lookup":	self._args.struct_lookup,
+			"out_xname":		out_xname,
+			"out_yname":		out_yname,
+			"out_zname":		out_zname,
+			"today":			self._timestamp(),
+		})
+
+		if not to_stdout:
+			os.makedirs(self._args.outdir, exist_ok = True)
+		for extension in [ "c", "h" ]:
+			content = TemplateCache.render("lookup2d_template." + extension, **env)
+			if not to_stdout:
+				IOTools.write_if_changed(self._args.outdir + "/" + self._args.outfile + "." + extension, content)
+			else:
+				with IOTools.open_write("-") as f:
+					f.write(content)
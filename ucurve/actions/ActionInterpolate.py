@@ -21,28 +21,61 @@
 
 from ucurve.ValueFile import ValueFile
 from ucurve.MinMax import MinMax
-from ucurve.Interpolation import LinearInterpolator, CSplineInterpolator
+from ucurve.Interpolation import LinearInterpolator, CSplineInterpolator, PolyfitInterpolator
 from ucurve.Sweeper import Sweeper
+from ucurve.Profiler import Profiler
+from ucurve.PointWriter import PointWriter
 
 class ActionInterpolate(object):
 	def __init__(self, cmd, args):
-		values = ValueFile(args.xyfile)
-		minmax = MinMax().feed(values)
+		profiler = Profiler.from_args(args)
+		with profiler.stage("read"):
+			values = ValueFile(args.xyfile)
+			at = ValueFile.read_xvalues(args.at) if (args.at is not None) else None
+		with profiler.stage("interpolate"):
+			points = self.interpolate(values.point_set, args.algorithm, args.xmin, args.xmax, args.steps, args.logarithmic, at = at, **self.algorithm_options(args))
+		with profiler.stage("write"), PointWriter.open(args.outfile, args.format) as writer:
+			writer.write_points(points)
+		profiler.report()
+
+	@staticmethod
+	def algorithm_options(args):
+		"""Keyword arguments for the interpolator of the chosen algorithm."""
+		if args.algorithm == "polyfit":
+			return {
+				"degree":				args.degree,
+				"segments":				args.segments,
+				"continuity":			args.continuity,
+				"interpolate_knots":	args.interpolate_knots,
+			}
+		return { }
+
+	@staticmethod
+	def interpolate(point_set, algorithm, xmin = None, xmax = None, steps = 100, logarithmic = False, at = None, **options):
+		"""Set up the interpolator for the given points and return an
+		iterator over (x, y) tuples of the interpolated curve. If xmin or
+		xmax are not given, the minimum and maximum X of the points are
+		used. If a sequence of X values is given as "at", the curve is
+		evaluated at exactly these values (in that order) instead of a
+		sweep. Further options are passed on to the interpolator."""
+		minmax = MinMax().feed(point_set)
 		interpolator_class = {
 			"linear":		LinearInterpolator,
 			"cspline":		CSplineInterpolator,
-		}.get(args.algorithm)
+			"polyfit":		PolyfitInterpolator,
+		}.get(algorithm)
 		if interpolator_class is None:
 			raise Exception(NotImplemented)
 
-		interpolator = interpolator_class(values.points)
-		if args.xmin is None:
+		interpolator = interpolator_class(point_set, **options)
+		if xmin is None:
 			minval = minmax.xmin.x
 		else:
-			minval = args.xmin
-		if args.xmax is None:
+			minval = xmin
+		if xmax is None:
 			maxval = minmax.xmax.x
 		else:
-			maxval = args.xmax
-		for x in Sweeper(minval = minval, maxval = maxval, stepcnt = args.steps, logarithmic = args.logarithmic):
-			print("%f %f" % (x, interpolator[x]))
+			maxval = xmax
+		if at is None:
+			at = list(Sweeper(minval = minval, maxval = maxval, stepcnt = steps, logarithmic = logarithmic))
+		return zip(at, interpolator.evaluate(at))
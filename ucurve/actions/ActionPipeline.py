@@ -0,0 +1,71 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+from ucurve.PointSet import PointSet
+from ucurve.Sweeper import Sweeper
+from ucurve.Tools import ExpressionTools
+from ucurve.actions.ActionXYGen import ActionXYGen
+from ucurve.actions.ActionCodeGen import ActionCodeGen
+
+class ActionPipeline(ActionCodeGen):
+	"""Code generation directly from a formula: the X/Y points that xygen
+	would write to a file are generated in-process and passed on to the
+	code generator as an iterator."""
+
+	def _xfilter(self):
+		# If the X transformation does not depend on Y, points that fall
+		# outside of --xmin/--xmax can be discarded before the (potentially
+		# expensive) formula is evaluated for them.
+		if (self._args.xmin is None) and (self._args.xmax is None):
+			return None
+		(xname, yname) = self._args.in_varnames.split(",")
+		if yname in ExpressionTools.get_variables(self._args.xval):
+			return None
+
+		xfunction = ExpressionTools.compile_function(self._args.xval, [ xname ])
+		xmin = self._args.xmin if (self._args.xmin is not None) else float("-inf")
+		xmax = self._args.xmax if (self._args.xmax is not None) else float("inf")
+		return lambda x: xmin <= xfunction(x) <= xmax
+
+	def _sweeper(self):
+		return Sweeper(minval = self._args.sweep_xmin, maxval = self._args.sweep_xmax, stepcnt = self._args.steps, logarithmic = self._args.logarithmic)
+
+	def _iter_raw_points(self):
+		fvars = ActionXYGen.parse_vars(self._args.var)
+		return ActionXYGen.generate_points(self._args.formula, self._args.xvar, fvars, self._sweeper(), xfilter = self._xfilter())
+
+	def _read_values(self):
+		return PointSet.from_points(self._iter_raw_points()).sort_unique()
+
+	def _read_columns(self):
+		# Every combination of variable values becomes a family member
+		grid = ActionXYGen.parse_var_grid(self._args.var)
+		if len(grid) == 1:
+			return [ self._read_values() ]
+		columns = [ PointSet() for fvars in grid ]
+		for row in ActionXYGen.generate_rows(self._args.formula, self._args.xvar, grid, self._sweeper()):
+			for (column, y) in zip(columns, row[1 : ]):
+				column.append(row[0], y)
+		return [ column.sort_unique() for column in columns ]
+
+	def _input_filenames(self):
+		# The formula and all its parameters are part of the options
+		return [ ]
@@ -0,0 +1,234 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import json
+import time
+import stat
+import signal
+import asyncio
+import collections
+import concurrent.futures
+from ucurve.ValueFile import ValueFile
+from ucurve.Sweeper import Sweeper
+from ucurve.PointWriter import PointWriter
+from ucurve.actions.ActionCodeGen import ActionCodeGen
+from ucurve.actions.ActionPipeline import ActionPipeline
+from ucurve.actions.ActionXYGen import ActionXYGen
+from ucurve.actions.ActionInterpolate import ActionInterpolate
+from ucurve.actions.ActionBatch import options_to_cmdline, job_result
+
+class _XYFileCache(object):
+	"""Parsed X/Y files of a worker process. Entries are keyed by the file's
+	path, modification time and size, so a file that has been changed in
+	between two requests is read again."""
+	max_entries = 16
+	_entries = collections.OrderedDict()
+
+	@classmethod
+	def get(cls, filename, loader):
+		if filename == "-":
+			raise Exception("X/Y data cannot be read from stdin in server mode.")
+		statresult = os.stat(filename)
+		key = (os.path.realpath(filename), statresult.st_mtime_ns, statresult.st_size, loader)
+		value = cls._entries.get(key)
+		if value is None:
+			value = loader(filename)
+			cls._entries[key] = value
+			while len(cls._entries) > cls.max_entries:
+				cls._entries.popitem(last = False)
+		else:
+			cls._entries.move_to_end(key)
+		return value
+
+	@staticmethod
+	def load_point_set(filename):
+		return ValueFile(filename).point_set
+
+class _ServedCodeGen(ActionCodeGen):
+	def _iter_raw_points(self):
+		return iter(self._read_values())
+
+	def _read_values(self):
+		return _XYFileCache.get(self._args.xyfile, _XYFileCache.load_point_set)
+
+	def _read_columns(self):
+		return _XYFileCache.get(self._args.xyfile, ValueFile.read_columns)
+
+def _init_worker(cache_size):
+	_XYFileCache.max_entries = cache_size
+
+def _serve_codegen(command, args):
+	action_class = _ServedCodeGen if (command == "codegen") else ActionPipeline
+	return job_result(action_class(command, args, print_analysis = False))
+
+def _serve_interpolate(command, args):
+	point_set = _XYFileCache.get(args.xyfile, _XYFileCache.load_point_set)
+	at = ValueFile.read_xvalues(args.at) if (args.at is not None) else None
+	points = ActionInterpolate.interpolate(point_set, args.algorithm, args.xmin, args.xmax, args.steps, args.logarithmic, at = at, **ActionInterpolate.algorithm_options(args))
+	if (args.outfile is not None) and (args.outfile != "-"):
+		with PointWriter.open(args.outfile, args.format) as writer:
+			writer.write_points(points)
+		return { "outfile": args.outfile }
+	return { "points": [ [ x, y ] for (x, y) in points ] }
+
+def _serve_xygen(command, args):
+	if (args.outfile is not None) and (args.outfile != "-"):
+		ActionXYGen(command, args)
+		return { "outfile": args.outfile }
+	grid = ActionXYGen.parse_var_grid(args.var)
+	sweeper = Sweeper(minval = args.xmin, maxval = args.xmax, stepcnt = args.steps, logarithmic = args.logarithmic)
+	return { "points": [ list(row) for row in ActionXYGen.generate_rows(args.formula, args.xvar, grid, sweeper) ] }
+
+_HANDLERS = {
+	"codegen":		_serve_codegen,
+	"pipeline":		_serve_codegen,
+	"interpolate":	_serve_interpolate,
+	"xygen":		_serve_xygen,
+}
+
+def _execute(command, args):
+	t0 = time.time()
+	result = _HANDLERS[command](command, args)
+	return (result, time.time() - t0)
+
+class ActionServe(object):
+	"""Long-running server that accepts jobs as JSON requests, one per line,
+	either on stdin (answering on stdout) or on a Unix socket. A request
+	looks like {"id": 1, "command": "codegen", "args": {"xyfile":
+	"ntc.txt", "max-error-y": 1}}, where "args" are the same options that
+	the command takes on the command line. Requests are answered as soon as
+	they finish, so responses may arrive out of order; they carry the
+	request's "id". Jobs are run in a pool of worker processes which keep
+	parsed X/Y files and compiled formulas cached between requests."""
+
+	_POSITIONAL_ARGS = {
+		"codegen":		[ "xyfile" ],
+		"pipeline":		[ "formula" ],
+		"interpolate":	[ "xyfile" ],
+		"xygen":		[ "formula" ],
+	}
+
+	def __init__(self, cmd, args):
+		self._args = args
+		self._executor = concurrent.futures.ProcessPoolExecutor(max_workers = self._args.jobs, initializer = _init_worker, initargs = (self._args.cache_size, ))
+		try:
+			if self._args.socket is None:
+				asyncio.run(self._serve_stdio())
+			else:
+				asyncio.run(self._serve_socket())
+		except KeyboardInterrupt:
+			pass
+		finally:
+			self._executor.shutdown()
+
+	def _parse_request(self, request):
+		if not isinstance(request, dict):
+			raise Exception("Request must be a JSON object.")
+		command = request.get("command")
+		if command not in self._POSITIONAL_ARGS:
+			raise Exception("Unsupported command '%s' (must be one of %s)." % (command, ", ".join(sorted(self._POSITIONAL_ARGS))))
+		options = request.get("args", { })
+		if not isinstance(options, dict):
+			raise Exception("Request arguments must be a JSON object.")
+		args = self._args.multicommand.parse(options_to_cmdline(command, options, self._POSITIONAL_ARGS[command]), silent = True).args
+		if getattr(args, "xyfile", None) == "-":
+			raise Exception("X/Y data cannot be read from stdin in server mode.")
+		if (command in [ "codegen", "pipeline" ]) and (args.outfile == "-"):
+			raise Exception("Generated code cannot be written to stdout in server mode.")
+		return (command, args)
+
+	async def _handle_request(self, line):
+		t0 = time.time()
+		response = { }
+		try:
+			request = json.loads(line)
+			if isinstance(request, dict) and ("id" in request):
+				response["id"] = request["id"]
+			(command, args) = self._parse_request(request)
+			(result, compute_time) = await asyncio.get_running_loop().run_in_executor(self._executor, _execute, command, args)
+			response["result"] = result
+			response["time"] = {
+				"compute":	compute_time,
+				"total":	time.time() - t0,
+			}
+		except Exception as e:
+			response["error"] = "%s: %s" % (e.__class__.__name__, str(e))
+		return json.dumps(response) + "\n"
+
+	async def _serve_lines(self, readline, write):
+		pending = set()
+		async def respond(line):
+			write(await self._handle_request(line))
+		while True:
+			line = await readline()
+			if len(line) == 0:
+				break
+			if len(line.strip()) == 0:
+				continue
+			task = asyncio.ensure_future(respond(line))
+			pending.add(task)
+			task.add_done_callback(pending.discard)
+		if len(pending) > 0:
+			await asyncio.wait(pending)
+
+	async def _serve_stdio(self):
+		def write(response):
+			sys.stdout.write(response)
+			sys.stdout.flush()
+
+		reader = asyncio.StreamReader(limit = 16 * 1024 * 1024)
+		try:
+			await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+			readline = reader.readline
+		except ValueError:
+			# stdin is redirected from a regular file, which cannot be
+			# watched by the event loop; reading it never blocks anyway
+			async def readline():
+				return sys.stdin.readline()
+		await self._serve_lines(readline, write)
+
+	async def _handle_connection(self, reader, writer):
+		try:
+			await self._serve_lines(reader.readline, lambda response: writer.write(response.encode()))
+			await writer.drain()
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+
+	async def _serve_socket(self):
+		socket_path = self._args.socket
+		if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+			# Left over from a previous server that did not shut down cleanly
+			os.unlink(socket_path)
+
+		stop = asyncio.Event()
+		loop = asyncio.get_running_loop()
+		for signum in [ signal.SIGINT, signal.SIGTERM ]:
+			loop.add_signal_handler(signum, stop.set)
+		server = await asyncio.start_unix_server(self._handle_connection, path = socket_path, limit = 16 * 1024 * 1024)
+		try:
+			async with server:
+				await stop.wait()
+		finally:
+			os.unlink(socket_path)
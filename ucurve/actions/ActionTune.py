@@ -0,0 +1,154 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import time
+import json
+import math
+from ucurve.ValueFile import ValueFile
+from ucurve.Tools import ExpressionTools, CTypeTools, IOTools
+from ucurve.Decimator import GreedyDecimator
+from ucurve.CostModel import CostModel
+
+_variants = None
+_target = None
+
+def _init_worker(variants, target):
+	global _variants, _target
+	_variants = variants
+	_target = target
+
+def _decimate(variant_index, max_error_y):
+	decimator = GreedyDecimator(max_error_y)
+	cornerpoints = list(decimator.decimate(_variants[variant_index]))
+	xvalues = [ point.x for point in cornerpoints ]
+	types = CTypeTools.lookup_types(xvalues, [ [ (point.x, point.y) for point in cornerpoints ] ])
+	cost_model = CostModel(_target, types)
+	(worst_cycles, average_cycles) = cost_model.lookup_cycles(xvalues, "linear")
+	return {
+		"points":			len(cornerpoints),
+		"max_error":		decimator.max_error,
+		"in_type":			types["in_type"],
+		"out_type":			types["out_type"],
+		"table_bytes":		cost_model.table_bytes(len(cornerpoints)),
+		"lookup_cycles":	worst_cycles,
+		"average_cycles":	round(average_cycles, 1),
+	}
+
+class ActionTune(object):
+	"""Searches for the best trade-off between table size, accuracy and
+	lookup cost: the X/Y file is read, transformed, filtered and rounded
+	once for every combination of --xval and --yval, then decimated with
+	every requested error budget in parallel. Table size and lookup cycles
+	are estimated by the cost model of the chosen target. All candidates
+	that are not dominated by another one (i.e., that are not both larger
+	and less accurate and more expensive to look up) are reported as
+	JSON."""
+
+	def __init__(self, cmd, args):
+		self._args = args
+		budgets = self.parse_budgets(self._args.max_error_y)
+		t0 = time.time()
+		variants = self._prepare_variants()
+
+		tasks = [ (variant_index, budget) for variant_index in range(len(variants)) for budget in budgets ]
+		if (self._args.jobs == 1) or (len(tasks) <= 1):
+			_init_worker([ points for (xval, yval, points) in variants ], self._args.target)
+			results = [ _decimate(*task) for task in tasks ]
+		else:
+			import concurrent.futures
+			with concurrent.futures.ProcessPoolExecutor(max_workers = self._args.jobs, initializer = _init_worker, initargs = ([ points for (xval, yval, points) in variants ], self._args.target)) as executor:
+				results = list(executor.map(_decimate, *zip(*tasks)))
+
+		candidates = [ ]
+		for ((variant_index, budget), result) in zip(tasks, results):
+			(xval, yval, points) = variants[variant_index]
+			candidate = {
+				"xval":			xval,
+				"yval":			yval,
+				"max_error_y":	budget,
+			}
+			candidate.update(result)
+			candidates.append(candidate)
+
+		report = {
+			"candidates":	len(candidates),
+			"pareto":		self.pareto_front(candidates),
+			"time":			time.time() - t0,
+		}
+		if self._args.all:
+			report["all"] = candidates
+		with IOTools.open_write(self._args.report) as f:
+			json.dump(report, f, indent = 4 if self._args.pretty else None)
+			print(file = f)
+
+	@staticmethod
+	def parse_budgets(spec):
+		"""Parse a comma-separated list of error budgets, each of which can
+		either be a single value or an inclusive range start:stop:step."""
+		budgets = set()
+		for item in spec.split(","):
+			if ":" in item:
+				(start, stop, step) = [ float(value) for value in item.split(":") ]
+				if step <= 0:
+					raise Exception("Error budget range %s needs a positive step width." % (item))
+				count = math.floor((stop - start) / step + 1e-9) + 1
+				budgets |= set(start + i * step for i in range(count))
+			else:
+				budgets.add(float(item))
+		if len(budgets) == 0:
+			raise Exception("No error budgets given.")
+		return sorted(budgets)
+
+	@staticmethod
+	def pareto_front(candidates):
+		"""Return all candidates that are not dominated by any other one in
+		table size, absolute maximum error and worst-case lookup cycles,
+		sorted by table size."""
+		def metrics(candidate):
+			return (candidate["table_bytes"], abs(candidate["max_error"]), candidate["lookup_cycles"])
+
+		front = [ ]
+		for candidate in candidates:
+			candidate_metrics = metrics(candidate)
+			dominated = False
+			for other in candidates:
+				other_metrics = metrics(other)
+				if (other_metrics != candidate_metrics) and all(o <= c for (o, c) in zip(other_metrics, candidate_metrics)):
+					dominated = True
+					break
+			if not dominated:
+				front.append(candidate)
+		front.sort(key = lambda candidate: (metrics(candidate), candidate["max_error_y"]))
+		return front
+
+	def _prepare_variants(self):
+		values = ValueFile(self._args.xyfile).point_set
+		varnames = self._args.in_varnames.split(",")
+		variants = [ ]
+		for xval in (self._args.xval or [ "x" ]):
+			for yval in (self._args.yval or [ "y" ]):
+				xfunction = ExpressionTools.compile_function(xval, varnames)
+				yfunction = ExpressionTools.compile_function(yval, varnames)
+				points = values.transform(xfunction, yfunction).sort_unique().filter_x(xmin = self._args.xmin, xmax = self._args.xmax).round()
+				if len(points) == 0:
+					raise Exception("No values left for xval %s and yval %s." % (xval, yval))
+				variants.append((xval, yval, points))
+		return variants
@@ -19,23 +19,141 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import os
 from ucurve.Sweeper import Sweeper
 from ucurve.Tools import ExpressionTools
+from ucurve.Profiler import Profiler
+from ucurve.PointWriter import PointWriter
 
 class ActionXYGen(object):
 	def __init__(self, cmd, args):
-		fvars = { }
-		for keyvalue in args.var:
-			(varname, expression) = keyvalue.split("=", maxsplit = 1)
-			value = ExpressionTools.eval_expression(expression, fvars)
-			fvars[varname] = value
+		profiler = Profiler.from_args(args)
+		with profiler.stage("setup"):
+			grid = self.parse_var_grid(args.var)
+			sweeper = Sweeper(minval = args.xmin, maxval = args.xmax, stepcnt = args.steps, logarithmic = args.logarithmic)
+		with profiler.stage("generate"):
+			if args.split:
+				if (args.outfile is None) or (args.outfile == "-"):
+					raise Exception("Writing one file per combination of variable values requires an output filename.")
+				for (filename, fvars) in zip(self.split_filenames(args.outfile, len(grid)), grid):
+					self._write(filename, args, fvars, [ ], self.generate_points(args.formula, args.xvar, fvars, sweeper))
+			else:
+				(fixed, varying) = self.split_grid(grid)
+				if len(varying) == 0:
+					points = self.generate_points(args.formula, args.xvar, fixed, sweeper)
+				else:
+					points = self.generate_rows(args.formula, args.xvar, grid, sweeper)
+				self._write(args.outfile, args, fixed, varying, points)
+		profiler.report()
 
-		with open(args.outfile or "/dev/stdout", "w") as f:
-			print("# Y(%s) = %s" % (args.xvar, args.formula), file = f)
+	@staticmethod
+	def _write(filename, args, fvars, varying, points):
+		with PointWriter.open(filename, args.format) as writer:
+			writer.write_comment("Y(%s) = %s" % (args.xvar, args.formula))
 			for (x, y) in sorted(fvars.items()):
-				print("#    %s = %f" % (x, y), file = f)
-			print(file = f)
-			for x in Sweeper(minval = args.xmin, maxval = args.xmax, stepcnt = args.steps, logarithmic = args.logarithmic):
-				fvars[args.xvar] = x
-				y = ExpressionTools.eval_expression(args.formula, fvars)
-				print("%f %f" % (x, y), file = f)
+				writer.write_comment("   %s = %f" % (x, y))
+			if len(varying) > 0:
+				writer.write_comment("Columns:")
+				for (column, column_vars) in enumerate(varying):
+					writer.write_comment("   y%d: %s" % (column, ", ".join("%s = %f" % (x, y) for (x, y) in sorted(column_vars.items()))))
+			writer.write_comment()
+			writer.write_points(points)
+
+	@staticmethod
+	def _split_top_level(text, separator):
+		"""Split the text at every separator that is not enclosed in
+		parentheses or brackets, so that function calls like pow(2, 3) stay
+		intact."""
+		parts = [ ]
+		(depth, start) = (0, 0)
+		for (index, char) in enumerate(text):
+			if char in "([":
+				depth += 1
+			elif char in ")]":
+				depth -= 1
+			elif (char == separator) and (depth == 0):
+				parts.append(text[start : index])
+				start = index + 1
+		parts.append(text[start : ])
+		return parts
+
+	@classmethod
+	def _eval_values(cls, expression, fvars):
+		"""Evaluate the value part of a --var assignment, which is either a
+		single expression, a comma-separated list of expressions or a range
+		start:stop:count of count evenly spaced values (both ends
+		included)."""
+		bounds = cls._split_top_level(expression, ":")
+		if len(bounds) == 3:
+			(start, stop) = (ExpressionTools.eval_expression(bounds[0], fvars), ExpressionTools.eval_expression(bounds[1], fvars))
+			count = int(ExpressionTools.eval_expression(bounds[2], fvars))
+			if count < 1:
+				raise Exception("Range %s needs a count of at least one value." % (expression))
+			elif count == 1:
+				return [ start ]
+			return [ start + (stop - start) * i / (count - 1) for i in range(count) ]
+		elif len(bounds) != 1:
+			raise Exception("Ranges must be given as start:stop:count, but got %s." % (expression))
+		return [ ExpressionTools.eval_expression(value, fvars) for value in cls._split_top_level(expression, ",") ]
+
+	@classmethod
+	def parse_var_grid(cls, assignments):
+		"""Parse var=value assignments, where values may be lists or ranges,
+		into the Cartesian grid of all combinations as a list of dicts (the
+		first variable changes slowest). Later assignments may refer to
+		earlier variables and are evaluated for every combination."""
+		grid = [ { } ]
+		for keyvalue in assignments:
+			(varname, expression) = keyvalue.split("=", maxsplit = 1)
+			grid = [ dict(fvars, **{ varname: value }) for fvars in grid for value in cls._eval_values(expression, fvars) ]
+		return grid
+
+	@classmethod
+	def parse_vars(cls, assignments):
+		grid = cls.parse_var_grid(assignments)
+		if len(grid) != 1:
+			raise Exception("Lists and ranges of variable values are only supported by xygen and in family mode, but %d combinations were given." % (len(grid)))
+		return grid[0]
+
+	@staticmethod
+	def split_grid(grid):
+		"""Separate the variables that have the same value in every
+		combination of the grid from those that vary. Returns a dict of the
+		former and one dict of the latter per combination."""
+		fixed = { varname: value for (varname, value) in grid[0].items() if all(fvars[varname] == value for fvars in grid) }
+		varying = [ { varname: value for (varname, value) in fvars.items() if varname not in fixed } for fvars in grid ]
+		if all(len(column_vars) == 0 for column_vars in varying):
+			varying = [ ]
+		return (fixed, varying)
+
+	@staticmethod
+	def split_filenames(filename, count):
+		"""Filenames for one output file per combination, numbered before the
+		extension (e.g., ntc_00.txt to ntc_11.txt)."""
+		(stem, extension) = os.path.splitext(filename)
+		digits = len(str(count - 1))
+		return [ "%s_%0*d%s" % (stem, digits, index, extension) for index in range(count) ]
+
+	@staticmethod
+	def generate_points(formula, xvar, fvars, xvalues, xfilter = None):
+		"""Generator that evaluates the formula for every X value. If an
+		xfilter callable is given, X values for which it returns False are
+		skipped without evaluating the formula at all."""
+		function = ExpressionTools.compile_function(formula, [ xvar ], env = fvars)
+		for x in xvalues:
+			if (xfilter is not None) and (not xfilter(x)):
+				continue
+			yield (x, function(x))
+
+	@classmethod
+	def generate_rows(cls, formula, xvar, grid, xvalues):
+		"""Generator that evaluates the formula for every X value and every
+		combination of variable values of the grid in a single pass, yielding
+		(x, y0, y1, ...) rows. The formula is compiled once with the varying
+		variables as parameters."""
+		(fixed, varying) = cls.split_grid(grid)
+		varnames = sorted(varying[0]) if (len(varying) > 0) else [ ]
+		function = ExpressionTools.compile_function(formula, [ xvar ] + varnames, env = fixed)
+		arguments = [ tuple(column_vars[varname] for varname in varnames) for column_vars in varying ] or [ () ]
+		for x in xvalues:
+			yield (x, ) + tuple(function(x, *column_arguments) for column_arguments in arguments)
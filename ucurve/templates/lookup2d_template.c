@@ -0,0 +1,120 @@
+/* This file was automatically generated by µCurve (ucurve).
+ * DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
+ * Creation: ${today}
+%endif
+ */
+
+#include <stdint.h>
+%if struct_lookup == "avr-progmem":
+#include <avr/pgmspace.h>
+%endif
+#include "${filename}.h"
+
+%if struct_lookup == "avr-progmem":
+<% progmem = " PROGMEM" %>\
+%else:
+<% progmem = "" %>\
+%endif
+<% axes = [ ("x", table.xvalues, x_type, xidx_type), ("y", table.yvalues, y_type, yidx_type) ] %>\
+%for (axis, values, value_type, idx_type) in axes:
+static const ${value_type}${progmem} lookup_${axis}[] = {
+	${", ".join("%d" % (value) for value in values)}
+};
+
+%endfor
+/* Maximum error: (${out_zname}_true - ${out_zname}_interpolated) = ${"%+.2f" % (max_error)} ${out_zname} */
+static const ${out_type}${progmem} lookup_z[${len(table.yvalues)}][${len(table.xvalues)}] = {
+<%
+	# Formatted in one go instead of a %for loop, which is considerably
+	# faster for large tables
+	entries = "\n".join("\t{ %s },\t\t/* %s = %d */" % (", ".join("%d" % (z) for z in row), out_yname, y) for (y, row) in zip(table.yvalues, table.zvalues))
+%>\
+${entries}
+};
+
+%for (axis, values, value_type, idx_type) in axes:
+static ${value_type} get_${axis}(${idx_type} index) {
+%if struct_lookup == "avr-progmem":
+	${value_type} value;
+	memcpy_P(&value, lookup_${axis} + index, sizeof(${value_type}));
+	return value;
+%else:
+	return lookup_${axis}[index];
+%endif
+}
+
+/* Returns the index of the segment that contains ${axis}value, i.e., for which
+ * ${axis}[index] <= ${axis}value < ${axis}[index + 1] (or the last segment for
+ * ${axis}value = ${values[-1]}). */
+static ${idx_type} find_${axis}(${value_type} ${axis}value) {
+	${idx_type} low = 0;
+	${idx_type} high = ${len(values) - 1};
+	while (high - low > 1) {
+		${idx_type} middle = low + (high - low) / 2;
+		if (${axis}value >= get_${axis}(middle)) {
+			low = middle;
+		} else {
+			high = middle;
+		}
+	}
+	return low;
+}
+
+%endfor
+static ${out_type} get_z(${yidx_type} row, ${xidx_type} column) {
+%if struct_lookup == "avr-progmem":
+	${out_type} value;
+	memcpy_P(&value, &lookup_z[row][column], sizeof(${out_type}));
+	return value;
+%else:
+	return lookup_z[row][column];
+%endif
+}
+
+static ${out_type} interpolate(${win_mul_zspan_type} window, ${win_mul_zspan_type} span, ${out_type} low, ${out_type} high) {
+	/* return low + (window / span) * (high - low) */
+	return low + window * ((${win_mul_zspan_type})high - low) / span;
+}
+
+${out_type} ${lup_name}(${x_type} xvalue, ${y_type} yvalue) {
+	if (xvalue < ${table.xvalues[0]}) {
+		xvalue = ${table.xvalues[0]};
+	} else if (xvalue > ${table.xvalues[-1]}) {
+		xvalue = ${table.xvalues[-1]};
+	}
+	if (yvalue < ${table.yvalues[0]}) {
+		yvalue = ${table.yvalues[0]};
+	} else if (yvalue > ${table.yvalues[-1]}) {
+		yvalue = ${table.yvalues[-1]};
+	}
+
+	${xidx_type} column = find_x(xvalue);
+	${yidx_type} row = find_y(yvalue);
+	${x_type} low_x = get_x(column);
+	${y_type} low_y = get_y(row);
+	${xspan_type} xspan = get_x(column + 1) - low_x;
+	${yspan_type} yspan = get_y(row + 1) - low_y;
+	${xspan_type} xwindow = xvalue - low_x;
+	${yspan_type} ywindow = yvalue - low_y;
+
+	/* Interpolate along X on the rows below and above, then along Y */
+	${out_type} low = interpolate(xwindow, xspan, get_z(row, column), get_z(row, column + 1));
+	${out_type} high = interpolate(xwindow, xspan, get_z(row + 1, column), get_z(row + 1, column + 1));
+	return interpolate(ywindow, yspan, low, high);
+}
+
+#ifdef __TEST_LOOKUP_CODE__
+/* gcc -std=c11 -Wall -O3 -D__TEST_LOOKUP_CODE__ -o ${filename} ${filename}.c && ./${filename} */
+
+#include <stdio.h>
+
+int main() {
+	for (${extd_y_type} y = ${table.yvalues[0]}; y <= ${table.yvalues[-1]}; y++) {
+		for (${extd_x_type} x = ${table.xvalues[0]}; x <= ${table.xvalues[-1]}; x++) {
+			printf("%5d %5d -> %d\n", x, y, ${lup_name}(x, y));
+		}
+	}
+	return 0;
+}
+#endif
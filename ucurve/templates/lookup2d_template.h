@@ -0,0 +1,18 @@
+/* This file was automatically generated by µCurve (ucurve).
+ * DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
+ * Creation: ${today}
+%endif
+ */
+
+#ifndef __${lup_name.upper()}_H__
+#define __${lup_name.upper()}_H__
+
+#include <stdint.h>
+
+/* Bilinear interpolation on a grid of ${len(table.xvalues)} x ${len(table.yvalues)} cornerpoints,
+ * ${table_size} bytes of tables. Inputs outside of the grid are clamped to its
+ * border. */
+${out_type} ${lup_name}(${x_type} xvalue, ${y_type} yvalue);
+
+#endif
@@ -0,0 +1,120 @@
+/* This file was automatically generated by µCurve (ucurve).
+ * DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
+ * Creation: ${today}
+%endif
+ */
+
+#include <stdint.h>
+%if struct_lookup == "avr-progmem":
+#include <avr/pgmspace.h>
+%endif
+#include "${filename}.h"
+
+%if struct_lookup == "avr-progmem":
+<% progmem = " PROGMEM" %>\
+%else:
+<% progmem = "" %>\
+%endif
+/* Maximum error of all members: (y_true - y_interpolated) = ${"%+.2f" % (max_error)} ${out_yname} */
+static const ${in_type}${progmem} lookup_x[] = {
+<%
+	entries = "\n".join(("\t%d,\t\t/* %+.1f %s */" % (point.x, point.error, out_yname)) if (point.error is not None) else ("\t%d," % (point.x)) for point in points)
+%>\
+${entries}
+};
+
+%for (index, member) in enumerate(members):
+static const ${out_type}${progmem} lookup_y_${member}[] = {
+	${", ".join("%d" % (point.y[index]) for point in points)}
+};
+
+%endfor
+static const ${out_type} *const lookup_y[] = {
+%for member in members:
+	lookup_y_${member},
+%endfor
+};
+
+static ${in_type} get_x(${idx_type} index) {
+%if struct_lookup == "avr-progmem":
+	${in_type} value;
+	memcpy_P(&value, lookup_x + index, sizeof(${in_type}));
+	return value;
+%else:
+	return lookup_x[index];
+%endif
+}
+
+static ${out_type} get_y(const ${out_type} *table, ${idx_type} index) {
+%if struct_lookup == "avr-progmem":
+	${out_type} value;
+	memcpy_P(&value, table + index, sizeof(${out_type}));
+	return value;
+%else:
+	return table[index];
+%endif
+}
+
+/* Returns the index of the segment that contains xvalue, i.e., the segment
+ * for which x[index] <= xvalue < x[index + 1]. Values outside of the table
+ * are clamped to the first or last cornerpoint by interpolate(). */
+static ${idx_type} find_segment(${in_type} xvalue) {
+	for (${idx_type} i = 1; i < ${len(points) - 1}; i++) {
+		if (xvalue < get_x(i)) {
+			return i - 1;
+		}
+	}
+	return ${len(points) - 2};
+}
+
+static ${out_type} interpolate(${in_type} xvalue, ${idx_type} index, const ${out_type} *table) {
+	if (xvalue < ${min.x}) {
+		return get_y(table, 0);
+	} else if (xvalue >= ${max.x}) {
+		return get_y(table, ${len(points) - 1});
+	}
+
+	${in_type} low_x = get_x(index);
+	${out_type} low_y = get_y(table, index);
+	${in_type} xspan = get_x(index + 1) - low_x;
+	${yspan_type} yspan = get_y(table, index + 1) - low_y;
+	${in_type} xwindow = xvalue - low_x;
+	return low_y + (${win_mul_yspan_type})xwindow * yspan / (${win_mul_yspan_type})xspan;
+}
+
+void ${lup_name}_all(${in_type} xvalue, ${out_type} result[${lup_name.upper()}_MEMBER_COUNT]) {
+	${idx_type} index = find_segment(xvalue);
+	for (uint8_t member = 0; member < ${lup_name.upper()}_MEMBER_COUNT; member++) {
+		result[member] = interpolate(xvalue, index, lookup_y[member]);
+	}
+}
+
+${out_type} ${lup_name}(${in_type} xvalue, enum ${lup_name}_member_t member) {
+	return interpolate(xvalue, find_segment(xvalue), lookup_y[member]);
+}
+
+%for member in members:
+${out_type} ${lup_name}_${member}(${in_type} xvalue) {
+	return interpolate(xvalue, find_segment(xvalue), lookup_y_${member});
+}
+
+%endfor
+#ifdef __TEST_LOOKUP_CODE__
+/* gcc -std=c11 -Wall -O3 -D__TEST_LOOKUP_CODE__ -o ${filename} ${filename}.c && ./${filename} */
+
+#include <stdio.h>
+
+int main() {
+	for (${extd_in_type} x = ${min.x}; x < ${max.x}; x++) {
+		${out_type} y[${lup_name.upper()}_MEMBER_COUNT];
+		${lup_name}_all(x, y);
+		printf("%5d ->", x);
+		for (uint8_t member = 0; member < ${lup_name.upper()}_MEMBER_COUNT; member++) {
+			printf(" %d", y[member]);
+		}
+		printf("\n");
+	}
+	return 0;
+}
+#endif
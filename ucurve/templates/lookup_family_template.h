@@ -0,0 +1,38 @@
+/* This file was automatically generated by µCurve (ucurve).
+ * DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
+ * Creation: ${today}
+%endif
+ */
+
+#ifndef __${lup_name.upper()}_H__
+#define __${lup_name.upper()}_H__
+
+#include <stdint.h>
+
+/* Estimated table size and lookup cycles (worst / average) per target. The
+ * generated code searches the table linearly:
+%for line in cost_summary:
+ *   ${line}
+%endfor
+ */
+
+#define ${lup_name.upper()}_MEMBER_COUNT		${len(members)}
+
+enum ${lup_name}_member_t {
+%for (index, member) in enumerate(members):
+	${lup_name.upper()}_${member.upper()} = ${index},
+%endfor
+};
+
+/* Looks up the segment once and interpolates all family members */
+void ${lup_name}_all(${in_type} value, ${out_type} result[${lup_name.upper()}_MEMBER_COUNT]);
+
+/* Interpolates a single family member given by its index */
+${out_type} ${lup_name}(${in_type} value, enum ${lup_name}_member_t member);
+
+%for member in members:
+${out_type} ${lup_name}_${member}(${in_type} value);
+%endfor
+
+#endif
@@ -0,0 +1,33 @@
+<%page args="xmin, xmax"/>\
+/* Compares ${lup_name}_many() to ${lup_name}() for ascending, descending,
+ * slowly changing and random input values. */
+static int test_lookup_many(void) {
+	enum { COUNT = 4096 };
+	static ${in_type} xvalues[COUNT];
+	static ${out_type} yvalues[COUNT];
+	const uint32_t span = (uint32_t)${xmax - xmin} + 1;
+	uint32_t random = 1;
+	uint32_t walk = 0;
+	int errors = 0;
+	for (int pattern = 0; pattern < 4; pattern++) {
+		for (int i = 0; i < COUNT; i++) {
+			uint32_t offset;
+			random = (random * 1103515245) + 12345;
+			switch (pattern) {
+				case 0: offset = i % span; break;
+				case 1: offset = span - 1 - (i % span); break;
+				case 2: walk = (walk + span + ((random >> 16) % 7) - 3) % span; offset = walk; break;
+				default: offset = (random >> 8) % span; break;
+			}
+			xvalues[i] = (${in_type})(${xmin} + (${extd_in_type})offset);
+		}
+		${lup_name}_many(xvalues, yvalues, COUNT);
+		for (int i = 0; i < COUNT; i++) {
+			if (yvalues[i] != ${lup_name}(xvalues[i])) {
+				fprintf(stderr, "${lup_name}_many() mismatch at %d (pattern %d): %d -> %d, expected %d\n", i, pattern, xvalues[i], yvalues[i], ${lup_name}(xvalues[i]));
+				errors++;
+			}
+		}
+	}
+	return (errors == 0) ? 0 : 1;
+}
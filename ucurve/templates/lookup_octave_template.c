@@ -0,0 +1,121 @@
+/* This file was automatically generated by µCurve (ucurve).
+ * DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
+ * Creation: ${today}
+%endif
+ */
+
+#include <stdint.h>
+%if struct_lookup == "avr-progmem":
+#include <avr/pgmspace.h>
+%endif
+#include "${filename}.h"
+
+/* Octave table: the offset of an input value from ${octave_table.xmin} is
+ * split into power-of-two octaves with ${octave_table.entries_per_octave} uniform segments each.
+ * Only the Y values at the segment boundaries are stored; an offset v is
+ * found at index ${octave_table.entries_per_octave} * shift + (v >> shift) with
+ * shift = max(bitlength(v) - 1 - ${octave_table.bits}, 0).
+ *
+ * Maximum error: (y_true - y_interpolated) = ${"%+.2f" % (max_error)} ${out_yname} */
+%if struct_lookup == "avr-progmem":
+static const ${out_type} PROGMEM lookup_table[] = {
+%else:
+static const ${out_type} lookup_table[] = {
+%endif
+<%
+	# Formatted in one go instead of a %for loop, which is considerably
+	# faster for tables with many entries
+	entries = "\n".join(("\t%d,\t\t/* x = %d, %+.1f %s */" % (point.y, point.x, point.error, out_yname)) if (point.error is not None) else ("\t%d,\t\t/* x = %d */" % (point.y, point.x)) for point in points)
+%>\
+${entries}
+};
+
+static ${out_type} get_lookup_value(${idx_type} index) {
+%if struct_lookup == "avr-progmem":
+	${out_type} value;
+	memcpy_P(&value, lookup_table + index, sizeof(${out_type}));
+	return value;
+%else:
+	return lookup_table[index];
+%endif
+}
+
+static uint8_t octave_shift(${offset_type} offset) {
+	if (offset < ${2 * octave_table.entries_per_octave}) {
+		return 0;
+	}
+#if defined(__GNUC__)
+	return (8 * sizeof(${clz_type}) - 1 - ${octave_table.bits}) - ${clz_builtin}((${clz_type})offset);
+#else
+	uint8_t shift = 1;
+	while ((offset >> shift) >= ${2 * octave_table.entries_per_octave}) {
+		shift++;
+	}
+	return shift;
+#endif
+}
+
+static ${out_type} interpolate(${out_type} low, ${out_type} high, ${win_mul_yspan_type} window, uint8_t shift) {
+	if (high >= low) {
+		return low + (${out_type})((window * (${win_mul_yspan_type})(high - low)) >> shift);
+	} else {
+		return low - (${out_type})((window * (${win_mul_yspan_type})(low - high)) >> shift);
+	}
+}
+
+${out_type} ${lup_name}(${in_type} xvalue) {
+	if (xvalue < ${octave_table.xmin}) {
+		return ${octave_table.lookup(octave_table.xmin)};
+	} else if (xvalue >= ${octave_table.xmax}) {
+		return ${octave_table.lookup(octave_table.xmax)};
+	} else {
+		${offset_type} offset = xvalue - ${octave_table.xmin};
+		uint8_t shift = octave_shift(offset);
+		${idx_type} index = (${octave_table.entries_per_octave} * shift) + (offset >> shift);
+		${win_mul_yspan_type} window = offset & (((${offset_type})1 << shift) - 1);
+		return interpolate(get_lookup_value(index), get_lookup_value(index + 1), window, shift);
+	}
+}
+
+void ${lup_name}_many(const ${in_type} *xvalues, ${out_type} *yvalues, size_t count) {
+	/* The Y values of the previous segment are kept so that they only need
+	 * to be fetched again when the segment changes */
+	${idx_type} cached_index = ${octave_table.size};
+	${out_type} low = 0;
+	${out_type} high = 0;
+	for (size_t i = 0; i < count; i++) {
+		${in_type} xvalue = xvalues[i];
+		if (xvalue < ${octave_table.xmin}) {
+			yvalues[i] = ${octave_table.lookup(octave_table.xmin)};
+		} else if (xvalue >= ${octave_table.xmax}) {
+			yvalues[i] = ${octave_table.lookup(octave_table.xmax)};
+		} else {
+			${offset_type} offset = xvalue - ${octave_table.xmin};
+			uint8_t shift = octave_shift(offset);
+			${idx_type} index = (${octave_table.entries_per_octave} * shift) + (offset >> shift);
+			if (index != cached_index) {
+				low = get_lookup_value(index);
+				high = get_lookup_value(index + 1);
+				cached_index = index;
+			}
+			yvalues[i] = interpolate(low, high, offset & (((${offset_type})1 << shift) - 1), shift);
+		}
+	}
+}
+
+#ifdef __TEST_LOOKUP_CODE__
+/* gcc -std=c11 -Wall -O3 -D__TEST_LOOKUP_CODE__ -o ${filename} ${filename}.c && ./${filename} */
+
+#include <stdio.h>
+
+<%include file="lookup_many_test.c" args="xmin = octave_table.xmin, xmax = octave_table.xmax"/>
+
+int main() {
+	for (${extd_in_type} x = ${octave_table.xmin}; x < ${octave_table.xmax}; x++) {
+		${out_type} y = ${lup_name}(x);
+		printf("%5d -> %d\n", x, y);
+	}
+	return test_lookup_many();
+}
+#endif
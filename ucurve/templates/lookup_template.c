@@ -1,6 +1,8 @@
 /* This file was automatically generated by µCurve (ucurve).
  * DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
  * Creation: ${today}
+%endif
  */
 
 #include <stdint.h>
@@ -20,13 +22,12 @@ static const struct lookup_entry_t PROGMEM lookup_table[] = {
 %else:
 static const struct lookup_entry_t lookup_table[] = {
 %endif
-	%for point in points:
-	%if point.error is not None:
-	{ .x = ${point.x}, .y = ${point.y} },		/* ${"%+.1f" % (point.error)} ${out_yname} */
-	%else:
-	{ .x = ${point.x}, .y = ${point.y} },
-	%endif
-	%endfor
+<%
+	# Formatted in one go instead of a %for loop, which is considerably
+	# faster for tables with many entries
+	entries = "\n".join(("\t{ .x = %d, .y = %d },\t\t/* %+.1f %s */" % (point.x, point.y, point.error, out_yname)) if (point.error is not None) else ("\t{ .x = %d, .y = %d }," % (point.x, point.y)) for point in points)
+%>\
+${entries}
 };
 
 static struct lookup_entry_t get_lookup_entry(${idx_type} index) {
@@ -69,16 +70,82 @@ ${out_type} ${lup_name}(${in_type} xvalue) {
 	return 0;
 }
 
+%if len(points) > 1:
+/* Returns the index of the segment that contains xvalue, i.e., for which
+ * x[index] <= xvalue < x[index + 1], knowing that x[low] <= xvalue <
+ * x[high]. */
+static ${idx_type} find_segment(${in_type} xvalue, ${idx_type} low, ${idx_type} high) {
+	while (high - low > 1) {
+		${idx_type} middle = low + (high - low) / 2;
+		if (xvalue >= get_lookup_entry(middle).x) {
+			low = middle;
+		} else {
+			high = middle;
+		}
+	}
+	return low;
+}
+
+void ${lup_name}_many(const ${in_type} *xvalues, ${out_type} *yvalues, size_t count) {
+	/* Cursor: the segment of the previous value, whose cornerpoints are kept
+	 * so that they only need to be fetched again when the segment changes */
+	${idx_type} index = 0;
+	struct lookup_entry_t low = get_lookup_entry(0);
+	struct lookup_entry_t high = get_lookup_entry(1);
+	for (size_t i = 0; i < count; i++) {
+		${in_type} xvalue = xvalues[i];
+		if ((xvalue < low.x) || (xvalue >= high.x)) {
+			if (xvalue < ${min[0]}) {
+				yvalues[i] = ${min[1]};
+				continue;
+			} else if (xvalue >= ${max[0]}) {
+				yvalues[i] = ${max[1]};
+				continue;
+			} else if (xvalue >= high.x) {
+				/* Try the next segment first, then search all following ones */
+				index++;
+				low = high;
+				high = get_lookup_entry(index + 1);
+				if (xvalue >= high.x) {
+					index = find_segment(xvalue, index + 1, ${len(points) - 1});
+					low = get_lookup_entry(index);
+					high = get_lookup_entry(index + 1);
+				}
+			} else {
+				/* Try the previous segment first, then search all preceding ones */
+				index--;
+				high = low;
+				low = get_lookup_entry(index);
+				if (xvalue < low.x) {
+					index = find_segment(xvalue, 0, index);
+					low = get_lookup_entry(index);
+					high = get_lookup_entry(index + 1);
+				}
+			}
+		}
+		yvalues[i] = interpolate(xvalue, &low, &high);
+	}
+}
+%else:
+void ${lup_name}_many(const ${in_type} *xvalues, ${out_type} *yvalues, size_t count) {
+	for (size_t i = 0; i < count; i++) {
+		yvalues[i] = ${lup_name}(xvalues[i]);
+	}
+}
+%endif
+
 #ifdef __TEST_LOOKUP_CODE__
 /* gcc -std=c11 -Wall -O3 -D__TEST_LOOKUP_CODE__ -o ${filename} ${filename}.c && ./${filename} */
 
 #include <stdio.h>
 
+<%include file="lookup_many_test.c" args="xmin = min[0], xmax = max[0]"/>
+
 int main() {
 	for (${extd_in_type} x = ${min[0]}; x < ${max[0]}; x++) {
 		${out_type} y = ${lup_name}(x);
 		printf("%5d -> %d\n", x, y);
 	}
-	return 0;
+	return test_lookup_many();
 }
 #endif
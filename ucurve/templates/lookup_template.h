@@ -1,13 +1,34 @@
 /* This file was automatically generated by µCurve (ucurve).
  * DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
  * Creation: ${today}
+%endif
  */
 
 #ifndef __${lup_name.upper()}_H__
 #define __${lup_name.upper()}_H__
 
 #include <stdint.h>
+#include <stddef.h>
+
+%if layout == "octave":
+/* Estimated table size and lookup cycles per target. The generated code
+ * indexes the table directly by the octave of the input value:
+%else:
+/* Estimated table size and lookup cycles (worst / average) per target. The
+ * generated code searches the table linearly; the binary search figures are
+ * only an estimate for comparison, this code does not use a binary search:
+%endif
+%for line in cost_summary:
+ *   ${line}
+%endfor
+ */
 
 ${out_type} ${lup_name}(${in_type} value);
 
+/* Looks up count values at once, which is considerably faster than calling
+ * ${lup_name}() for each of them when consecutive values are close to each
+ * other (e.g., a buffer of ADC samples). */
+void ${lup_name}_many(const ${in_type} *xvalues, ${out_type} *yvalues, size_t count);
+
 #endif
@@ -0,0 +1,123 @@
+# This file was automatically generated by µCurve (ucurve).
+# DO NOT EDIT MANUALLY, WILL BE OVERWRITTEN.
+%if today is not None:
+# Creation: ${today}
+%endif
+"""Host-side version of ${lup_name}() from ${filename}.c that returns exactly
+the same integers as the generated C code. ${lup_name}_many() converts whole
+sequences or arrays of input values at once; it is vectorized with NumPy if
+that is installed and falls back to plain Python otherwise."""
+
+import bisect
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+IN_TYPE = "${in_type}"
+OUT_TYPE = "${out_type}"
+
+# Maximum error: (y_true - y_interpolated) = ${"%+.2f" % (max_error)} ${out_yname}
+<%
+	def wrap(values, per_line = 16):
+		values = [ "%d" % (value) for value in values ]
+		return "\n".join("\t" + ", ".join(values[i : i + per_line]) + "," for i in range(0, len(values), per_line))
+%>\
+%if octave_table is None:
+X = (
+${wrap(point.x for point in points)}
+)
+Y = (
+${wrap(point.y for point in points)}
+)
+
+def _divide(dividend, divisor):
+	"""Integer division that truncates toward zero, like C does."""
+	quotient = abs(dividend) // divisor
+	return quotient if (dividend >= 0) else -quotient
+
+def ${lup_name}(xvalue):
+	xvalue = int(xvalue)
+	if xvalue < X[0]:
+		return Y[0]
+	elif xvalue >= X[-1]:
+		return Y[-1]
+	index = bisect.bisect_right(X, xvalue) - 1
+	return Y[index] + _divide((xvalue - X[index]) * (Y[index + 1] - Y[index]), X[index + 1] - X[index])
+%else:
+# Octave table: offsets from XMIN are split into power-of-two octaves with
+# ${octave_table.entries_per_octave} uniform segments each; Y holds the values at the segment
+# boundaries.
+XMIN = ${octave_table.xmin}
+XMAX = ${octave_table.xmax}
+BITS = ${octave_table.bits}
+Y = (
+${wrap(octave_table.yvalues)}
+)
+_YMIN = ${octave_table.lookup(octave_table.xmin)}
+_YMAX = ${octave_table.lookup(octave_table.xmax)}
+
+def ${lup_name}(xvalue):
+	xvalue = int(xvalue)
+	if xvalue < XMIN:
+		return _YMIN
+	elif xvalue >= XMAX:
+		return _YMAX
+	offset = xvalue - XMIN
+	shift = max(offset.bit_length() - 1 - BITS, 0)
+	index = ((1 << BITS) * shift) + (offset >> shift)
+	window = offset & ((1 << shift) - 1)
+	(low, high) = (Y[index], Y[index + 1])
+	if high >= low:
+		return low + ((window * (high - low)) >> shift)
+	else:
+		return low - ((window * (low - high)) >> shift)
+%endif
+
+%if win_mul_yspan_type.endswith("64_t"):
+# Intermediate products may exceed 64 bits, so NumPy works on Python integers
+_DTYPE = object
+%else:
+_DTYPE = "int64"
+%endif
+
+def _lookup_array(xvalues):
+%if octave_table is None:
+	if len(X) == 1:
+		return numpy.full(xvalues.shape, Y[0], dtype = _DTYPE)
+	x = numpy.asarray(X, dtype = _DTYPE)
+	y = numpy.asarray(Y, dtype = _DTYPE)
+	index = numpy.clip(numpy.searchsorted(x, xvalues, side = "right") - 1, 0, len(X) - 2)
+	(low_x, low_y) = (x[index], y[index])
+	product = (xvalues - low_x) * (y[index + 1] - low_y)
+	quotient = numpy.abs(product) // (x[index + 1] - low_x)
+	result = low_y + numpy.where(product < 0, -quotient, quotient)
+	return numpy.where(xvalues < X[0], Y[0], numpy.where(xvalues >= X[-1], Y[-1], result))
+%else:
+	y = numpy.asarray(Y, dtype = _DTYPE)
+	offset = numpy.clip(xvalues - XMIN, 0, XMAX - XMIN)
+	# The exponent of frexp() is the bit length, exact for offsets below 2^53
+	bit_length = numpy.frexp(offset.astype("float64"))[1]
+	shift = numpy.maximum(bit_length - 1 - BITS, 0).astype(_DTYPE)
+	index = ((1 << BITS) * shift) + (offset >> shift)
+	window = offset & ((numpy.ones_like(shift) << shift) - 1)
+	low = y[index]
+	high = y[numpy.minimum(index + 1, len(Y) - 1)]
+	result = numpy.where(high >= low, low + ((window * (high - low)) >> shift), low - ((window * (low - high)) >> shift))
+	return numpy.where(xvalues < XMIN, _YMIN, numpy.where(xvalues >= XMAX, _YMAX, result))
+%endif
+
+def ${lup_name}_many(xvalues, chunk_size = 1 << 20):
+	"""Look up all given values. Returns a NumPy array of ${out_type[:-2]} values if NumPy is
+	available (working through the input in chunks of chunk_size values to
+	limit memory usage) or a list otherwise."""
+	if numpy is None:
+		return [ ${lup_name}(xvalue) for xvalue in xvalues ]
+	xvalues = numpy.asarray(xvalues)
+	result = numpy.empty(xvalues.shape, dtype = "${out_type[:-2]}")
+	flat_in = xvalues.reshape(-1)
+	flat_out = result.reshape(-1)
+	for start in range(0, len(flat_in), chunk_size):
+		chunk = flat_in[start : start + chunk_size].astype(_DTYPE)
+		flat_out[start : start + chunk_size] = _lookup_array(chunk)
+	return result
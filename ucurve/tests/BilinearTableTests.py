@@ -0,0 +1,67 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import unittest
+from ucurve.BilinearTable import BilinearTable
+
+class BilinearTableTests(unittest.TestCase):
+	def _surface(self):
+		return [ (x, y, 300 + 0.27 * x * (1 + 0.002 * (y - 25)) + 3 * math.sin(y / 15)) for y in range(-20, 86, 3) for x in range(0, 4096, 64) ]
+
+	def test_lookup(self):
+		table = BilinearTable([ 0, 10 ], [ 0, 4 ], [ [ 0, 100 ], [ -40, 60 ] ])
+		self.assertEqual(table.lookup(0, 0), 0)
+		self.assertEqual(table.lookup(10, 4), 60)
+		self.assertEqual(table.lookup(5, 0), 50)
+		self.assertEqual(table.lookup(5, 2), 30)
+		self.assertEqual(table.lookup(3, 3), 0)
+		# Clamped to the border outside of the grid
+		self.assertEqual(table.lookup(-5, -5), 0)
+		self.assertEqual(table.lookup(20, 0), 100)
+		# Truncated toward zero like in C
+		self.assertEqual(table.lookup(0, 1), -10)
+		self.assertEqual(BilinearTable([ 0, 3 ], [ 0, 1 ], [ [ 0, -2 ], [ 0, 0 ] ]).lookup(1, 0), 0)
+
+	def test_decimate(self):
+		grid = BilinearTable.from_points(self._surface())
+		for max_error in [ 0.5, 1, 2, 5 ]:
+			(table, error) = grid.decimate(max_error)
+			self.assertLessEqual(abs(error), max_error)
+			self.assertEqual(error, table.error(grid))
+			self.assertEqual((table.xvalues[0], table.xvalues[-1]), (grid.xvalues[0], grid.xvalues[-1]))
+			self.assertEqual((table.yvalues[0], table.yvalues[-1]), (grid.yvalues[0], grid.yvalues[-1]))
+		self.assertLess(grid.decimate(2)[0].size, grid.size / 10)
+
+	def test_incomplete_grid(self):
+		points = self._surface()
+		del points[10]
+		with self.assertRaises(Exception):
+			BilinearTable.from_points(points)
+		with self.assertRaises(Exception):
+			BilinearTable.from_points([ (x, 0, x) for x in range(10) ])
+
+	def test_c_types(self):
+		types = BilinearTable([ -5, 300 ], [ 0, 4 ], [ [ 0, 1000 ], [ -40, 60 ] ]).c_types()
+		self.assertEqual(types["x_type"], "int16_t")
+		self.assertEqual(types["y_type"], "uint8_t")
+		self.assertEqual(types["xspan_type"], "uint16_t")
+		self.assertEqual(types["win_mul_zspan_type"], "int32_t")
@@ -0,0 +1,77 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import os
+import sys
+import math
+import shutil
+import tempfile
+import warnings
+import unittest
+import unittest.mock
+import subprocess
+import importlib.util
+from ucurve.Tools import IOTools
+
+class CodeGenTests(unittest.TestCase):
+	def _codegen(self, directory, name, *options):
+		xyfile = os.path.join(directory, "input.txt")
+		with open(xyfile, "w") as f:
+			for x in range(0, 5000, 3):
+				print("%d %f" % (x, 1000 * math.exp(-x / 1000)), file = f)
+		root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+		subprocess.check_call([ sys.executable, "-m", "ucurve", "codegen", "--python", "-e", "2", "--outdir", directory, "--outfile", name ] + list(options) + [ xyfile ], cwd = root)
+		spec = importlib.util.spec_from_file_location(name, os.path.join(directory, name + ".py"))
+		module = importlib.util.module_from_spec(spec)
+		spec.loader.exec_module(module)
+		return module
+
+	def test_python_module(self):
+		with tempfile.TemporaryDirectory() as directory:
+			for layout in [ "search", "octave" ]:
+				module = self._codegen(directory, "lookup_" + layout, "--layout", layout)
+				xvalues = list(range(-10, 5100))
+				yvalues = [ module.lookup(x) for x in xvalues ]
+				for (x, y) in zip(xvalues, yvalues):
+					if (x % 3 == 0) and (0 <= x < 5000):
+						self.assertLessEqual(abs(y - round(1000 * math.exp(-x / 1000))), 2)
+				self.assertEqual([ int(y) for y in module.lookup_many(xvalues) ], yvalues)
+				(numpy, module.numpy) = (module.numpy, None)
+				self.assertEqual(module.lookup_many(xvalues), yvalues)
+				module.numpy = numpy
+
+	@unittest.skipIf(shutil.which("gcc") is None, "gcc is not available")
+	def test_python_matches_c(self):
+		with tempfile.TemporaryDirectory() as directory:
+			for layout in [ "search", "octave" ]:
+				name = "lookup_" + layout
+				module = self._codegen(directory, name, "--layout", layout)
+				executable = os.path.join(directory, name)
+				subprocess.check_call([ "gcc", "-std=c11", "-Wall", "-O2", "-D__TEST_LOOKUP_CODE__", "-o", executable, executable + ".c" ])
+				output = subprocess.check_output([ executable ]).decode("ascii")
+				c_values = [ tuple(int(value) for value in line.split("->")) for line in output.splitlines() ]
+				self.assertGreater(len(c_values), 4000)
+				self.assertEqual([ (x, module.lookup(x)) for (x, y) in c_values ], c_values)
+
+	def test_source_date_epoch(self):
+		with unittest.mock.patch.dict(os.environ, { "SOURCE_DATE_EPOCH": "1500000000" }), warnings.catch_warnings():
+			warnings.simplefilter("error")
+			self.assertEqual(IOTools.creation_timestamp(), "2017-07-14 02:40:00")
@@ -0,0 +1,53 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+from ucurve.CostModel import CostModel
+from ucurve.Tools import CTypeTools
+
+class CostModelTests(unittest.TestCase):
+	def _types(self, xvalues, yvalues):
+		return CTypeTools.lookup_types(xvalues, [ list(zip(xvalues, yvalues)) ])
+
+	def test_padding(self):
+		types = self._types([ 0, 100, 200 ], [ -1000, 0, 1000 ])
+		self.assertEqual(CostModel("avr", types).table_bytes(3), 3 * 3)
+		self.assertEqual(CostModel("cortex-m4", types).table_bytes(3), 3 * 4)
+		self.assertEqual(CostModel("cortex-m4", types, members = 2).table_bytes(3), 3 + 2 * 3 * 2 + 2 * 4)
+
+	def test_search_cycles(self):
+		xvalues = list(range(0, 1024, 16))
+		types = self._types(xvalues, xvalues)
+		model = CostModel("cortex-m0", types)
+		(linear_worst, linear_average) = model.lookup_cycles(xvalues, "linear")
+		(binary_worst, binary_average) = model.lookup_cycles(xvalues, "binary")
+		self.assertLess(linear_average, linear_worst)
+		self.assertLess(binary_worst, linear_average)
+		self.assertLessEqual(binary_average, binary_worst)
+		self.assertEqual(max(model._binary_iterations(len(xvalues) - 1)), 6)
+
+	def test_octave(self):
+		types = self._types([ 0, 100, 200 ], [ -1000, 0, 1000 ])
+		types.update({ "offset_type": "uint8_t", "win_mul_yspan_type": "uint16_t" })
+		estimate = CostModel("cortex-m4", types, layout = "octave").estimate([ 0, 100, 200 ])
+		self.assertEqual(estimate["table_bytes"], 3 * 2)
+		self.assertEqual(estimate["octave"]["worst"], estimate["octave"]["average"])
+		self.assertLess(estimate["octave"]["worst"], CostModel("cortex-m0", types, layout = "octave").octave_cycles())
@@ -0,0 +1,104 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import unittest
+from ucurve.Decimator import GreedyDecimator, FreeKnotDecimator, ParallelDecimator
+
+class DecimatorTests(unittest.TestCase):
+	def test_straight_line(self):
+		points = [ (x, 3 * x + 7) for x in range(100) ]
+		cornerpoints = list(GreedyDecimator(0.5).decimate(points))
+		self.assertEqual([ (pt.x, pt.y) for pt in cornerpoints ], [ (0, 7), (99, 304) ])
+
+	def test_generator_input(self):
+		points = [ (x, round(100 * math.sin(x / 20))) for x in range(200) ]
+		from_list = list(GreedyDecimator(2).decimate(points))
+		from_generator = list(GreedyDecimator(2).decimate(iter(points)))
+		self.assertEqual(from_list, from_generator)
+		self.assertEqual(from_list[0].error, None)
+		self.assertEqual(from_list[-1][:2], points[-1])
+
+	def _assert_error_bound(self, cornerpoints, points, max_error):
+		for (p0, p1) in zip(cornerpoints, cornerpoints[1:]):
+			for (x, y) in points:
+				if min(p0.x, p1.x) <= x <= max(p0.x, p1.x):
+					y_interp = p0.y + (x - p0.x) / (p1.x - p0.x) * (p1.y - p0.y)
+					self.assertLessEqual(abs(y_interp - y), max_error + 1e-9)
+
+	def test_error_bound(self):
+		points = [ (x, round(100 * math.sin(x / 20))) for x in range(200) ]
+		self._assert_error_bound(list(GreedyDecimator(2).decimate(points)), points, 2)
+
+	def test_family(self):
+		points = [ (x, (x, 20 if (x == 50) else 0)) for x in range(100) ]
+		cornerpoints = list(GreedyDecimator(1).decimate(points))
+		self.assertEqual([ pt.x for pt in cornerpoints ], [ 0, 49, 50, 51, 99 ])
+
+	def test_empty(self):
+		self.assertEqual(list(GreedyDecimator(1).decimate([ ])), [ ])
+
+	def test_free_knot(self):
+		points = [ (x, round(100 * math.sin(x / 20))) for x in range(1000) ]
+		greedy = list(GreedyDecimator(2).decimate(points))
+		free_knot = list(FreeKnotDecimator(2).decimate(points))
+		self._assert_error_bound(free_knot, points, 2)
+		self.assertLess(len(free_knot), 0.9 * len(greedy))
+		self.assertEqual((free_knot[0].x, free_knot[-1].x), (0, 999))
+		self.assertTrue(all(isinstance(point.y, int) for point in free_knot))
+
+	def test_free_knot_straight_line(self):
+		points = [ (x, 3 * x + 7) for x in range(100) ]
+		self.assertEqual([ (pt.x, pt.y) for pt in FreeKnotDecimator(1).decimate(points) ], [ (0, 7), (99, 304) ])
+		self.assertEqual(list(FreeKnotDecimator(1).decimate([ ])), [ ])
+
+	def test_free_x(self):
+		points = [ (7 * x, round(100 * math.sin(7 * x / 20))) for x in range(300) ]
+		cornerpoints = list(FreeKnotDecimator(1, free_x = True).decimate(points))
+		self._assert_error_bound(cornerpoints, points, 1)
+		self.assertLess(len(cornerpoints), len(list(FreeKnotDecimator(1).decimate(points))))
+
+	def test_free_x_descending(self):
+		points = [ (12, 2), (10, 5), (9, -6) ]
+		cornerpoints = list(FreeKnotDecimator(1, free_x = True).decimate(points))
+		self._assert_error_bound(cornerpoints, points, 1)
+		self.assertEqual((cornerpoints[0].x, cornerpoints[-1].x), (12, 9))
+
+		points = [ (2000 - 3 * x - (x % 2), round(100 * math.sin(x / 20))) for x in range(300) ]
+		self._assert_error_bound(list(FreeKnotDecimator(1, free_x = True).decimate(points)), points, 1)
+
+	def test_free_knot_family(self):
+		points = [ (x, (round(100 * math.sin(x / 20)), round(50 * math.cos(x / 30)))) for x in range(500) ]
+		cornerpoints = list(FreeKnotDecimator(1).decimate(points))
+		for member in range(2):
+			self._assert_error_bound([ point._replace(y = point.y[member]) for point in cornerpoints ], [ (x, y[member]) for (x, y) in points ], 1)
+
+	def test_parallel(self):
+		points = [ (x, (round(1000 * math.sin(x / 50)), round(300 * math.cos(x / 70)))) for x in range(5000) ]
+		for max_error in [ 0.5, 2, 10 ]:
+			sequential = GreedyDecimator(max_error)
+			cornerpoints = list(sequential.decimate(points))
+			decimator = ParallelDecimator(max_error, 2, min_chunk_size = 100)
+			self.assertEqual(list(decimator.decimate(points)), cornerpoints)
+			self.assertEqual(decimator.max_error, sequential.max_error)
+			self.assertEqual(decimator.chunks, 8)
+		self.assertEqual(list(ParallelDecimator(1, 2).decimate(points[:1])), list(GreedyDecimator(1).decimate(points[:1])))
+		self.assertEqual(list(ParallelDecimator(1, 2).decimate([ ])), [ ])
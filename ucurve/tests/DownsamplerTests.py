@@ -0,0 +1,56 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import random
+import unittest
+from ucurve.Downsampler import Downsampler
+
+class DownsamplerTests(unittest.TestCase):
+	def _series(self, count):
+		rng = random.Random(1)
+		xvalues = list(range(count))
+		yvalues = [ math.sin(x / 500) + rng.random() / 10 for x in xvalues ]
+		return (xvalues, yvalues)
+
+	def test_small_unchanged(self):
+		(xvalues, yvalues) = self._series(100)
+		for algorithm in Downsampler.algorithms():
+			self.assertEqual(Downsampler(algorithm, 100).downsample(xvalues, yvalues), (xvalues, yvalues))
+
+	def test_downsample(self):
+		(xvalues, yvalues) = self._series(10000)
+		yvalues[1234] = 5
+		yvalues[7777] = -5
+		for algorithm in Downsampler.algorithms():
+			indices = Downsampler(algorithm, 500).indices(xvalues, yvalues)
+			self.assertLessEqual(len(indices), 500)
+			self.assertEqual(indices, sorted(set(indices)))
+			self.assertEqual((indices[0], indices[-1]), (0, len(xvalues) - 1))
+			# Outstanding peaks are never lost
+			self.assertIn(1234, indices)
+			self.assertIn(7777, indices)
+		# 250 buckets of 40 values each, so every window spans whole buckets
+		(xsampled, ysampled) = Downsampler("minmax", 502).downsample(xvalues, yvalues)
+		for start in range(0, len(xvalues), 2000):
+			window = yvalues[start : start + 2000]
+			sampled = [ y for (x, y) in zip(xsampled, ysampled) if start <= x < start + 2000 ]
+			self.assertEqual((min(sampled), max(sampled)), (min(window), max(window)))
@@ -19,7 +19,48 @@
 #
 #	Johannes Bauer <JohannesBauer@gmx.de>
 
+import math
 import unittest
+from ucurve.Interpolation import LinearInterpolator, CSplineInterpolator
+from ucurve.Matrix import TridiagonalMatrix
 
 class InterpolatorTests(unittest.TestCase):
-	pass
+	def test_linear(self):
+		interpolator = LinearInterpolator([ (5, 3), (6, -3), (1, 10) ])
+		self.assertAlmostEqual(interpolator[5.5], 0)
+		self.assertAlmostEqual(interpolator[3], 6.5)
+		self.assertAlmostEqual(interpolator[6], -3)
+		self.assertAlmostEqual(LinearInterpolator([ (0, 0), (2, 4) ])[1], 2)
+
+	def test_cspline_through_points(self):
+		points = [ (1, 8), (7, 10), (12, 7), (15, 8), (19, 7), (22, 9) ]
+		interpolator = CSplineInterpolator(points)
+		for (x, y) in points:
+			self.assertAlmostEqual(interpolator[x], y)
+		# Continuous within the first segment as well
+		self.assertAlmostEqual(interpolator[1.001], 8, places = 2)
+
+	def test_cspline_smooth_curve(self):
+		points = [ (x / 10, math.sin(x / 10)) for x in range(64) ]
+		interpolator = CSplineInterpolator(points)
+		for x in range(10, 600, 7):
+			self.assertAlmostEqual(interpolator[x / 100], math.sin(x / 100), places = 3)
+
+	def test_evaluate(self):
+		points = [ (1, 8), (7, 10), (12, 7), (15, 8), (19, 7) ]
+		xvalues = [ 20, -3, 7, 6.99, 12.5, 1, 19, 7, 100 ]
+		for interpolator_class in [ LinearInterpolator, CSplineInterpolator ]:
+			interpolator = interpolator_class(points)
+			self.assertEqual(interpolator.evaluate(xvalues), [ interpolator[x] for x in xvalues ])
+
+	def test_tridiagonal_solve(self):
+		mdata = [
+			[ 1, 2, 0, 0, 0 ],
+			[ 4, 9, 2, 0, 0 ],
+			[ 0, 1, 3, 5, 0 ],
+			[ 0, 0, 9, 4, 2 ],
+			[ 0, 0, 0, 3, 3 ],
+		]
+		solution = TridiagonalMatrix.from_data(mdata).solve([ 3, 5, 7, 9, 11 ])
+		for (lhs, rhs) in zip(TridiagonalMatrix.from_data(mdata).vmul(solution), [ 3, 5, 7, 9, 11 ]):
+			self.assertAlmostEqual(lhs, rhs)
@@ -0,0 +1,84 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import random
+import unittest
+from ucurve.Matrix import Matrix, BandedMatrix, TridiagonalMatrix, SingularEquationSystemException
+
+class MatrixTests(unittest.TestCase):
+	def _assert_vector_equal(self, lhs, rhs, places = 7):
+		self.assertEqual(len(lhs), len(rhs))
+		for (x, y) in zip(lhs, rhs):
+			self.assertAlmostEqual(x, y, places = places)
+
+	def _random_band(self, rng, n, lower, upper):
+		return [ [ rng.uniform(-5, 5) if (-lower <= j - i <= upper) else 0 for j in range(n) ] for i in range(n) ]
+
+	def test_access_and_vmul(self):
+		M = Matrix([ [ 1, 2, 3 ], [ 4, 5, 6 ] ])
+		self.assertEqual((M.row_count, M.col_count), (2, 3))
+		self.assertEqual((M[(1, 2)], M[(2, 1)]), (2, 4))
+		self.assertEqual(M.vmul([ -11, 13, -17 ]), [ -36, -81 ])
+		M[(2, 3)] = 0
+		self.assertEqual(M.vmul([ 1, 1, 1 ]), [ 6, 9 ])
+
+	def test_matmul(self):
+		A = Matrix([ [ 1, 2 ], [ 3, 4 ], [ 5, 6 ] ])
+		B = Matrix([ [ 1, 0, -1 ], [ 2, 1, 0 ] ])
+		C = A @ B
+		self.assertEqual((C.m, C.n), (3, 3))
+		self.assertEqual(list(C.row(2)), [ 11, 4, -3 ])
+		self.assertEqual(list((Matrix.identity(2) @ B).row(1)), [ 1, 0, -1 ])
+		self.assertEqual(list(A.transpose().row(1)), [ 1, 3, 5 ])
+
+	def test_lu_solve(self):
+		# Needs pivoting, the first pivot is zero
+		M = Matrix([ [ 0, 2, 1 ], [ 1, 1, 1 ], [ 2, 1, 0 ] ])
+		x = M.solve([ 5, 6, 4 ])
+		self._assert_vector_equal(M.vmul(x), [ 5, 6, 4 ])
+		self.assertAlmostEqual(M.lu().determinant, 3)
+		with self.assertRaises(SingularEquationSystemException):
+			Matrix([ [ 1, 2 ], [ 2, 4 ] ]).solve([ 1, 2 ])
+
+	def test_banded_solve(self):
+		rng = random.Random(1)
+		for (lower, upper) in [ (1, 1), (2, 2), (1, 3), (3, 0) ]:
+			data = self._random_band(rng, 12, lower, upper)
+			rhs = [ rng.uniform(-10, 10) for i in range(12) ]
+			banded = BandedMatrix.from_data(data, lower, upper)
+			self._assert_vector_equal(banded.solve(rhs), Matrix(data).solve(rhs))
+			self._assert_vector_equal(banded.vmul(banded.solve(rhs)), rhs)
+			self._assert_vector_equal(banded.lu().solve(rhs), Matrix(data).solve(rhs))
+
+	def test_tridiagonal(self):
+		mdata = [
+			[ 1, 2, 0, 0, 0 ],
+			[ 4, 9, 2, 0, 0 ],
+			[ 0, 1, 3, 5, 0 ],
+			[ 0, 0, 9, 4, 2 ],
+			[ 0, 0, 0, 3, 3 ],
+		]
+		T = TridiagonalMatrix.from_data(mdata)
+		self.assertEqual(T[(3, 4)], 5)
+		self.assertEqual(T[(1, 3)], 0)
+		solution = T.solve([ 3, 5, 7, 9, 11 ])
+		self._assert_vector_equal(Matrix(mdata).vmul(solution), [ 3, 5, 7, 9, 11 ])
+		self._assert_vector_equal(solution, Matrix(mdata).solve([ 3, 5, 7, 9, 11 ]))
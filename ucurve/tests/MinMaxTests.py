@@ -0,0 +1,62 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import random
+import unittest
+from ucurve.MinMax import MinMax
+from ucurve.actions.ActionCodeGen import _AreaOfInterestRanges
+
+class MinMaxTests(unittest.TestCase):
+	def _points(self, count = 1000):
+		rng = random.Random(1)
+		return [ (rng.randint(0, 100), rng.randint(-50, 50)) for i in range(count) ]
+
+	def _assert_equal(self, minmax1, minmax2):
+		for name in [ "count", "xmin", "xmax", "ymin", "ymax", "yabsmin", "yabsmax" ]:
+			self.assertEqual(getattr(minmax1, name), getattr(minmax2, name))
+		if minmax1.have_data:
+			self.assertAlmostEqual(minmax1.yavg, minmax2.yavg)
+
+	def test_feed_merge(self):
+		points = self._points()
+		reference = MinMax()
+		for (x, y) in points:
+			reference.add(x, y)
+		self._assert_equal(MinMax().feed(points), reference)
+		merged = MinMax()
+		for start in range(0, len(points), 300):
+			merged.merge(MinMax.from_points(points[start : start + 300]))
+		self._assert_equal(merged, reference)
+		self._assert_equal(MinMax().merge(MinMax()).merge(reference), reference)
+
+	def test_aoi_ranges(self):
+		points = [ (x, y) for (x, y) in enumerate(y for (x, y) in self._points()) ]
+		ranges = [ (-10, 10), (0, 30), (10, 10), (-50, 50), (60, 70) ]
+		reference = _AreaOfInterestRanges(ranges)
+		for (x, y) in points:
+			reference.add(x, y)
+		merged = _AreaOfInterestRanges(ranges)
+		for start in range(0, len(points), 300):
+			merged.merge(_AreaOfInterestRanges(ranges).feed(points[start : start + 300]))
+		for ((ymin, ymax), analysis, merged_analysis) in zip(ranges, reference.analyses, merged.analyses):
+			self.assertEqual(analysis.count, len([ y for (x, y) in points if ymin <= y <= ymax ]))
+			self._assert_equal(merged_analysis.minmax, analysis.minmax)
+			self._assert_equal(merged_analysis.diff_minmax, analysis.diff_minmax)
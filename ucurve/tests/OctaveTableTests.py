@@ -0,0 +1,51 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import unittest
+from ucurve.OctaveTable import OctaveTable
+
+class OctaveTableTests(unittest.TestCase):
+	def test_index(self):
+		table = OctaveTable(100, 1100, 2)
+		self.assertEqual([ table.index(offset) for offset in [ 0, 3, 7, 8, 15, 16, 31, 32, 1000 ] ], [ 0, 3, 7, 8, 11, 12, 15, 16, 35 ])
+		for offset in range(table.span + 1):
+			index = table.index(offset)
+			self.assertLessEqual(table.sample_offset(index), offset)
+			self.assertLess(offset, table.sample_offset(index + 1))
+		self.assertEqual(table.size, 37)
+
+	def test_fit(self):
+		# NTC-style curve over three decades of resistance
+		points = [ (r, 1 / (1 / 298.15 + math.log(r / 10e3) / 3950) - 273.15) for r in range(500, 500000, 7) ]
+		rounded = [ (x, round(y)) for (x, y) in points ]
+		(table, max_error) = OctaveTable.fit(points, rounded, 1)
+		self.assertLessEqual(abs(max_error), 1)
+		self.assertLess(table.size, 200)
+		for (x, y) in rounded:
+			self.assertLessEqual(abs(table.lookup(x) - y), 1)
+		self.assertEqual(table.lookup(0), table.lookup(500))
+		self.assertEqual(table.lookup(10 ** 6), table.lookup(table.xmax))
+
+	def test_clz_builtin(self):
+		for (xmax, builtin) in [ (200, "__builtin_clz"), (60000, "__builtin_clz"), (70000, "__builtin_clzl"), (1 << 40, "__builtin_clzll") ]:
+			table = OctaveTable.create([ (0, 0), (xmax, 100) ], 2)
+			self.assertEqual(table.c_types()["clz_builtin"], builtin)
@@ -0,0 +1,47 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+from ucurve.PointSet import PointSet
+
+class PointSetTests(unittest.TestCase):
+	def test_sort_unique_keeps_last(self):
+		ps = PointSet.from_points([ (3, 30), (1, 10), (3, 31), (2, 20) ]).sort_unique()
+		self.assertEqual(ps.points, [ (1, 10), (2, 20), (3, 31) ])
+
+	def test_sort_unique_descending(self):
+		ps = PointSet.from_points([ (3, 30), (2, 20), (2, 21), (1, 10) ]).sort_unique()
+		self.assertEqual(ps.points, [ (1, 10), (2, 21), (3, 30) ])
+
+	def test_transform_filter(self):
+		ps = PointSet.from_points([ (1, 10), (2, 20), (3, 30) ])
+		ps = ps.transform(lambda x, y: y, lambda x, y: x).filter_x(xmin = 15, xmax = 30)
+		self.assertEqual(ps.points, [ (20, 2), (30, 3) ])
+
+	def test_round(self):
+		ps = PointSet.from_points([ (0.9, 5.2), (1.2, 7.6), (1.6, 9), (2.6, 1.5) ]).round()
+		self.assertEqual(ps.typecode, "q")
+		self.assertEqual(ps.points, [ (1, 5), (2, 9), (3, 2) ])
+
+	def test_slice(self):
+		ps = PointSet.from_points([ (1, 10), (2, 20), (3, 30) ])
+		self.assertEqual(ps[1], (2, 20))
+		self.assertEqual(ps[1:].points, [ (2, 20), (3, 30) ])
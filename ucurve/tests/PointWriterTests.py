@@ -0,0 +1,59 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import io
+import sys
+import array
+import unittest
+from ucurve.PointWriter import PointWriter
+
+class PointWriterTests(unittest.TestCase):
+	_POINTS = [ (x / 7, -x / 3) for x in range(1000) ]
+
+	def _write(self, fmt, chunk_size = 65536):
+		f = io.BytesIO() if (fmt == "binary") else io.StringIO()
+		writer = PointWriter(f, fmt = fmt, chunk_size = chunk_size)
+		writer.write_comment("comment")
+		writer.write_points(iter(self._POINTS))
+		self.assertEqual(writer.count, len(self._POINTS))
+		return f.getvalue()
+
+	def test_text(self):
+		lines = self._write("text", chunk_size = 7).split("\n")
+		self.assertEqual(lines[0], "# comment")
+		self.assertEqual(lines[1:-1], [ "%f %f" % (x, y) for (x, y) in self._POINTS ])
+		self.assertEqual(self._write("text"), self._write("text", chunk_size = 1))
+
+	def test_columns(self):
+		f = io.StringIO()
+		PointWriter(f, fmt = "text").write_points([ (1, 2, 3), (4, 5, 6) ])
+		self.assertEqual(f.getvalue(), "1.000000 2.000000 3.000000\n4.000000 5.000000 6.000000\n")
+
+	def test_precise(self):
+		lines = self._write("precise", chunk_size = 100).split("\n")
+		self.assertEqual([ tuple(float(value) for value in line.split()) for line in lines[1:-1] ], self._POINTS)
+
+	def test_binary(self):
+		values = array.array("d")
+		values.frombytes(self._write("binary", chunk_size = 3))
+		if sys.byteorder != "little":
+			values.byteswap()
+		self.assertEqual(list(zip(values[0::2], values[1::2])), self._POINTS)
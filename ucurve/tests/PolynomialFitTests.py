@@ -0,0 +1,61 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import math
+import unittest
+from ucurve.PolynomialFit import PiecewisePolynomialFit
+from ucurve.Interpolation import PolyfitInterpolator
+
+class PolynomialFitTests(unittest.TestCase):
+	def test_reproduces_polynomial(self):
+		points = [ (x / 10, (x / 10) ** 3 - 2 * (x / 10) + 1) for x in range(-50, 51) ]
+		fit = PiecewisePolynomialFit(degree = 3, knots = [ -5, -1, 0, 2.5, 5 ])
+		polys = fit.fit(points)
+		self.assertEqual(len(polys), 4)
+		self.assertLess(abs(fit.max_error), 1e-9)
+		(xoffset, poly) = polys[2]
+		self.assertAlmostEqual(poly[1.5], 1.5 ** 3 - 2 * 1.5 + 1)
+
+	def test_continuity(self):
+		points = [ (x / 100, math.sin(x / 100)) for x in range(1001) ]
+		polys = PiecewisePolynomialFit(degree = 3, knots = [ 0, 2.5, 5, 7.5, 10 ], continuity = 2).fit(points)
+		for ((x0, poly), (x1, next_poly)) in zip(polys, polys[1:]):
+			for diffed in range(3):
+				self.assertAlmostEqual(poly[x1], next_poly[x1])
+				(poly, next_poly) = (poly.diff(), next_poly.diff())
+
+	def test_fixed_points(self):
+		points = [ (x, (x % 7) - 3) for x in range(100) ]
+		fit = PiecewisePolynomialFit(degree = 1, knots = [ 0, 50, 99 ], continuity = 0)
+		polys = fit.fit(points, fixed_points = [ (0, 10), (50, -10) ])
+		self.assertAlmostEqual(polys[0][1][0], 10)
+		self.assertAlmostEqual(polys[0][1][50], -10)
+		self.assertAlmostEqual(polys[1][1][50], -10)
+
+	def test_underdetermined(self):
+		with self.assertRaises(Exception):
+			PiecewisePolynomialFit(degree = 3, knots = range(11)).fit([ (0, 0), (1, 1), (5, 3) ])
+
+	def test_interpolator(self):
+		points = [ (x, math.exp(x / 20)) for x in range(100) ]
+		interpolator = PolyfitInterpolator(points, degree = 3, segments = 10)
+		self.assertLess(abs(interpolator.fit.max_error), 0.05)
+		self.assertAlmostEqual(interpolator[42.5], math.exp(42.5 / 20), delta = 0.05)
@@ -0,0 +1,43 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+from ucurve.actions.ActionTune import ActionTune
+
+class TuneTests(unittest.TestCase):
+	def test_parse_budgets(self):
+		self.assertEqual(ActionTune.parse_budgets("2,1"), [ 1, 2 ])
+		self.assertEqual(ActionTune.parse_budgets("0.5:2:0.5,1,10"), [ 0.5, 1, 1.5, 2, 10 ])
+		with self.assertRaises(Exception):
+			ActionTune.parse_budgets("1:2:0")
+
+	def test_pareto_front(self):
+		def candidate(table_bytes, max_error, lookup_cycles):
+			return { "table_bytes": table_bytes, "max_error": max_error, "lookup_cycles": lookup_cycles, "max_error_y": abs(max_error) }
+		candidates = [
+			candidate(40, 1, 9),
+			candidate(24, -5, 5),
+			candidate(40, 2, 9),
+			candidate(32, -1, 7),
+			candidate(48, 0.5, 11),
+		]
+		front = ActionTune.pareto_front(candidates)
+		self.assertEqual(front, [ candidates[1], candidates[3], candidates[4] ])
@@ -0,0 +1,40 @@
+#	ucurve - Minify and generate X/Y tables into microcontroller code.
+#	Copyright (C) 2017-2017 Johannes Bauer
+#
+#	This file is part of ucurve.
+#
+#	ucurve is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	ucurve is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with ucurve; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+import unittest
+from ucurve.actions.ActionXYGen import ActionXYGen
+
+class XYGenTests(unittest.TestCase):
+	def test_var_grid(self):
+		grid = ActionXYGen.parse_var_grid([ "a=1,pow(2, 3)", "b=0:1:3", "c=a*10" ])
+		self.assertEqual([ (fvars["a"], fvars["b"], fvars["c"]) for fvars in grid ], [ (1, 0, 10), (1, 0.5, 10), (1, 1, 10), (8, 0, 80), (8, 0.5, 80), (8, 1, 80) ])
+		self.assertEqual(ActionXYGen.parse_vars([ "a=2", "b=a+1" ]), { "a": 2, "b": 3 })
+		with self.assertRaises(Exception):
+			ActionXYGen.parse_vars([ "a=1,2" ])
+
+	def test_generate_rows(self):
+		grid = ActionXYGen.parse_var_grid([ "k=2", "a=1,2", "b=0:10:2" ])
+		(fixed, varying) = ActionXYGen.split_grid(grid)
+		self.assertEqual(fixed, { "k": 2 })
+		self.assertEqual(varying, [ { "a": 1, "b": 0 }, { "a": 1, "b": 10 }, { "a": 2, "b": 0 }, { "a": 2, "b": 10 } ])
+		rows = list(ActionXYGen.generate_rows("k * x * a + b", "x", grid, [ 0, 1 ]))
+		self.assertEqual(rows, [ (0, 0, 10, 0, 10), (1, 2, 12, 4, 14) ])
+		self.assertEqual(ActionXYGen.split_filenames("out/ntc.txt", 12)[-1], "out/ntc_11.txt")